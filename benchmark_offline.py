@@ -0,0 +1,455 @@
+import asyncio
+import contextlib
+import glob
+import hashlib
+import io
+import json
+import os
+import platform
+import queue
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from multiprocessing import Process, Queue
+from urllib.parse import parse_qs, urlparse
+
+import psutil
+
+from jikiu_crawler import JikiuCrawler
+from metrics import Metrics
+from page_parsers import parse_specs_and_crosses
+from rate_limiter import RateLimiter
+
+# ===============================
+# KONFIGURASI
+# ===============================
+# Ukur performa crawler tanpa menyentuh jikiu.com: server lokal menyajikan halaman
+# tersimpan (fixtures/pages) dengan latency + error buatan, lalu JikiuCrawler
+# (sync/async), crawler Selenium (DriverPool + fetch_search_page) dan parser
+# dijalankan terhadapnya. Hasil per versi disimpan di BENCHMARK_DIR dan
+# dibandingkan dengan run sebelumnya supaya regresi kelihatan.
+#   python benchmark_offline.py                  → semua skenario
+#   python benchmark_offline.py parsers crawler_async
+#   BENCHMARK_PORT=8765 python benchmark_offline.py → server di port tetap (default: port bebas)
+FIXTURE_DIR = 'fixtures/pages'
+# proporsi jenis halaman yang disajikan (nama file fixture → bobot)
+PAGE_MIX = {
+    'found_table_crosses.html': 0.4,
+    'found_list_crosses.html': 0.2,
+    'found_many_crosses.html': 0.2,
+    'not_found.html': 0.2,
+}
+NOT_FOUND_PAGE = 'not_found.html'  # fixture yang harus dibaca crawler sebagai NOT FOUND
+N_ITEMS = 200              # jumlah kode unik per skenario crawler
+SERVER_HOST = 'localhost'
+SERVER_PORT = int(os.environ.get('BENCHMARK_PORT', 0))  # 0 = pilih port bebas otomatis
+LATENCY_MS = 150           # rata-rata waktu respon server
+LATENCY_JITTER_MS = 100    # ± variasi latency (uniform)
+ERROR_RATE = 0.02          # porsi request yang dijawab HTTP 500
+THROTTLE_RATE = 0.01       # porsi request yang dijawab HTTP 429 + Retry-After
+RETRY_AFTER_S = 1
+SEED = 42                  # latency/error bisa diulang persis
+
+HTTP_RPS = 200.0           # rate limiter longgar: yang diukur crawler, bukan jeda sopan
+HTTP_CONCURRENCY = 8
+BROWSER_POOL_SIZE = 2
+BROWSER_ITEMS = 40         # Chrome jauh lebih lambat, cukup sebagian kode
+PARSER_REPEAT = 50
+RSS_SAMPLE_INTERVAL_S = 0.05
+
+SCENARIOS = ['parsers', 'crawler_sync', 'crawler_async', 'selenium']
+BENCHMARK_DIR = 'benchmarks'
+REGRESSION_TOLERANCE = 0.10  # >10% lebih lambat / lebih boros memori = ditandai
+
+
+# ===============================
+# SERVER KATALOG LOKAL
+# ===============================
+def load_fixture_pages():
+    pages = {}
+    for name in PAGE_MIX:
+        with open(os.path.join(FIXTURE_DIR, name), 'rb') as f:
+            pages[name] = f.read()
+    return pages
+
+
+def page_name_for(code):
+    """Jenis halaman (nama fixture) tetap per kode (hash), sesuai bobot PAGE_MIX"""
+    point = int(hashlib.sha1(code.encode('utf-8')).hexdigest()[:8], 16) / 0xFFFFFFFF
+    total = 0.0
+    for name, weight in PAGE_MIX.items():
+        total += weight / sum(PAGE_MIX.values())
+        if point <= total:
+            return name
+    return name
+
+
+def page_for(code, pages):
+    return pages[page_name_for(code)]
+
+
+def count_pages(metrics, codes, results):
+    """Hitung found / not_found hasil crawler, plus `misclassified` kalau status tidak
+    cocok dengan fixture yang disajikan server (request error / 429 tidak dihitung)"""
+    for code, result in zip(codes, results):
+        if 'error' in result:
+            continue
+        metrics.count('found' if result.get('found') else 'not_found')
+        if result.get('found') != (page_name_for(code) != NOT_FOUND_PAGE):
+            metrics.count('misclassified')
+
+
+def serve_catalogue(host, port, seed, ready):
+    """Jalankan server katalog (dipanggil di proses terpisah supaya tidak ikut di RSS / GIL).
+
+    Port yang benar-benar dipakai (atau pesan error bind) dikirim lewat `ready`.
+    """
+    pages = load_fixture_pages()
+    rng = random.Random(seed)
+    lock = threading.Lock()
+
+    class CatalogueHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'  # keep-alive, sama seperti situs asli
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            code = parse_qs(url.query).get('part', [''])[0]
+            with lock:
+                delay = max(0.0, LATENCY_MS + rng.uniform(-LATENCY_JITTER_MS, LATENCY_JITTER_MS)) / 1000
+                roll = rng.random()
+            time.sleep(delay)
+
+            if url.path != '/catalogue/search' or not code:
+                return self.reply(404, b'not found')
+            if roll < ERROR_RATE:
+                return self.reply(500, b'Internal Server Error')
+            if roll < ERROR_RATE + THROTTLE_RATE:
+                return self.reply(429, b'<html><body>Too Many Requests</body></html>',
+                                  {'Retry-After': str(RETRY_AFTER_S)})
+            self.reply(200, page_for(code, pages))
+
+        def reply(self, status, body, headers=None):
+            self.send_response(status)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    try:
+        server = ThreadingHTTPServer((host, port), CatalogueHandler)
+    except OSError as e:
+        ready.put(str(e))
+        return
+    ready.put(server.server_address[1])
+    server.serve_forever()
+
+
+def start_server(port):
+    """Jalankan server katalog di proses terpisah; return (process, port).
+    port 0 = OS memilih port bebas (tidak bentrok dengan service lain)."""
+    ready = Queue()
+    server = Process(target=serve_catalogue, args=(SERVER_HOST, port, SEED, ready), daemon=True)
+    server.start()
+    try:
+        bound = ready.get(timeout=10)
+    except queue.Empty:
+        bound = 'tidak ada respon dalam 10 detik'
+    if isinstance(bound, str):
+        server.terminate()
+        raise RuntimeError(f"❌ Server katalog tidak bisa start di {SERVER_HOST}:{port} ({bound}); "
+                           f"set BENCHMARK_PORT lain atau 0 untuk port otomatis")
+    return server, bound
+
+
+# ===============================
+# PENGUKUR MEMORI
+# ===============================
+class PeakRss:
+    """Peak RSS (MB) proses ini + turunannya (Chrome/chromedriver), server dikecualikan"""
+
+    def __init__(self, exclude_pids=()):
+        self.exclude = set(exclude_pids)
+        self.peak = 0.0
+        self.stop = threading.Event()
+        self.thread = threading.Thread(target=self._sample, daemon=True)
+
+    def current_mb(self):
+        me = psutil.Process()
+        total = 0
+        for proc in [me] + me.children(recursive=True):
+            if proc.pid in self.exclude:
+                continue
+            try:
+                total += proc.memory_info().rss
+            except psutil.Error:
+                pass
+        return total / (1024 * 1024)
+
+    def _sample(self):
+        while not self.stop.is_set():
+            self.peak = max(self.peak, self.current_mb())
+            self.stop.wait(RSS_SAMPLE_INTERVAL_S)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop.set()
+        self.thread.join()
+        self.peak = max(self.peak, self.current_mb())
+
+
+# ===============================
+# SKENARIO
+# ===============================
+# Setiap skenario: fungsi(codes, base_url) -> list of (nama, Metrics, tahap latency utama)
+
+def bench_parsers(codes, base_url):
+    from bs4 import BeautifulSoup
+    warnings.filterwarnings('ignore')  # soup.find(text=...) deprecation dari kode lama
+    pages = [open(f, 'rb').read() for f in sorted(glob.glob(os.path.join(FIXTURE_DIR, '*.html')))]
+    crawler = JikiuCrawler()
+
+    def parse_bs4(content):
+        soup = BeautifulSoup(content, 'html.parser')
+        return crawler.extract_specifications(soup), crawler.extract_crosses(soup)
+
+    runs = []
+    for name, parse in [('parser_lxml', parse_specs_and_crosses), ('parser_bs4', parse_bs4)]:
+        metrics = Metrics(name)
+        for _ in range(PARSER_REPEAT):
+            for content in pages:
+                with metrics.timer('parse'):
+                    parse(content)
+                metrics.item()
+        metrics.stop()
+        runs.append((name, metrics, 'parse'))
+    return runs
+
+
+def http_crawler(name, base_url):
+    metrics = Metrics(name)
+    crawler = JikiuCrawler(rate_limiter=RateLimiter(rate=HTTP_RPS, burst=HTTP_CONCURRENCY),
+                           pool_size=HTTP_CONCURRENCY, metrics=metrics)
+    crawler.base_url = f"{base_url}/catalogue"
+    return crawler, metrics
+
+
+def bench_crawler_sync(codes, base_url):
+    crawler, metrics = http_crawler('crawler_sync', base_url)
+    results = []
+    for code in codes:
+        results.append(crawler.search_part(code))
+        metrics.item()
+    count_pages(metrics, codes, results)
+    return [('crawler_sync', metrics, 'fetch')]
+
+
+def bench_crawler_async(codes, base_url):
+    crawler, metrics = http_crawler('crawler_async', base_url)
+    results = asyncio.run(crawler.crawl_async(codes, HTTP_CONCURRENCY))
+    metrics.item(len(results))
+    count_pages(metrics, codes, results)
+    return [('crawler_async', metrics, 'fetch')]
+
+
+def bench_selenium(codes, base_url):
+    """Jalur yang sama dengan validate_*.py: DriverPool + fetch_search_page + parser teks"""
+    import jikiu_browser
+    from driver_pool import DriverPool
+    from jikiu_pages import analyze_page_text, extract_crosses
+    from response_cache import ResponseCache
+
+    options = jikiu_browser.chrome_options(lean=True, headless=True, allow_hosts=[SERVER_HOST])
+    try:
+        pool = DriverPool(options, size=BROWSER_POOL_SIZE, setup=jikiu_browser.block_heavy_resources,
+                          launch_attempts=1)
+    except RuntimeError as e:
+        print(f"⏭️ Skenario selenium dilewati: {str(e).splitlines()[0]}", file=sys.__stdout__)
+        return []
+    jikiu_browser.CATALOGUE_URL = f"{base_url}/catalogue"
+
+    metrics = Metrics('selenium')
+    limiter = RateLimiter(rate=HTTP_RPS, burst=BROWSER_POOL_SIZE)
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = ResponseCache(os.path.join(tmp, 'bench_cache.sqlite'))  # kosong: semua lewat browser
+
+        def process(code):
+            page_text, dom_crosses, _ = jikiu_browser.fetch_search_page(pool, limiter, cache, code, metrics=metrics)
+            if page_text is not None:
+                with metrics.timer('parse'):
+                    analyze_page_text(code, page_text)
+                    extract_crosses(page_text, dom_crosses)
+            metrics.item()
+
+        try:
+            with ThreadPoolExecutor(max_workers=BROWSER_POOL_SIZE) as executor:
+                list(executor.map(process, codes[:BROWSER_ITEMS]))
+        finally:
+            pool.close()
+            metrics.set('driver_restarts', pool.restarts)
+            cache.close()
+    return [('selenium', metrics, 'page_load')]
+
+
+BENCHMARKS = {
+    'parsers': bench_parsers,
+    'crawler_sync': bench_crawler_sync,
+    'crawler_async': bench_crawler_async,
+    'selenium': bench_selenium,
+}
+
+
+# ===============================
+# HASIL & PERBANDINGAN
+# ===============================
+def code_version():
+    """Commit git saat ini (+ penanda kalau ada perubahan belum di-commit)"""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'],
+                                capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'],
+                               capture_output=True, text=True, check=True).stdout.strip()
+        return commit + ('-dirty' if dirty else '')
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def bench_config():
+    return {
+        'page_mix': PAGE_MIX, 'n_items': N_ITEMS, 'latency_ms': LATENCY_MS,
+        'latency_jitter_ms': LATENCY_JITTER_MS, 'error_rate': ERROR_RATE,
+        'throttle_rate': THROTTLE_RATE, 'seed': SEED, 'http_rps': HTTP_RPS,
+        'http_concurrency': HTTP_CONCURRENCY, 'browser_pool_size': BROWSER_POOL_SIZE,
+        'browser_items': BROWSER_ITEMS, 'parser_repeat': PARSER_REPEAT,
+    }
+
+
+def scenario_result(metrics, latency_stage, peak_rss_mb):
+    metrics.stop()
+    summary = metrics.summary()
+    latency = summary['stages'].get(latency_stage, {})
+    return {
+        'items': summary['items'],
+        'elapsed_s': summary['elapsed_s'],
+        'items_per_sec': summary['items_per_sec'],
+        'latency_stage': latency_stage,
+        'p50_s': latency.get('p50_s'),
+        'p95_s': latency.get('p95_s'),
+        'peak_rss_mb': round(peak_rss_mb, 1),
+        'counters': summary['counters'],
+        'stages': summary['stages'],
+    }
+
+
+def previous_result(exclude_path):
+    files = [f for f in glob.glob(os.path.join(BENCHMARK_DIR, 'benchmark_*.json')) if f != exclude_path]
+    if not files:
+        return None, None
+    path = max(files, key=os.path.getmtime)
+    with open(path) as f:
+        return path, json.load(f)
+
+
+def compare(previous, current):
+    """Tabel perubahan terhadap run sebelumnya; return jumlah metrik yang regresi"""
+    if previous['config'] != current['config']:
+        print("⚠️ Konfigurasi benchmark berbeda dengan run sebelumnya, perbandingan hanya indikatif.")
+    # (metrik, arah: +1 = makin besar makin baik, -1 = makin kecil makin baik)
+    checks = [('items_per_sec', 1), ('p95_s', -1), ('peak_rss_mb', -1)]
+    regressions = 0
+    print(f"\n{'skenario':15} {'metrik':14} {'sebelum':>10} {'sekarang':>10} {'Δ':>8}")
+    for name, now in current['scenarios'].items():
+        before = previous['scenarios'].get(name)
+        if not before:
+            continue
+        for metric, direction in checks:
+            old, new = before.get(metric), now.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            flag = ''
+            if change * direction < -REGRESSION_TOLERANCE:
+                flag = '  ❗ regresi'
+                regressions += 1
+            print(f"{name:15} {metric:14} {old:10.3f} {new:10.3f} {change:+8.1%}{flag}")
+    return regressions
+
+
+if __name__ == '__main__':
+    selected = sys.argv[1:] or SCENARIOS
+    unknown = [s for s in selected if s not in BENCHMARKS]
+    if unknown:
+        sys.exit(f"❌ Skenario tidak dikenal: {unknown} (pilihan: {', '.join(SCENARIOS)})")
+
+    codes = [f"BM-{i:04d}" for i in range(1, N_ITEMS + 1)]
+    server, port = start_server(SERVER_PORT)
+    base_url = f"http://{SERVER_HOST}:{port}"
+    print(f"🧪 Server katalog lokal {base_url} (latency {LATENCY_MS}±{LATENCY_JITTER_MS} ms, "
+          f"error {ERROR_RATE:.0%}, 429 {THROTTLE_RATE:.0%})")
+
+    report = {
+        'version': code_version(),
+        'started_at': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'config': bench_config(),
+        'scenarios': {},
+    }
+    try:
+        for scenario in selected:
+            print(f"⏱️ {scenario}...")
+            # log per item dari crawler tidak perlu di benchmark
+            with PeakRss(exclude_pids=[server.pid]) as rss, contextlib.redirect_stdout(io.StringIO()):
+                runs = BENCHMARKS[scenario](codes, base_url)
+            for name, metrics, stage in runs:
+                report['scenarios'][name] = scenario_result(metrics, stage, rss.peak)
+    finally:
+        server.terminate()
+
+    print(f"\n{'skenario':15} {'item':>6} {'item/s':>9} {'p95 (s)':>9} {'RSS (MB)':>9}  tahap")
+    for name, r in report['scenarios'].items():
+        print(f"{name:15} {r['items']:6d} {r['items_per_sec']:9.2f} {r['p95_s'] or 0:9.4f} "
+              f"{r['peak_rss_mb']:9.0f}  {r['latency_stage']}")
+
+    # Porsi NOT FOUND harus sesuai PAGE_MIX, dan tiap halaman dibaca sesuai fixture-nya
+    misclassified = 0
+    expected_share = PAGE_MIX[NOT_FOUND_PAGE] / sum(PAGE_MIX.values())
+    for name, r in report['scenarios'].items():
+        counters = r['counters']
+        if 'found' not in counters and 'not_found' not in counters:
+            continue
+        pages = counters.get('found', 0) + counters.get('not_found', 0)
+        wrong = counters.get('misclassified', 0)
+        misclassified += wrong
+        print(f"{'❗' if wrong else '✅'} {name}: {counters.get('not_found', 0)}/{pages} NOT FOUND "
+              f"({counters.get('not_found', 0) / max(pages, 1):.0%}, PAGE_MIX {expected_share:.0%}), "
+              f"{wrong} salah klasifikasi")
+
+    os.makedirs(BENCHMARK_DIR, exist_ok=True)
+    output_file = os.path.join(BENCHMARK_DIR, f"benchmark_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    with open(output_file, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\n💾 Hasil disimpan di: {output_file}")
+
+    previous_path, previous = previous_result(output_file)
+    if previous:
+        print(f"📊 Dibandingkan dengan {previous_path} ({previous['version']})")
+        regressions = compare(previous, report)
+        print(f"\n{'❗ ' + str(regressions) + ' metrik regresi' if regressions else '✅ Tidak ada regresi'} "
+              f"(toleransi {REGRESSION_TOLERANCE:.0%})")
+
+    if misclassified:
+        sys.exit(f"❌ {misclassified} halaman salah dibaca sebagai FOUND / NOT FOUND")
@@ -0,0 +1,414 @@
+import asyncio
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from datetime import datetime
+
+import pandas as pd
+
+from item_codes import KEY_COLUMN, canonical_keys, clean_code, normalize_key, unique_codes
+from jikiu_crawler import RESULT_COLUMNS, RESULT_DTYPES, JikiuCrawler
+from jikiu_pages import analyze_page_text
+from metrics import Metrics
+from page_parsers import page_text
+from rate_limiter import RateLimiter
+from response_cache import ResponseCache
+
+# Cross owners whose numbers are searched too while enumerating: the customer
+# lists use these numbering schemes, so following them walks the part of the
+# catalogue the lists can ask about
+EXPAND_OWNERS = ('555 SANKEI', 'CTR')
+MIRROR_COLUMNS = ['Status', 'JIKIU Code', 'Item Type', 'Details', 'Matched_By']
+MAX_ATTEMPTS = 3
+CLAIM_TIMEOUT_S = 3600  # claimed frontier rows older than this belong to a crashed run
+
+
+def code_column(df):
+    """Item-code column of a parts list or crosses file ('ItemCode', 'Item Code', 'item code', ...)"""
+    for col in df.columns:
+        if str(col).strip().lower() in ('itemcode', 'item code'):
+            return col
+    raise ValueError(f"Kolom item code tidak ditemukan (kolom: {list(df.columns)})")
+
+
+class CatalogueMirror:
+    """Local, indexed copy of the Jikiu catalogue built by enumeration.
+
+    The catalogue is crawled once, breadth first, at the pace of the
+    crawler's RateLimiter: seed codes (customer lists, earlier crosses
+    files) are searched with JikiuCrawler, and the cross numbers of every
+    found part whose owner is in `expand_owners` are queued for the next
+    level, up to `max_depth`. Parts (status, JIKIU code, item type,
+    specifications) and their crosses land in one SQLite file with indexes
+    on the searched code and on every cross number, so `records()` /
+    `annotate()` / `crosses_for()` answer a whole parts list locally.
+
+    The frontier is stored too, so an interrupted enumeration simply
+    continues. Batches are claimed atomically, so a background refresh
+    and a foreground enumerate (or two processes) never fetch the same
+    code twice. `refresh()` re-queues parts checked more than
+    `refresh_after_days` ago; pages then go out as conditional requests
+    (ETag / Last-Modified), so unchanged parts cost a 304.
+    """
+
+    def __init__(self, path='jikiu_mirror.sqlite', crawler=None, expand_owners=EXPAND_OWNERS,
+                 max_depth=2, refresh_after_days=7):
+        self.path = path
+        self.expand_owners = {owner.upper() for owner in expand_owners}
+        self.max_depth = max_depth
+        self.refresh_after_days = refresh_after_days
+        # pages older than refresh_after_days are revalidated instead of served from the cache
+        self.crawler = crawler or JikiuCrawler(
+            rate_limiter=RateLimiter(rate=1.0, burst=2),
+            cache=ResponseCache('jikiu_cache.sqlite', refresh_older_than_days=refresh_after_days),
+            metrics=Metrics('catalogue_mirror'),
+        )
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS parts (
+                key TEXT PRIMARY KEY,
+                item_code TEXT NOT NULL,
+                status TEXT NOT NULL,
+                jikiu_code TEXT,
+                item_type TEXT,
+                details TEXT,
+                url TEXT,
+                specs TEXT NOT NULL,
+                checked_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS crosses (
+                key TEXT NOT NULL,
+                owner TEXT NOT NULL,
+                number TEXT NOT NULL,
+                number_key TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS crosses_key ON crosses (key);
+            CREATE INDEX IF NOT EXISTS crosses_number ON crosses (number_key);
+            CREATE TABLE IF NOT EXISTS frontier (
+                key TEXT PRIMARY KEY,
+                item_code TEXT NOT NULL,
+                depth INTEGER NOT NULL,
+                state TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                queued_at REAL NOT NULL,
+                claimed_by TEXT,
+                claimed_at REAL
+            );
+            CREATE INDEX IF NOT EXISTS frontier_state ON frontier (state, depth, queued_at);
+        """)
+        # Mirrors created before frontier rows were claimed
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(frontier)")}
+        for column, kind in (('claimed_by', 'TEXT'), ('claimed_at', 'REAL')):
+            if column not in columns:
+                self.conn.execute(f"ALTER TABLE frontier ADD COLUMN {column} {kind}")
+        self.conn.commit()
+
+    # ---------- enumeration ----------
+
+    def seed(self, codes, depth=0):
+        """Queue codes that are not known yet; returns how many were new"""
+        now = time.time()
+        rows = [(normalize_key(code), clean_code(code), depth, now) for code in unique_codes(pd.Series(codes))]
+        with self.lock:
+            before = self.conn.total_changes
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO frontier (key, item_code, depth, state, queued_at) "
+                "VALUES (?, ?, ?, 'pending', ?)", rows
+            )
+            self.conn.commit()
+            return self.conn.total_changes - before
+
+    def pending(self):
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM frontier WHERE state = 'pending'").fetchone()[0]
+
+    def _next_batch(self, size):
+        """Claim up to `size` queued codes for this thread: select and mark them
+        in one write transaction, so no other thread or process gets them too"""
+        owner = f"{os.getpid()}-{threading.get_ident()}"
+        now = time.time()
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                batch = self.conn.execute(
+                    "SELECT key, item_code, depth FROM frontier "
+                    "WHERE state = 'pending' OR (state = 'claimed' AND claimed_at < ?) "
+                    "ORDER BY depth, queued_at LIMIT ?", (now - CLAIM_TIMEOUT_S, size)
+                ).fetchall()
+                self.conn.executemany(
+                    "UPDATE frontier SET state = 'claimed', claimed_by = ?, claimed_at = ? WHERE key = ?",
+                    [(owner, now, key) for key, _, _ in batch]
+                )
+                self.conn.commit()
+            except BaseException:
+                self.conn.rollback()
+                raise
+        return [(code, depth) for _, code, depth in batch]
+
+    def enumerate(self, batch_size=50, concurrency=4, limit=None):
+        """Crawl queued codes (breadth first) until the frontier is empty or
+        `limit` pages were fetched; returns the number of pages fetched"""
+        fetched = 0
+        while limit is None or fetched < limit:
+            batch = self._next_batch(batch_size if limit is None else min(batch_size, limit - fetched))
+            if not batch:
+                break
+            codes = [code for code, _ in batch]
+            try:
+                if concurrency > 1:
+                    results = asyncio.run(self.crawler.crawl_async(codes, concurrency))
+                else:
+                    results = [self.crawler.search_part(code) for code in codes]
+                for (code, depth), result in zip(batch, results):
+                    self._store(code, depth, result)
+            finally:
+                self._release(codes)  # interrupted: unfinished codes go back to the queue
+            fetched += len(batch)
+            self.crawler.metrics.item(len(batch))
+            print(f"🗂️ Mirror: {fetched} halaman diproses, {self.pending()} antre, {len(self)} part tersimpan")
+        return fetched
+
+    def _release(self, codes):
+        """Put codes this thread claimed but did not store back to 'pending'"""
+        owner = f"{os.getpid()}-{threading.get_ident()}"
+        with self.lock:
+            self.conn.executemany(
+                "UPDATE frontier SET state = 'pending', claimed_by = NULL, claimed_at = NULL "
+                "WHERE key = ? AND state = 'claimed' AND claimed_by = ?",
+                [(normalize_key(code), owner) for code in codes]
+            )
+            self.conn.commit()
+
+    def _analyze(self, code, result):
+        """Status / JIKIU code / item type from the page the crawler just cached"""
+        html = self.crawler.cache.get(code) if self.crawler.cache else None
+        if html is not None:
+            return analyze_page_text(code, page_text(html))
+        status = "FOUND" if result.get('found') else "NOT FOUND"
+        return {'status': status, 'jikiu_code': "", 'item_type': "", 'details': ""}
+
+    def _store(self, code, depth, result):
+        key = normalize_key(code)
+        now = time.time()
+        if 'error' in result:
+            with self.lock:
+                self.conn.execute(
+                    "UPDATE frontier SET attempts = attempts + 1, "
+                    "state = CASE WHEN attempts + 1 >= ? THEN 'error' ELSE 'pending' END, queued_at = ? "
+                    "WHERE key = ?", (MAX_ATTEMPTS, now, key)
+                )
+                self.conn.commit()
+            return
+
+        analysis = self._analyze(code, result)
+        found = analysis['status'] == "FOUND"
+        crosses = result.get('crosses', []) if found else []
+        specs = result.get('specifications', {}) if found else {}
+        expand = [
+            (normalize_key(c['number']), clean_code(c['number']), depth + 1, now) for c in crosses
+            if depth < self.max_depth and c['owner'].upper() in self.expand_owners and clean_code(c['number'])
+        ]
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO parts "
+                "(key, item_code, status, jikiu_code, item_type, details, url, specs, checked_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, code, analysis['status'], analysis['jikiu_code'], analysis['item_type'],
+                 analysis['details'], result.get('url', ''), json.dumps(specs), now)
+            )
+            self.conn.execute("DELETE FROM crosses WHERE key = ?", (key,))
+            self.conn.executemany(
+                "INSERT INTO crosses (key, owner, number, number_key) VALUES (?, ?, ?, ?)",
+                [(key, c['owner'], c['number'], normalize_key(c['number'])) for c in crosses]
+            )
+            self.conn.execute("UPDATE frontier SET state = 'done', attempts = 0 WHERE key = ?", (key,))
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO frontier (key, item_code, depth, state, queued_at) "
+                "VALUES (?, ?, ?, 'pending', ?)", expand
+            )
+            self.conn.commit()
+
+    # ---------- incremental refresh ----------
+
+    def refresh(self, older_than_days=None, limit=None, concurrency=4):
+        """Re-crawl parts last checked more than `older_than_days` ago (oldest first)"""
+        days = self.refresh_after_days if older_than_days is None else older_than_days
+        cutoff = time.time() - days * 86400
+        with self.lock:
+            stale = self.conn.execute(
+                "SELECT key FROM parts WHERE checked_at < ? ORDER BY checked_at LIMIT ?",
+                (cutoff, -1 if limit is None else limit)
+            ).fetchall()
+            # codes another enumerate has claimed are being fetched right now
+            self.conn.executemany(
+                "UPDATE frontier SET state = 'pending', attempts = 0, queued_at = ? "
+                "WHERE key = ? AND state != 'claimed'",
+                [(time.time(), key) for (key,) in stale]
+            )
+            self.conn.commit()
+        if stale:
+            print(f"🔄 Mirror: {len(stale)} part lebih tua dari {days} hari dicek ulang")
+        return self.enumerate(concurrency=concurrency, limit=limit)
+
+    def refresh_in_background(self, interval_s=3600, batch=200, concurrency=2):
+        """Refresh `batch` stale parts every `interval_s` seconds in a daemon
+        thread; returns the threading.Event that stops it"""
+        stop = threading.Event()
+
+        def loop():
+            while not stop.is_set():
+                try:
+                    self.refresh(limit=batch, concurrency=concurrency)
+                except Exception as e:
+                    print(f"⚠️ Refresh mirror gagal: {e}")
+                stop.wait(interval_s)
+
+        threading.Thread(target=loop, name='mirror-refresh', daemon=True).start()
+        return stop
+
+    # ---------- local lookups ----------
+
+    def _resolve(self, codes):
+        """({key: (part row, matched_by)}, {part key: crosses}, sorted keys) for distinct codes.
+
+        A code is matched on the searched code first, then on the cross
+        numbers of mirrored FOUND parts (matched_by 'cross').
+        """
+        keys = sorted(set(canonical_keys(pd.Series(list(codes), dtype='string')).dropna()) - {''})
+        with self.lock:
+            direct = self._query_parts("SELECT * FROM parts WHERE key IN ({})", keys)
+            via_cross = self._query_parts(
+                "SELECT c.number_key, p.* FROM crosses c JOIN parts p ON p.key = c.key "
+                "WHERE c.number_key IN ({}) AND p.status = 'FOUND' ORDER BY c.rowid",
+                [key for key in keys if key not in direct], keyed_by_first=True
+            )
+            parts = {key: (row, 'code') for key, row in direct.items()}
+            parts.update({key: (row, 'cross') for key, row in via_cross.items()})
+            crosses = self._query_crosses({row['key'] for row, _ in parts.values()})
+        return parts, crosses, keys
+
+    def records(self, codes):
+        """One row per distinct code, indexed by canonical key: RESULT_COLUMNS
+        (same as JikiuCrawler.process_excel) plus MIRROR_COLUMNS; codes the
+        mirror does not know get Status 'NOT IN MIRROR'."""
+        parts, crosses, keys = self._resolve(codes)
+        records = []
+        for key in keys:
+            if key not in parts:
+                record = dict.fromkeys(RESULT_COLUMNS, '') | {'Found_in_Jikiu': False}
+                record.update(dict.fromkeys(MIRROR_COLUMNS, '') | {'Status': 'NOT IN MIRROR'})
+                records.append(record)
+                continue
+            part, matched_by = parts[key]
+            result = {'found': part['status'] == "FOUND", 'url': part['url'],
+                      'specifications': json.loads(part['specs']), 'crosses': crosses.get(part['key'], [])}
+            record = self.crawler.result_record(result)
+            record.update({'Status': part['status'], 'JIKIU Code': part['jikiu_code'],
+                           'Item Type': part['item_type'], 'Details': part['details'],
+                           'Matched_By': matched_by})
+            records.append(record)
+        return pd.DataFrame.from_records(records, index=keys, columns=RESULT_COLUMNS + MIRROR_COLUMNS)
+
+    def _query_parts(self, sql, keys, keyed_by_first=False):
+        """{key: part row as dict} for a chunked IN query (SQLite variable limit)"""
+        found = {}
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            cursor = self.conn.execute(sql.format(','.join('?' * len(chunk))), chunk)
+            columns = [d[0] for d in cursor.description]
+            for values in cursor:
+                if keyed_by_first:
+                    found.setdefault(values[0], dict(zip(columns[1:], values[1:])))
+                else:
+                    row = dict(zip(columns, values))
+                    found[row['key']] = row
+        return found
+
+    def _query_crosses(self, part_keys):
+        crosses = {}
+        part_keys = list(part_keys)
+        for start in range(0, len(part_keys), 500):
+            chunk = part_keys[start:start + 500]
+            cursor = self.conn.execute(
+                f"SELECT key, owner, number FROM crosses WHERE key IN ({','.join('?' * len(chunk))}) ORDER BY rowid",
+                chunk
+            )
+            for key, owner, number in cursor:
+                crosses.setdefault(key, []).append({'owner': owner, 'number': number})
+        return crosses
+
+    def annotate(self, df, code_column='ItemCode'):
+        """`df` with the mirror's answer joined onto every row (like process_excel)"""
+        keys = canonical_keys(df[code_column])
+        found = self.records(keys.dropna())
+        df = (df.drop(columns=RESULT_COLUMNS + MIRROR_COLUMNS, errors='ignore')
+                .assign(**{KEY_COLUMN: keys})
+                .join(found, on=KEY_COLUMN)
+                .drop(columns=KEY_COLUMN))
+        return df.fillna({col: '' for col in RESULT_COLUMNS + MIRROR_COLUMNS}).astype(RESULT_DTYPES)
+
+    def crosses_for(self, codes, code_column='Item Code'):
+        """(Item Code, Owner, Number) rows for the given codes, in input order
+        (same shape as validate_crosses.py output before the detail merge)"""
+        codes = unique_codes(pd.Series(list(codes)))
+        parts, crosses, _ = self._resolve(codes)
+        rows = []
+        for code in codes:
+            part = parts.get(normalize_key(code))
+            for cross in crosses.get(part[0]['key'], []) if part else []:
+                rows.append({code_column: code, 'Owner': cross['owner'], 'Number': cross['number']})
+        return pd.DataFrame(rows, columns=[code_column, 'Owner', 'Number'])
+
+    def stats(self):
+        with self.lock:
+            parts = dict(self.conn.execute("SELECT status, COUNT(*) FROM parts GROUP BY status").fetchall())
+            crosses = self.conn.execute("SELECT COUNT(*) FROM crosses").fetchone()[0]
+            frontier = dict(self.conn.execute("SELECT state, COUNT(*) FROM frontier GROUP BY state").fetchall())
+        return {'parts': parts, 'crosses': crosses, 'frontier': frontier}
+
+    def __len__(self):
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM parts").fetchone()[0]
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+        if self.crawler.cache:
+            self.crawler.cache.close()
+
+
+if __name__ == "__main__":
+    # python catalogue_mirror.py build <excel> [...]   → enumerasi dari kode di file (ItemCode / item code)
+    # python catalogue_mirror.py refresh               → cek ulang part yang sudah lama
+    # python catalogue_mirror.py lookup <excel>        → jawab dari mirror, tanpa request ke situs
+    commands = ('build', 'refresh', 'lookup')
+    if len(sys.argv) < 2 or sys.argv[1] not in commands or (sys.argv[1] != 'refresh' and len(sys.argv) < 3):
+        print("Pemakaian: python catalogue_mirror.py build <excel> [...] | refresh | lookup <excel>")
+        sys.exit(1)
+
+    mirror = CatalogueMirror()
+    command, files = sys.argv[1], sys.argv[2:]
+    if command == 'build':
+        for f in files:
+            df = pd.read_excel(f)
+            print(f"🌱 {f}: {mirror.seed(df[code_column(df)].dropna())} kode baru masuk antrean")
+        mirror.enumerate()
+    elif command == 'refresh':
+        mirror.refresh()
+    else:
+        start = time.perf_counter()
+        df = pd.read_excel(files[0])
+        result = mirror.annotate(df, code_column(df))
+        output_file = f"mirror_lookup_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
+        result.to_excel(output_file, index=False)
+        print(f"⚡ {len(result)} baris dijawab dari mirror dalam {time.perf_counter() - start:.2f} s")
+        print(result['Status'].value_counts().to_string())
+        print(f"💾 Hasil: {output_file}")
+    print(f"📊 {mirror.stats()}")
+    mirror.close()
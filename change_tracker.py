@@ -0,0 +1,195 @@
+import hashlib
+import json
+import sqlite3
+import sys
+import threading
+import time
+from datetime import datetime
+
+import pandas as pd
+
+from item_codes import normalize_key
+
+CHANGE_COLUMNS = ['Item Code', 'Change', 'Field', 'Owner', 'Number', 'Old', 'New']
+
+
+def cross_key(owner, number):
+    """Identity of a cross: owner and number compared without case / stray spaces"""
+    return f"{' '.join(str(owner).split()).upper()}|{normalize_key(number)}"
+
+
+def fingerprint(status, jikiu_code, specs, crosses):
+    """Content hash of one item: status, JIKIU code, specs and the *set* of crosses"""
+    payload = json.dumps({
+        'status': status,
+        'jikiu_code': jikiu_code or '',
+        'specs': {k: v for k, v in sorted((specs or {}).items()) if v not in (None, '')},
+        'crosses': sorted({cross_key(owner, number) for owner, number in crosses}),
+    }, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+class ChangeTracker:
+    """Last known content of every item code plus a log of what changed.
+
+    `observe()` is called once per crawled item. If the item's fingerprint
+    is unchanged only its check time moves; otherwise the differences
+    (new item, status / JIKIU code / spec changes, crosses added or
+    removed) are appended to the change log under the current run and
+    the stored snapshot is replaced. A re-crawl therefore produces a
+    small delta instead of another full copy of the crosses file.
+    """
+
+    def __init__(self, path='snapshot.sqlite'):
+        self.path = path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS items (
+                key TEXT PRIMARY KEY,
+                item_code TEXT NOT NULL,
+                fingerprint TEXT NOT NULL,
+                status TEXT NOT NULL,
+                jikiu_code TEXT,
+                specs TEXT NOT NULL,
+                crosses TEXT NOT NULL,
+                first_seen REAL NOT NULL,
+                checked_at REAL NOT NULL,
+                changed_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS changes (
+                run_id TEXT NOT NULL,
+                key TEXT NOT NULL,
+                item_code TEXT NOT NULL,
+                change TEXT NOT NULL,
+                field TEXT,
+                owner TEXT,
+                number TEXT,
+                old TEXT,
+                new TEXT,
+                at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS changes_run ON changes (run_id);
+        """)
+        self.conn.commit()
+        self.run_id = datetime.now().strftime('%Y%m%d_%H%M%S')
+
+    def observe(self, item_code, status, jikiu_code='', specs=None, crosses=()):
+        """Record the crawl result of one item; returns its list of changes
+        (empty when the content is the same as last time).
+
+        `crosses` is an iterable of (owner, number) pairs.
+        """
+        key = normalize_key(item_code)
+        specs = {k: v for k, v in (specs or {}).items() if v not in (None, '')}
+        crosses = [(str(owner).strip(), str(number).strip()) for owner, number in crosses]
+        digest = fingerprint(status, jikiu_code, specs, crosses)
+        now = time.time()
+
+        with self.lock:
+            old = self.conn.execute(
+                "SELECT fingerprint, status, jikiu_code, specs, crosses FROM items WHERE key = ?", (key,)
+            ).fetchone()
+            if old is not None and old[0] == digest:
+                self.conn.execute("UPDATE items SET checked_at = ? WHERE key = ?", (now, key))
+                self.conn.commit()
+                return []
+
+            changes = self._diff(old, status, jikiu_code, specs, crosses)
+            self.conn.executemany(
+                "INSERT INTO changes (run_id, key, item_code, change, field, owner, number, old, new, at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [(self.run_id, key, str(item_code), c['Change'], c['Field'], c['Owner'], c['Number'],
+                  c['Old'], c['New'], now) for c in changes]
+            )
+            self.conn.execute(
+                "INSERT INTO items (key, item_code, fingerprint, status, jikiu_code, specs, crosses, "
+                "first_seen, checked_at, changed_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET item_code = excluded.item_code, "
+                "fingerprint = excluded.fingerprint, status = excluded.status, "
+                "jikiu_code = excluded.jikiu_code, specs = excluded.specs, crosses = excluded.crosses, "
+                "checked_at = excluded.checked_at, changed_at = excluded.changed_at",
+                (key, str(item_code), digest, status, jikiu_code or '', json.dumps(specs, ensure_ascii=False),
+                 json.dumps(crosses, ensure_ascii=False), now, now, now)
+            )
+            self.conn.commit()
+        return [{'Item Code': str(item_code), **c} for c in changes]
+
+    @staticmethod
+    def _diff(old, status, jikiu_code, specs, crosses):
+        def change(kind, field=None, owner=None, number=None, before=None, after=None):
+            return {'Change': kind, 'Field': field, 'Owner': owner, 'Number': number, 'Old': before, 'New': after}
+
+        if old is None:
+            before_status, before_code, before_specs, before_crosses = None, '', {}, []
+            changes = [change('new item', after=status)]
+        else:
+            _, before_status, before_code, before_specs, before_crosses = old
+            before_specs, before_crosses = json.loads(before_specs), json.loads(before_crosses)
+            changes = []
+            if before_status != status:
+                changes.append(change('status', 'Status', before=before_status, after=status))
+            if (before_code or '') != (jikiu_code or ''):
+                changes.append(change('jikiu code', 'JIKIU Code', before=before_code, after=jikiu_code))
+            for field in sorted(set(before_specs) | set(specs)):
+                if before_specs.get(field) != specs.get(field):
+                    changes.append(change('spec', field, before=before_specs.get(field), after=specs.get(field)))
+
+        before = {cross_key(o, n): (o, n) for o, n in before_crosses}
+        after = {cross_key(o, n): (o, n) for o, n in crosses}
+        changes += [change('cross added', owner=o, number=n) for k, (o, n) in after.items() if k not in before]
+        changes += [change('cross removed', owner=o, number=n) for k, (o, n) in before.items() if k not in after]
+        return changes
+
+    def changes(self, run_id=None):
+        """Change log of one run (default: this run) as a DataFrame"""
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT item_code, change, field, owner, number, old, new FROM changes "
+                "WHERE run_id = ? ORDER BY rowid", (run_id or self.run_id,)
+            ).fetchall()
+        return pd.DataFrame(rows, columns=CHANGE_COLUMNS)
+
+    def changed_keys(self, run_id=None):
+        """Normalized item codes that changed in a run (for downstream merges)"""
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT DISTINCT key FROM changes WHERE run_id = ?", (run_id or self.run_id,)
+            ).fetchall()
+        return {key for (key,) in rows}
+
+    def runs(self):
+        """(run_id, items changed, change rows) for every run that changed something"""
+        with self.lock:
+            return self.conn.execute(
+                "SELECT run_id, COUNT(DISTINCT key), COUNT(*) FROM changes GROUP BY run_id ORDER BY run_id"
+            ).fetchall()
+
+    def __len__(self):
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM items").fetchone()[0]
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+if __name__ == "__main__":
+    # Ringkasan per run / export perubahan satu run:
+    #   python change_tracker.py snapshot_pipeline.sqlite
+    #   python change_tracker.py snapshot_pipeline.sqlite 20260113_171105 perubahan.xlsx
+    if len(sys.argv) not in (2, 4):
+        print("Pemakaian: python change_tracker.py <snapshot.sqlite> [<run_id> <output.xlsx>]")
+        sys.exit(1)
+    tracker = ChangeTracker(sys.argv[1])
+    if len(sys.argv) == 2:
+        print(f"📦 {len(tracker)} item di snapshot")
+        for run_id, items, rows in tracker.runs():
+            print(f"   {run_id}: {items} item berubah ({rows} baris perubahan)")
+    else:
+        delta = tracker.changes(sys.argv[2])
+        delta.to_excel(sys.argv[3], index=False)
+        print(f"💾 {len(delta)} baris perubahan diekspor ke {sys.argv[3]}")
+    tracker.close()
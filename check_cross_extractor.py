@@ -0,0 +1,118 @@
+import glob
+import json
+import os
+import sys
+
+import pandas as pd
+
+from jikiu_browser import _PAGE_SNAPSHOT_JS, chrome_options
+from jikiu_pages import parse_crosses_from_text
+from item_codes import normalize_key
+from page_parsers import parse_specs_and_crosses
+from response_cache import ResponseCache
+
+# ===============================
+# KONFIGURASI
+# ===============================
+# Validasi extractor Crosses dari DOM (jikiu_browser) terhadap parser teks lama:
+#  0. fixture: _PAGE_SNAPSHOT_JS dijalankan di Chrome headless, harus sama dengan lxml (markup);
+#     selisih dengan parser teks hanya dilaporkan (parser teks memang kurang lengkap)
+#  1. halaman di cache: tabel DOM vs parse_crosses_from_text(body text)
+#  2. file hasil lama (pasangan Owner/Number dari parser teks) vs tabel DOM di cache
+# Cache hanya dibaca kalau sudah ada (script ini tidak membuat file cache baru).
+FIXTURE_GLOB = 'fixtures/pages/*.html'
+CACHE_PATH = 'jikiu_cache.sqlite'
+RESULT_FILES = sorted(glob.glob('Jikiu_Crosses_FinalPairs_FULL_*.xlsx') + glob.glob('results2/Jikiu_Crosses_FinalPairs_*.xlsx'))
+SHOW_DIFFS = 10
+
+
+def pair_set(pairs):
+    return {(str(p['Owner']).strip(), str(p['Number']).strip()) for p in pairs}
+
+
+def snapshot_fixtures(paths):
+    """{nama file: hasil _PAGE_SNAPSHOT_JS} dari Chrome headless, None kalau Chrome tidak bisa jalan"""
+    from selenium import webdriver
+    try:
+        driver = webdriver.Chrome(options=chrome_options(lean=True, headless=True))
+    except Exception as e:
+        print(f"⏭️ Chrome tidak bisa dijalankan ({str(e).splitlines()[0]}), cek fixture DILEWATI")
+        return None
+    try:
+        snapshots = {}
+        for path in paths:
+            driver.get('file://' + os.path.abspath(path))
+            snapshots[os.path.basename(path)] = driver.execute_script(_PAGE_SNAPSHOT_JS)
+        return snapshots
+    finally:
+        driver.quit()
+
+
+# 0. Extractor DOM pada fixture: harus sama dengan lxml, parser teks sebagai pembanding
+fixtures = sorted(glob.glob(FIXTURE_GLOB))
+fixture_failures = 0
+snapshots = snapshot_fixtures(fixtures)
+if snapshots is not None:
+    for path in fixtures:
+        name = os.path.basename(path)
+        snapshot = snapshots[name]
+        _, lxml_crosses = parse_specs_and_crosses(open(path, 'rb').read())
+        expected = pair_set({'Owner': c['owner'], 'Number': c['number']} for c in lxml_crosses)
+        from_text = pair_set(parse_crosses_from_text(snapshot['text']))
+        from_dom = pair_set(snapshot['crosses'] or [])
+        text_note = "" if from_text == from_dom else f" (parser teks: {len(from_text)} pasangan)"
+        if from_dom == expected:
+            print(f"✅ {name}: {len(from_dom)} pasangan{text_note}")
+        else:
+            fixture_failures += 1
+            print(f"❌ {name}: DOM {sorted(from_dom)}\n   lxml {sorted(expected)}\n   teks {sorted(from_text)}")
+    print(f"\n0️⃣ Fixture: {len(fixtures) - fixture_failures}/{len(fixtures)} identik")
+
+if os.path.exists(CACHE_PATH):
+    cache = ResponseCache(CACHE_PATH)
+    dom = {key: json.loads(content) for key, url, content in cache.items(kind='crosses')}
+    texts = {key: content for key, url, content in cache.items(kind='text')}
+    cache.close()
+else:
+    dom, texts = {}, {}
+print(f"📦 Cache: {len(dom)} item punya tabel DOM, {len(texts)} item punya teks halaman")
+
+# 1. DOM vs parser teks pada halaman yang sama
+same = 0
+diffs = []
+for key, rows in dom.items():
+    if key not in texts:
+        continue
+    a, b = pair_set(rows), pair_set(parse_crosses_from_text(texts[key]))
+    if a == b:
+        same += 1
+    else:
+        diffs.append((key, len(a), len(b), sorted(a - b)[:3], sorted(b - a)[:3]))
+print(f"\n1️⃣ Halaman cache: {same} identik, {len(diffs)} berbeda")
+for key, n_dom, n_text, only_dom, only_text in diffs[:SHOW_DIFFS]:
+    print(f"   {key}: DOM {n_dom} vs teks {n_text} | hanya DOM {only_dom} | hanya teks {only_text}")
+
+# 2. DOM vs file hasil lama
+stored = {}
+for f in RESULT_FILES:
+    df = pd.read_excel(f, usecols=['Item Code', 'Owner', 'Number']).dropna(subset=['Owner', 'Number'])
+    for code, group in df.groupby('Item Code'):
+        stored.setdefault(normalize_key(code), set()).update(pair_set(group.to_dict('records')))
+print(f"\n2️⃣ File hasil lama: {len(RESULT_FILES)} file, {len(stored)} item dengan crosses")
+
+checked = matched = missing_dom = extra_dom = 0
+for key, old_pairs in stored.items():
+    if key not in dom:
+        continue
+    checked += 1
+    new_pairs = pair_set(dom[key])
+    matched += old_pairs == new_pairs
+    missing_dom += len(old_pairs - new_pairs)
+    extra_dom += len(new_pairs - old_pairs)
+print(f"   {checked} item dicek, {matched} identik")
+print(f"   pasangan hanya di file lama: {missing_dom} | pasangan baru dari DOM: {extra_dom}")
+
+if snapshots is None:
+    print("\n⚠️ Extractor DOM belum dicek terhadap fixture (butuh Chrome)")
+if fixture_failures:
+    sys.exit(1)
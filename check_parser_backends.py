@@ -0,0 +1,57 @@
+import glob
+import os
+import time
+import warnings
+
+from bs4 import BeautifulSoup
+
+from jikiu_crawler import JikiuCrawler
+from page_parsers import parse_specs_and_crosses
+from response_cache import ResponseCache
+
+# ===============================
+# KONFIGURASI
+# ===============================
+# Bandingkan backend parser bs4 (lama) vs lxml (page_parsers) pada halaman tersimpan:
+# hasil harus identik, lalu ukur waktu parse per halaman.
+FIXTURE_GLOB = 'fixtures/pages/*.html'
+CACHE_PATH = 'jikiu_cache.sqlite'  # halaman HTML asli dari JikiuCrawler (kalau ada)
+REPEAT = 50
+
+warnings.filterwarnings('ignore')  # soup.find(text=...) deprecation dari kode lama
+crawler = JikiuCrawler()
+
+
+def parse_bs4(content):
+    soup = BeautifulSoup(content, 'html.parser')
+    return crawler.extract_specifications(soup), crawler.extract_crosses(soup)
+
+
+pages = [(os.path.basename(f), open(f, 'rb').read()) for f in sorted(glob.glob(FIXTURE_GLOB))]
+if os.path.exists(CACHE_PATH):
+    cache = ResponseCache(CACHE_PATH)
+    pages += [(f"cache:{key}", content) for key, url, content in cache.items(kind='html')]
+    cache.close()
+
+print(f"📄 {len(pages)} halaman dibandingkan")
+mismatches = 0
+for name, content in pages:
+    expected = parse_bs4(content)
+    actual = parse_specs_and_crosses(content)
+    if expected != actual:
+        mismatches += 1
+        print(f"❌ {name}\n   bs4 : {expected}\n   lxml: {actual}")
+
+timings = {}
+for backend, fn in [('bs4', parse_bs4), ('lxml', parse_specs_and_crosses)]:
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        for _, content in pages:
+            fn(content)
+    timings[backend] = (time.perf_counter() - start) / (REPEAT * max(1, len(pages)))
+
+print(f"\n{'backend':8} {'ms/halaman':>11}")
+for backend, seconds in timings.items():
+    print(f"{backend:8} {seconds * 1000:11.3f}")
+print(f"\n⚡ Speedup lxml: {timings['bs4'] / timings['lxml']:.1f}x")
+print("✅ Semua hasil identik" if not mismatches else f"⚠️ {mismatches} halaman berbeda")
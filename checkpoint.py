@@ -0,0 +1,176 @@
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+
+import pandas as pd
+
+from item_codes import normalize_key
+
+
+def input_fingerprint(path, item_codes):
+    """Identity of a crawl input: file name plus the set of normalized codes"""
+    keys = sorted({normalize_key(code) for code in item_codes})
+    payload = os.path.basename(path) + '\n' + '\n'.join(keys)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+class CheckpointStore:
+    """Append-only, crash-safe progress store for the crawlers.
+
+    Every finished item is committed immediately as one SQLite row (WAL
+    mode, so each commit is a small O(1) append) instead of rewriting an
+    ever-growing Excel autosave. An item is keyed by its normalized item
+    code and keeps its result rows as JSON plus a status ('done' or
+    'error'); `position` remembers the input order for the final export
+    and `source` which path served the page (cache / http / browser).
+
+    A checkpoint belongs to one input: `start_run()` binds it to an
+    input fingerprint and starts a new run id, dropping rows that were
+    stored for a different input. With `max_age_days` set, 'done' rows
+    older than that are fetched again instead of being reused.
+    """
+
+    def __init__(self, path, max_age_days=None):
+        self.path = path
+        self.max_age_days = max_age_days
+        self.run_id = None
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS items (
+                key TEXT PRIMARY KEY,
+                item_code TEXT NOT NULL,
+                position INTEGER,
+                status TEXT NOT NULL,
+                rows TEXT NOT NULL,
+                updated_at REAL NOT NULL,
+                source TEXT,
+                run_id TEXT
+            )
+        """)
+        self.conn.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT)")
+        # Checkpoints created before the source / run were recorded
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(items)")}
+        for column in ('source', 'run_id'):
+            if column not in columns:
+                self.conn.execute(f"ALTER TABLE items ADD COLUMN {column} TEXT")
+        self.conn.commit()
+
+    def start_run(self, scope, resume=True):
+        """Bind the checkpoint to an input (see input_fingerprint) and start a run.
+
+        Stored rows are kept only when `resume` is set and they were written
+        for the same input; otherwise the checkpoint starts empty. Returns
+        the reason it was reset (None when rows may be reused).
+        """
+        with self.lock:
+            meta = dict(self.conn.execute("SELECT name, value FROM meta").fetchall())
+            has_rows = self.conn.execute("SELECT COUNT(*) FROM items").fetchone()[0] > 0
+            reset = None
+            if not resume:
+                reset = 'resume off'
+            elif has_rows and meta.get('scope') != scope:
+                reset = 'different input'
+            if reset:
+                self.conn.execute("DELETE FROM items")
+            self.run_id = datetime.now().strftime('%Y%m%d_%H%M%S')
+            self.conn.executemany("INSERT OR REPLACE INTO meta (name, value) VALUES (?, ?)",
+                                  [('scope', scope), ('run_id', self.run_id)])
+            self.conn.commit()
+        return reset
+
+    def record(self, item_code, rows, status='done', position=None, source=None):
+        """Commit the result rows of one item (replaces an earlier attempt)"""
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO items (key, item_code, position, status, rows, updated_at, source, run_id) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (normalize_key(item_code), str(item_code), position, status,
+                 json.dumps(rows, default=str), time.time(), source, self.run_id)
+            )
+            self.conn.commit()
+
+    def completed_keys(self):
+        """Normalized codes that finished successfully and are not older than
+        `max_age_days` (errors and stale rows are retried on resume)"""
+        oldest = time.time() - self.max_age_days * 86400 if self.max_age_days is not None else 0
+        with self.lock:
+            stored = self.conn.execute(
+                "SELECT key FROM items WHERE status = 'done' AND updated_at >= ?", (oldest,)
+            ).fetchall()
+        return {key for (key,) in stored}
+
+    def reused_runs(self, keys):
+        """Earlier runs the given keys were completed in: {run_id: number of items}"""
+        with self.lock:
+            stored = dict(self.conn.execute(
+                "SELECT key, COALESCE(run_id, 'unknown') FROM items WHERE COALESCE(run_id, '') != ?",
+                (self.run_id or '',)
+            ).fetchall())
+        return Counter(stored[key] for key in keys if key in stored)
+
+    def rows_for(self, item_codes, code_column='Item Code'):
+        """Stored rows for the given codes, in that order (codes without a checkpoint are skipped).
+
+        `code_column` is rewritten to the requested spelling of the code, so
+        'SE-6021.' still joins back to its input row when 'SE-6021' was stored.
+        """
+        with self.lock:
+            stored = dict(self.conn.execute("SELECT key, rows FROM items").fetchall())
+        rows = []
+        for code in item_codes:
+            payload = stored.get(normalize_key(code))
+            if payload is None:
+                continue
+            for row in json.loads(payload):
+                if code_column in row:
+                    row[code_column] = code
+                rows.append(row)
+        return rows
+
+    def sources(self):
+        """Number of stored items per source ('http', 'browser', 'cache', ...)"""
+        with self.lock:
+            stored = self.conn.execute("SELECT COALESCE(source, 'unknown') FROM items").fetchall()
+        return Counter(source for (source,) in stored)
+
+    def clear(self):
+        with self.lock:
+            self.conn.execute("DELETE FROM items")
+            self.conn.commit()
+
+    def rows(self):
+        """All stored result rows, in input order"""
+        with self.lock:
+            stored = self.conn.execute("SELECT rows FROM items ORDER BY position, updated_at").fetchall()
+        return [row for (payload,) in stored for row in json.loads(payload)]
+
+    def to_frame(self):
+        return pd.DataFrame(self.rows())
+
+    def __len__(self):
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM items").fetchone()[0]
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+if __name__ == "__main__":
+    # Export manual setelah crash: python checkpoint.py checkpoint_crosses.sqlite hasil.xlsx
+    if len(sys.argv) != 3:
+        print("Pemakaian: python checkpoint.py <checkpoint.sqlite> <output.xlsx>")
+        sys.exit(1)
+    store = CheckpointStore(sys.argv[1])
+    store.to_frame().to_excel(sys.argv[2], index=False)
+    print(f"💾 {len(store)} item diekspor ke {sys.argv[2]}")
+    store.close()
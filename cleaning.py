@@ -0,0 +1,60 @@
+# Column schema of the final crosses file (canonical name -> accepted header aliases).
+# Order = column order of the final file. Aliases are matched exactly after
+# lower-casing and collapsing whitespace; earlier aliases win.
+COLUMN_ALIASES = {
+    "Brand": ["brand"],
+    "ItemCode": ["item code", "itemcode", "item_code", "kode item"],
+    "Car Maker Name": ["car maker name", "car maker"],
+    "Car Model Name": ["car model name", "car model"],
+    "Car Chassis Name": ["car chassis name", "chassis"],
+    "Car EngineDesc Name": ["car enginedesc name", "car engine desc name", "engine"],
+    "Car Vehicle Name": ["car vehicle name", "vehicle"],
+    "Year From": ["year from"],
+    "Year To": ["year to"],
+    "OEM No.": ["oem no.", "oem no", "oem"],
+    "Part Description": ["part description"],
+    "Alias Name": ["alias name", "alias"],
+    "Print Description": ["print description"],
+    "Owner": ["owner"],
+    "Number": ["number"],
+}
+
+
+def header_key(col):
+    """Header as compared against the aliases: ' Car  Maker ' -> 'car maker'"""
+    return " ".join(str(col).split()).lower()
+
+
+def resolve_columns(df, source):
+    """{canonical name: original column} for one file.
+
+    A column matching more than one canonical name, or one alias matching
+    several columns, raises ValueError.
+    """
+    normalized = {}
+    for col in df.columns:
+        normalized.setdefault(header_key(col), []).append(col)
+
+    resolved = {}
+    for canonical, aliases in COLUMN_ALIASES.items():
+        for alias in aliases:
+            matches = normalized.get(alias, [])
+            if len(matches) > 1:
+                raise ValueError(f"❌ {source}: kolom {matches} ambigu untuk '{canonical}'")
+            if matches:
+                resolved[canonical] = matches[0]
+                break
+
+    claimed = {}
+    for canonical, col in resolved.items():
+        if col in claimed:
+            raise ValueError(f"❌ {source}: kolom '{col}' cocok untuk '{claimed[col]}' dan '{canonical}'")
+        claimed[col] = canonical
+    return resolved
+
+
+def canonical_columns(df, source):
+    """`df` with schema columns renamed to their canonical names; other
+    headers are lower-cased with whitespace collapsed"""
+    renamed = {col: canonical for canonical, col in resolve_columns(df, source).items()}
+    return df.set_axis([renamed.get(col, header_key(col)) for col in df.columns], axis=1)
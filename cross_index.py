@@ -0,0 +1,306 @@
+import json
+import os
+import re
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from frame_store import read_table
+from item_codes import canonical_keys, clean_codes
+
+INDEX_DIR = 'cross_index'
+ALPHABET = '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+GRAM = 3
+N_GRAMS = len(ALPHABET) ** GRAM
+MIN_TOKEN = 5  # shorter pieces of a multi-number cell ('5354', '60') are not looked up
+
+# Column names accepted in a crosses file (lower-cased, first match wins)
+SOURCE_COLUMNS = {
+    'item code': ['item code', 'itemcode', 'item_code'],
+    'owner': ['owner'],
+    'number': ['number'],
+}
+ARRAYS = ['numbers', 'offsets', 'post_item', 'post_owner', 'post_raw',
+          'items', 'owners', 'raws', 'gram_offsets', 'gram_numbers']
+
+_NOT_ALNUM = re.compile(r'[^0-9A-Z]')
+_CELL_SEPARATORS = re.compile(r'[\s,;]+')
+
+
+def fold_number(value):
+    """Comparable form of a part number: upper case, only letters and digits
+    ('48820 v2010', '48820-V2010' and '48820.V2010' all become '48820V2010')"""
+    return _NOT_ALNUM.sub('', str(value).upper())
+
+
+def fold_numbers(values):
+    """Vectorized fold_number over a Series (missing values stay missing)"""
+    return values.astype('string').str.upper().str.replace(r'[^0-9A-Z]', '', regex=True)
+
+
+def cell_candidates(value):
+    """Numbers to try for one input cell, most specific first.
+
+    OEM cells often hold several numbers ('53540-SA0/SB2-00 53540-SC2-004',
+    '40110-01G26/B9500'): the whole cell is tried, then every piece split on
+    whitespace / ',' / ';' and on '/', skipping pieces shorter than MIN_TOKEN.
+    """
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return []
+    text = str(value).strip()
+    pieces = [text] + _CELL_SEPARATORS.split(text)
+    pieces += [part for piece in pieces if '/' in piece for part in piece.split('/')]
+    candidates = []
+    for piece in pieces:
+        folded = fold_number(piece)
+        if len(folded) >= MIN_TOKEN and folded not in candidates:
+            candidates.append(folded)
+    return candidates
+
+
+def _grams(folded):
+    """Trigram ids of a folded number (ALPHABET is base 36)"""
+    digits = [ALPHABET.index(ch) for ch in folded]
+    return {
+        (digits[i] * 36 + digits[i + 1]) * 36 + digits[i + 2]
+        for i in range(len(digits) - GRAM + 1)
+    }
+
+
+def _encode(values):
+    return np.array([str(v).encode('utf-8') for v in values], dtype=bytes) if len(values) else np.array([], dtype='S1')
+
+
+class CrossIndex:
+    """Inverted index: folded competitor / OEM number → Jikiu item codes.
+
+    Built from the Owner / Number pairs of a crosses output and stored as
+    a folder of .npy arrays that `load()` memory-maps, so opening even a
+    large index costs almost nothing and pages are read on demand:
+
+        numbers       sorted unique folded numbers (fixed-width bytes)
+        offsets       numbers[i] owns postings offsets[i]:offsets[i+1]
+        post_*        per posting: item code / owner / original spelling ids
+        gram_*        trigram → ids of the numbers containing it
+
+    `lookup()` answers a whole column in one call, matching exactly, by
+    prefix or by fragment ('contains', through the trigram lists).
+    """
+
+    def __init__(self, arrays, meta=None):
+        for name in ARRAYS:
+            setattr(self, name, arrays[name])
+        self.meta = meta or {}
+
+    # ---------- build / save / load ----------
+
+    @classmethod
+    def build(cls, crosses, code_column='item code', owner_column='owner', number_column='number'):
+        codes = crosses[code_column].astype('string')
+        df = pd.DataFrame({
+            'key': canonical_keys(codes),
+            'item': clean_codes(codes),
+            'owner': crosses[owner_column].astype('string').str.strip().fillna(''),
+            'raw': crosses[number_column].astype('string').str.strip(),
+        })
+        df['folded'] = fold_numbers(df['raw'])
+        df = df[df['key'].fillna('').ne('') & df['folded'].fillna('').ne('')]
+        # 'SL-3870.' and 'sl-3870' are one item, shown with the first cleaned spelling
+        df['item'] = df.groupby('key')['item'].transform('first')
+        df = df.drop_duplicates(subset=['folded', 'key', 'owner']).sort_values(['folded', 'key'], kind='stable')
+
+        items, item_ids = np.unique(df['item'].to_numpy(dtype=str), return_inverse=True)
+        owners, owner_ids = np.unique(df['owner'].to_numpy(dtype=str), return_inverse=True)
+        raws, raw_ids = np.unique(df['raw'].to_numpy(dtype=str), return_inverse=True)
+        folded = df['folded'].to_numpy(dtype=str)
+        numbers, starts = np.unique(folded, return_index=True)
+        offsets = np.append(starts, len(folded)).astype(np.int32)
+
+        # trigram postings: (gram, number id) pairs sorted by gram
+        pairs = sorted((gram, i) for i, number in enumerate(numbers) for gram in _grams(number))
+        grams = np.array([g for g, _ in pairs], dtype=np.int32)
+        gram_offsets = np.searchsorted(grams, np.arange(N_GRAMS + 1)).astype(np.int32)
+        gram_numbers = np.array([i for _, i in pairs], dtype=np.int32)
+
+        arrays = {
+            'numbers': _encode(numbers), 'offsets': offsets,
+            'post_item': item_ids.astype(np.int32), 'post_owner': owner_ids.astype(np.int32),
+            'post_raw': raw_ids.astype(np.int32),
+            'items': _encode(items), 'owners': _encode(owners), 'raws': _encode(raws),
+            'gram_offsets': gram_offsets, 'gram_numbers': gram_numbers,
+        }
+        meta = {'built_at': datetime.now().isoformat(timespec='seconds'),
+                'numbers': len(numbers), 'postings': len(folded), 'items': len(items)}
+        return cls(arrays, meta)
+
+    @classmethod
+    def from_files(cls, files):
+        """Index the crosses of one or more crosses files (.xlsx / .parquet / .feather)"""
+        frames = []
+        for f in files:
+            df = read_table(f)
+            lowered = {str(col).strip().lower(): col for col in df.columns}
+            picked = {}
+            for name, aliases in SOURCE_COLUMNS.items():
+                col = next((lowered[a] for a in aliases if a in lowered), None)
+                if col is None:
+                    raise ValueError(f"❌ {f}: kolom '{name}' tidak ditemukan")
+                picked[name] = df[col]
+            frames.append(pd.DataFrame(picked))
+        index = cls.build(pd.concat(frames, ignore_index=True))
+        index.meta['sources'] = [os.path.basename(f) for f in files]
+        return index
+
+    def save(self, path=INDEX_DIR):
+        os.makedirs(path, exist_ok=True)
+        for name in ARRAYS:
+            np.save(os.path.join(path, f"{name}.npy"), getattr(self, name))
+        with open(os.path.join(path, 'meta.json'), 'w') as f:
+            json.dump(self.meta, f, indent=2)
+        return path
+
+    @classmethod
+    def load(cls, path=INDEX_DIR):
+        """Memory-map a saved index (nothing is read until it is queried)"""
+        arrays = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode='r') for name in ARRAYS}
+        with open(os.path.join(path, 'meta.json')) as f:
+            meta = json.load(f)
+        return cls(arrays, meta)
+
+    # ---------- matching ----------
+
+    def _postings(self, number_id):
+        start, end = self.offsets[number_id], self.offsets[number_id + 1]
+        return [
+            {'item code': self.items[self.post_item[p]].decode('utf-8'),
+             'owner': self.owners[self.post_owner[p]].decode('utf-8'),
+             'number': self.raws[self.post_raw[p]].decode('utf-8')}
+            for p in range(start, end)
+        ]
+
+    def _exact_ids(self, folded):
+        """Number id per folded query (-1 = no match), vectorized binary search"""
+        queries = _encode(folded)
+        if not len(queries) or not len(self.numbers):
+            return np.full(len(queries), -1)
+        pos = np.searchsorted(self.numbers, queries)
+        safe = np.minimum(pos, len(self.numbers) - 1)
+        return np.where(self.numbers[safe] == queries, safe, -1)
+
+    def _prefix_ids(self, folded, limit):
+        prefix = folded.encode('utf-8')
+        lo = np.searchsorted(self.numbers, prefix)
+        hi = np.searchsorted(self.numbers, prefix + b'\xff')
+        return range(lo, min(hi, lo + limit))
+
+    def _contains_ids(self, folded, limit):
+        if len(folded) < GRAM:
+            hits = np.flatnonzero(np.char.find(self.numbers, folded.encode('utf-8')) >= 0)
+            return hits[:limit]
+        candidates = None
+        # intersect the trigram lists, shortest first
+        lists = sorted((self.gram_numbers[self.gram_offsets[g]:self.gram_offsets[g + 1]] for g in _grams(folded)),
+                       key=len)
+        for ids in lists:
+            candidates = ids if candidates is None else np.intersect1d(candidates, ids, assume_unique=True)
+            if not len(candidates):
+                return []
+        needle = folded.encode('utf-8')
+        return [i for i in candidates if needle in self.numbers[i]][:limit]
+
+    def match(self, number, mode='exact', limit=50):
+        """Crosses for one number: list of {'item code', 'owner', 'number'} dicts"""
+        folded = fold_number(number)
+        if not folded:
+            return []
+        if mode == 'exact':
+            ids = [i for i in self._exact_ids([folded]) if i >= 0]
+        elif mode == 'prefix':
+            ids = self._prefix_ids(folded, limit)
+        elif mode == 'contains':
+            ids = self._contains_ids(folded, limit)
+        else:
+            raise ValueError(f"Unknown match mode {mode!r} (exact / prefix / contains)")
+        return [posting for i in ids for posting in self._postings(i)]
+
+    def lookup(self, values, mode='exact', limit=50):
+        """Batch lookup of a column: one row per (input position, matched cross).
+
+        Columns: position, query, item code, owner, number. Every cell is
+        split with cell_candidates(); exact mode resolves all candidates of
+        all cells in a single vectorized search.
+        """
+        values = list(values)
+        candidates = [(pos, value, folded) for pos, value in enumerate(values) for folded in cell_candidates(value)]
+        rows = []
+        if mode == 'exact':
+            ids = self._exact_ids([folded for _, _, folded in candidates])
+            matched = [(pos, value, i) for (pos, value, _), i in zip(candidates, ids) if i >= 0]
+        else:
+            matched = [(pos, value, i) for pos, value, folded in candidates
+                       for i in (self._prefix_ids(folded, limit) if mode == 'prefix'
+                                 else self._contains_ids(folded, limit))]
+        seen = set()
+        for pos, value, i in matched:
+            for posting in self._postings(i):
+                key = (pos, posting['item code'], posting['number'])
+                if key not in seen:
+                    seen.add(key)
+                    rows.append({'position': pos, 'query': value, **posting})
+        return pd.DataFrame(rows, columns=['position', 'query', 'item code', 'owner', 'number'])
+
+    def annotate(self, df, column='OEM No.', mode='exact', limit=50):
+        """`df` plus 'Jikiu Item Code' / 'Jikiu Match' columns ('; '-joined,
+        empty when nothing matched) for the numbers in `column`"""
+        found = self.lookup(df[column], mode=mode, limit=limit)
+        found['match'] = found['owner'] + ': ' + found['number']
+        grouped = found.groupby('position')
+        codes = grouped['item code'].agg(lambda s: '; '.join(dict.fromkeys(s)))
+        matches = grouped['match'].agg('; '.join)
+        positions = np.arange(len(df))
+        return df.assign(**{
+            'Jikiu Item Code': codes.reindex(positions, fill_value='').to_numpy(),
+            'Jikiu Match': matches.reindex(positions, fill_value='').to_numpy(),
+        })
+
+    def __len__(self):
+        return len(self.numbers)
+
+
+if __name__ == "__main__":
+    # python cross_index.py build <crosses file> [...]       → simpan index di cross_index/
+    # python cross_index.py query <nomor> [exact|prefix|contains]
+    # python cross_index.py lookup <excel> [kolom] [mode]    → kolom default 'OEM No.'
+    if len(sys.argv) < 3 or sys.argv[1] not in ('build', 'query', 'lookup'):
+        print("Pemakaian: python cross_index.py build <crosses.xlsx> [...] | query <nomor> [mode] | "
+              "lookup <excel> [kolom] [mode]")
+        sys.exit(1)
+
+    command = sys.argv[1]
+    start = time.perf_counter()
+    if command == 'build':
+        index = CrossIndex.from_files(sys.argv[2:])
+        path = index.save()
+        print(f"🗂️ {index.meta['numbers']} nomor unik, {index.meta['postings']} pasangan, "
+              f"{index.meta['items']} item code → {path}/ ({time.perf_counter() - start:.2f} s)")
+        sys.exit(0)
+
+    index = CrossIndex.load()
+    if command == 'query':
+        mode = sys.argv[3] if len(sys.argv) > 3 else 'exact'
+        for hit in index.match(sys.argv[2], mode=mode):
+            print(f"{hit['item code']:15} {hit['owner']:20} {hit['number']}")
+        print(f"⚡ {(time.perf_counter() - start) * 1000:.1f} ms")
+    else:
+        column = sys.argv[3] if len(sys.argv) > 3 else 'OEM No.'
+        mode = sys.argv[4] if len(sys.argv) > 4 else 'exact'
+        df = pd.read_excel(sys.argv[2])
+        result = index.annotate(df, column=column, mode=mode)
+        output_file = f"cross_lookup_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
+        result.to_excel(output_file, index=False)
+        matched = result['Jikiu Item Code'].ne('').sum()
+        print(f"⚡ {matched}/{len(result)} baris cocok ({mode}) dalam {time.perf_counter() - start:.2f} s")
+        print(f"💾 Hasil: {output_file}")
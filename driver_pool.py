@@ -0,0 +1,174 @@
+import queue
+import threading
+import time
+from contextlib import contextmanager
+
+from selenium import webdriver
+from selenium.webdriver.support.ui import WebDriverWait
+
+LAUNCH_RETRY_S = 5  # pause between Chrome start attempts
+
+
+class PooledDriver:
+    """One warm Chrome instance plus its WebDriverWait and page counter"""
+
+    def __init__(self, driver, wait_timeout):
+        self.driver = driver
+        self.wait = WebDriverWait(driver, wait_timeout)
+        self.pages = 0
+
+    def is_healthy(self):
+        """Cheap round-trip to the browser; False if the session is gone"""
+        try:
+            self.driver.execute_script("return 1")
+            return True
+        except Exception:
+            return False
+
+    def quit(self):
+        try:
+            self.driver.quit()
+        except Exception:
+            pass
+
+
+class DriverPool:
+    """Pool of N headless browsers handed out to worker threads.
+
+    Browsers are recycled after `max_pages` page loads (instead of a
+    hard-coded restart every 100 items) and crashed ones are replaced by a
+    background thread, so workers never wait for Chrome to start.
+    `setup` is called with every freshly started driver (e.g.
+    jikiu_browser.block_heavy_resources).
+
+    Each start is tried `launch_attempts` times. If no browser starts at
+    all the constructor raises RuntimeError, and `acquire()` raises once
+    every browser has died and no replacement is starting (or after
+    `acquire_timeout` seconds), so a missing / broken Chrome never hangs
+    the caller.
+
+        pool = DriverPool(options, size=4)
+        with pool.driver() as browser:
+            browser.driver.get(url)
+            browser.pages += 1
+        pool.close()
+    """
+
+    def __init__(self, options, size=4, max_pages=100, wait_timeout=15, page_load_timeout=60, setup=None,
+                 launch_attempts=3, acquire_timeout=300):
+        self.options = options
+        self.setup = setup
+        self.size = size
+        self.max_pages = max_pages
+        self.wait_timeout = wait_timeout
+        self.page_load_timeout = page_load_timeout
+        self.launch_attempts = launch_attempts
+        self.acquire_timeout = acquire_timeout
+        self.idle = queue.Queue()
+        self.closed = False
+        self.restarts = 0
+        self.lock = threading.Lock()
+        self.all_drivers = set()
+        self.starting = 0
+        self.launch_error = None
+
+        # start all browsers in parallel
+        starters = [self._start_replacement(daemon=False) for _ in range(size)]
+        for t in starters:
+            t.join()
+        if not self.all_drivers:
+            raise RuntimeError(f"Chrome tidak bisa dijalankan setelah {launch_attempts} percobaan: {self.launch_error}")
+        if len(self.all_drivers) < size:
+            print(f"⚠️ Hanya {len(self.all_drivers)} dari {size} browser yang jalan")
+
+    def _start_replacement(self, daemon=True):
+        with self.lock:
+            self.starting += 1
+        thread = threading.Thread(target=self._add_driver, daemon=daemon)
+        thread.start()
+        return thread
+
+    def _launch(self):
+        driver = webdriver.Chrome(options=self.options)
+        driver.set_page_load_timeout(self.page_load_timeout)
+        if self.setup:
+            self.setup(driver)
+        browser = PooledDriver(driver, self.wait_timeout)
+        with self.lock:
+            self.all_drivers.add(browser)
+        return browser
+
+    def _add_driver(self):
+        """Launch a browser and put it in the idle queue (up to `launch_attempts` tries)"""
+        try:
+            for attempt in range(1, self.launch_attempts + 1):
+                if self.closed:
+                    return
+                try:
+                    self.idle.put(self._launch())
+                    return
+                except Exception as e:
+                    self.launch_error = e
+                    print(f"⚠️ Gagal start Chrome (percobaan {attempt}/{self.launch_attempts}): {e}")
+                    if attempt < self.launch_attempts:
+                        time.sleep(LAUNCH_RETRY_S)
+        finally:
+            with self.lock:
+                self.starting -= 1
+
+    def _retire(self, browser):
+        """Quit a browser and start its replacement in the background"""
+        with self.lock:
+            self.all_drivers.discard(browser)
+            self.restarts += 1
+        browser.quit()
+        if not self.closed:
+            self._start_replacement()
+
+    def acquire(self, timeout=None):
+        """Take a healthy browser from the pool (waits up to `timeout`, default
+        `acquire_timeout`, seconds; RuntimeError when the pool has no browsers left)"""
+        deadline = time.monotonic() + (self.acquire_timeout if timeout is None else timeout)
+        while True:
+            try:
+                browser = self.idle.get(timeout=1)
+            except queue.Empty:
+                with self.lock:
+                    dead = not self.all_drivers and not self.starting
+                if dead:
+                    raise RuntimeError(f"Semua browser di pool mati dan tidak bisa di-start ulang: {self.launch_error}")
+                if time.monotonic() >= deadline:
+                    raise TimeoutError("Tidak ada browser yang bebas dalam batas waktu")
+                continue
+            if browser.is_healthy():
+                return browser
+            self._retire(browser)
+
+    def release(self, browser, failed=False):
+        """Give a browser back; recycle it if worn out or broken"""
+        if self.closed:
+            browser.quit()
+        elif browser.pages >= self.max_pages or (failed and not browser.is_healthy()):
+            self._retire(browser)
+        else:
+            self.idle.put(browser)
+
+    @contextmanager
+    def driver(self, timeout=None):
+        browser = self.acquire(timeout)
+        failed = False
+        try:
+            yield browser
+        except Exception:
+            failed = True
+            raise
+        finally:
+            self.release(browser, failed)
+
+    def close(self):
+        self.closed = True
+        with self.lock:
+            drivers = list(self.all_drivers)
+            self.all_drivers.clear()
+        for browser in drivers:
+            browser.quit()
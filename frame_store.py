@@ -0,0 +1,79 @@
+import glob
+import hashlib
+import os
+
+import pandas as pd
+
+# Intermediate files between merge stages; .xlsx is only written as a final export
+INTERMEDIATE_FORMAT = 'parquet'  # 'parquet' or 'feather'
+COLUMNAR_SUFFIXES = ('.parquet', '.feather')
+TABLE_SUFFIXES = COLUMNAR_SUFFIXES + ('.xlsx',)
+SIDECAR_DIR = os.path.join('.pipeline_cache', 'xlsx')  # Parquet copies of .xlsx inputs
+
+
+def typed(df):
+    """Give every column a single Arrow-compatible dtype.
+
+    Columns that mix numbers and text (e.g. 'Year To' holding 2015 and 'ON')
+    become pandas string columns; everything else keeps its dtype.
+    """
+    mixed = [
+        col for col in df.columns
+        if df[col].dtype == object and df[col].dropna().map(type).nunique() > 1
+    ]
+    if not mixed:
+        return df
+    return df.astype({col: 'string' for col in mixed})
+
+
+def columnar_sidecar(path):
+    """Parquet copy of an .xlsx input, kept in SIDECAR_DIR (not next to the workbook)"""
+    digest = hashlib.sha1(os.path.abspath(path).encode('utf-8')).hexdigest()[:12]
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(SIDECAR_DIR, f"{stem}-{digest}.parquet")
+
+
+def read_table(path):
+    """Load a pipeline table (.parquet / .feather / .xlsx).
+
+    An .xlsx input is converted once to a Parquet copy in SIDECAR_DIR, so
+    later stages (and re-runs) skip openpyxl as long as the workbook is
+    not modified again. Nothing is written next to the input itself.
+    """
+    suffix = os.path.splitext(path)[1].lower()
+    if suffix == '.parquet':
+        return pd.read_parquet(path)
+    if suffix == '.feather':
+        return pd.read_feather(path)
+
+    sidecar = columnar_sidecar(path)
+    if os.path.exists(sidecar) and os.path.getmtime(sidecar) >= os.path.getmtime(path):
+        return pd.read_parquet(sidecar)
+    df = typed(pd.read_excel(path))
+    try:
+        os.makedirs(SIDECAR_DIR, exist_ok=True)
+        df.to_parquet(sidecar, index=False)
+    except OSError:
+        pass  # read-only folder: just read the workbook every time
+    return df
+
+
+def write_table(df, stem, fmt=INTERMEDIATE_FORMAT):
+    """Write `df` as `<stem>.<fmt>` (parquet / feather / xlsx) and return the path"""
+    path = f"{stem}.{fmt}"
+    if fmt == 'xlsx':
+        df.to_excel(path, index=False)
+    elif fmt == 'feather':
+        typed(df).reset_index(drop=True).to_feather(path)
+    else:
+        typed(df).to_parquet(path, index=False)
+    return path
+
+
+def latest_table(prefix, suffixes=TABLE_SUFFIXES):
+    """Most recently modified table whose name starts with `prefix` (None if there is none)"""
+    candidates = [
+        f for f in glob.glob(f"{glob.escape(prefix)}*")
+        if f.lower().endswith(suffixes) and not os.path.basename(f).startswith('~$')
+    ]
+    return max(candidates, key=os.path.getmtime) if candidates else None
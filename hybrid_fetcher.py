@@ -0,0 +1,174 @@
+import json
+import threading
+
+import requests
+
+from jikiu_browser import fetch_search_page
+from jikiu_crawler import JikiuCrawler
+from jikiu_pages import analyze_page_text
+from metrics import NO_METRICS
+from page_parsers import page_text, parse_specs_and_crosses
+
+FOUND_MARKER = "Search Result for"
+
+
+def static_page(code, content):
+    """Read a search page from its plain HTML.
+
+    Returns (page_text, crosses, reason). `crosses` uses the browser's
+    {'Owner', 'Number'} rows (None = let the text parser decide) and
+    `reason` is None when the HTML alone answers the search, otherwise
+    why a browser render is needed: 'no_markers' (JS-rendered shell
+    without a result or not-found message) or 'empty_result' (result
+    header but neither specifications nor crosses in the markup).
+    """
+    text = page_text(content)
+    status = analyze_page_text(code, text)['status']
+    if status == "NOT FOUND":
+        return text, None, None
+    # analyze_page_text also accepts the bare code, which a shell page can echo back
+    if status != "FOUND" or FOUND_MARKER not in text:
+        return text, None, 'no_markers'
+    specs, crosses = parse_specs_and_crosses(content)
+    if not specs and not crosses:
+        return text, None, 'empty_result'
+    return text, [{'Owner': c['owner'], 'Number': c['number']} for c in crosses] or None, None
+
+
+class HybridFetcher:
+    """Search pages over plain HTTP first, pooled Chrome only when needed.
+
+    Drop-in for jikiu_browser.fetch_search_page: `fetch(code)` returns
+    (page_text, crosses, source) with source 'cache', 'http', 'browser',
+    'rate limited' or 'gagal'; page_text is None for the last two. The
+    HTTP path reuses JikiuCrawler's keep-alive session and its ETag /
+    Last-Modified revalidation. An HTTP 429 is retried up to `attempts`
+    times, each retry waiting out the limiter's backoff / Retry-After;
+    a page is handed to the browser only when the request fails or
+    static_page() finds the HTML incomplete. The DriverPool is built by `pool_factory`
+    on the first fallback, so a run the HTML fully answers never starts
+    Chrome. Every page counts as `source_<source>` and every fallback as
+    `fallback_<reason>` in `metrics`.
+    """
+
+    def __init__(self, limiter, cache, pool_factory, attempts=2, metrics=NO_METRICS,
+                 http_first=True, pool_size=4, timeout=10):
+        self.limiter = limiter
+        self.cache = cache
+        self.pool_factory = pool_factory
+        self.attempts = attempts
+        self.metrics = metrics
+        self.http_first = http_first
+        self.timeout = timeout
+        self.crawler = JikiuCrawler(rate_limiter=limiter, cache=cache, pool_size=pool_size, metrics=metrics)
+        self.pool = None
+        self.pool_error = None
+        self.lock = threading.Lock()
+
+    def browser_pool(self):
+        """DriverPool, started on first use (None when Chrome could not be started)"""
+        with self.lock:
+            if self.pool is None and self.pool_error is None:
+                try:
+                    self.pool = self.pool_factory()
+                except RuntimeError as e:
+                    # no retry per page: every later fallback fails fast
+                    self.pool_error = e
+                    print(f"❌ Browser tidak bisa dipakai, halaman yang butuh browser dilewati: {e}")
+            return self.pool
+
+    def fetch_browser(self, code):
+        pool = self.browser_pool()
+        if pool is None:
+            self.metrics.count('failed')
+            return None, None, 'gagal'
+        return fetch_search_page(pool, self.limiter, self.cache, code,
+                                 attempts=self.attempts, metrics=self.metrics)
+
+    @property
+    def restarts(self):
+        return self.pool.restarts if self.pool is not None else 0
+
+    def store(self, code, text, crosses, url):
+        with self.metrics.timer('cache_store'):
+            self.cache.put(code, text, kind='text', url=url)
+            if crosses is not None:
+                self.cache.put(code, json.dumps(crosses), kind='crosses', url=url)
+
+    def fetch_http(self, code):
+        """(page_text, crosses, reason) from one plain GET; reason as in static_page,
+        'http_error' for a failed request or 'rate limited' for HTTP 429
+        (page_text is None for both)"""
+        url = self.crawler.search_url(code)
+        stored, headers = self.crawler.conditional_headers(code)
+        try:
+            with self.metrics.timer('rate_wait'):
+                self.limiter.acquire()
+            with self.metrics.timer('http_fetch'):
+                response = self.crawler.session.get(url, headers=headers, timeout=self.timeout)
+        except requests.exceptions.RequestException:
+            self.limiter.report(error=True)
+            return None, None, 'http_error'
+
+        self.limiter.report(response.status_code, retry_after=response.headers.get('Retry-After'))
+        if response.status_code == 429:
+            return None, None, 'rate limited'
+        if response.status_code == 304 and stored is not None:
+            self.metrics.count('not_modified')
+            self.cache.revalidated(code)
+            content = stored
+        elif response.ok:
+            self.metrics.count('bytes_downloaded', len(response.content))
+            content = response.content
+        else:
+            return None, None, 'http_error'
+
+        with self.metrics.timer('parse_html'):
+            text, crosses, reason = static_page(code, content)
+        if reason is None:
+            if content is not stored:
+                self.cache.put(code, response.text, url=url, etag=response.headers.get('ETag'),
+                               last_modified=response.headers.get('Last-Modified'))
+            self.store(code, text, crosses, url)
+        return text, crosses, reason
+
+    def fetch(self, code):
+        if not self.http_first:
+            return self.fetch_browser(code)
+
+        # Rendered text saved by any script, or raw HTML saved by JikiuCrawler
+        with self.metrics.timer('cache_lookup'):
+            text = self.cache.get(code, kind='text')
+            cached_crosses = self.cache.get(code, kind='crosses') if text is not None else None
+            html = self.cache.get(code) if text is None else None
+        if text is not None:
+            self.metrics.count('source_cache')
+            return text, json.loads(cached_crosses) if cached_crosses else None, 'cache'
+        if html is not None:
+            text, crosses, reason = static_page(code, html)
+            if reason is None:
+                self.metrics.count('source_cache')
+                return text, crosses, 'cache'
+
+        for attempt in range(self.attempts):
+            if attempt:
+                self.metrics.count('retries')
+            text, crosses, reason = self.fetch_http(code)
+            if reason != 'rate limited':
+                break
+            # the next acquire() waits for the backoff the 429 just triggered
+            self.metrics.count('rate_limited')
+        if reason is None:
+            self.metrics.count('source_http')
+            return text, crosses, 'http'
+        if reason == 'rate limited':
+            self.metrics.count('failed')
+            return None, None, 'rate limited'
+
+        self.metrics.count(f'fallback_{reason}')
+        return self.fetch_browser(code)
+
+    def close(self):
+        self.crawler.session.close()
+        if self.pool is not None:
+            self.pool.close()
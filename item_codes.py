@@ -0,0 +1,49 @@
+import pandas as pd
+
+KEY_COLUMN = 'item_key'
+
+
+def clean_code(item_code):
+    """Code as sent to the catalogue search: 'SE-6021. ' -> 'SE-6021' (case kept)"""
+    return str(item_code).strip().rstrip('.')
+
+
+def normalize_key(item_code):
+    """Canonical key for an item code: 'se-6021. ' and 'SE-6021' share one key"""
+    return clean_code(item_code).upper()
+
+
+def clean_codes(codes):
+    """Vectorized clean_code over a Series (missing values stay missing)"""
+    return codes.astype('string').str.strip().str.rstrip('.')
+
+
+def canonical_keys(codes):
+    """Vectorized normalize_key over a Series (missing values stay missing)"""
+    return clean_codes(codes).str.upper()
+
+
+def unique_codes(codes):
+    """First spelling of every distinct key, in input order (empty codes dropped)"""
+    keys = canonical_keys(codes)
+    keep = ~keys.duplicated() & keys.fillna('').ne('')
+    return codes[keep.to_numpy()].astype(str).tolist()
+
+
+def with_key(df, code_column, key_column=KEY_COLUMN):
+    """Copy of `df` with the canonical key of `code_column` in `key_column`"""
+    return df.assign(**{key_column: canonical_keys(df[code_column])})
+
+
+def merge_on_key(left, right, left_on, right_on, how='left', key_column=KEY_COLUMN, **kwargs):
+    """pd.merge on the canonical keys of two code columns.
+
+    Both original code columns are kept; the helper key column is dropped
+    from the result.
+    """
+    merged = pd.merge(
+        with_key(left, left_on, key_column),
+        with_key(right, right_on, key_column),
+        on=key_column, how=how, **kwargs
+    )
+    return merged.drop(columns=key_column)
@@ -0,0 +1,211 @@
+import json
+import time
+from urllib.parse import quote
+
+from selenium import webdriver
+from selenium.common.exceptions import TimeoutException
+
+from metrics import NO_METRICS
+
+CATALOGUE_URL = "https://www.jikiu.com/catalogue"
+
+# Resource yang tidak dibutuhkan karena kita hanya baca body.text.
+# CSS sengaja tidak diblok: innerText bergantung pada display/visibility.
+BLOCKED_URL_PATTERNS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico",
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+    "*.mp4", "*.webm", "*.mp3",
+]
+
+# Semua domain selain jikiu.com (analytics, tracker, CDN font) tidak di-resolve
+LEAN_HOST_RULES = "MAP * ~NOTFOUND , EXCLUDE jikiu.com , EXCLUDE *.jikiu.com"
+
+LEAN_CHROME_ARGS = [
+    "--window-size=1280,800",
+    "--blink-settings=imagesEnabled=false",
+    "--disable-extensions",
+    "--disable-gpu",
+    "--disable-dev-shm-usage",
+    "--disable-background-networking",
+    "--disable-default-apps",
+    "--disable-sync",
+    "--disable-notifications",
+    "--disable-component-update",
+    "--disable-features=Translate,MediaRouter,OptimizationHints,AutofillServerCommunication",
+    "--no-first-run",
+    "--mute-audio",
+]
+
+# Teks yang menandakan halaman hasil sudah selesai dirender
+RESULT_MARKERS = ["Search Result for", "No data found", "0 result", "Too Many Requests"]
+
+_RESULTS_RENDERED_JS = """
+var text = document.body ? document.body.innerText : '';
+var markers = arguments[0];
+for (var i = 0; i < markers.length; i++) {
+    if (text.indexOf(markers[i]) >= 0) { return true; }
+}
+return false;
+"""
+
+
+# Satu kali round-trip ke browser: teks halaman + tabel Crosses sebagai baris JSON.
+# Header tabel dicari dari sel "Owner" yang diikuti sel "Number"; baris data diambil
+# dari baris-baris berikutnya (tabel / div per baris) atau pasangan sel berikutnya
+# kalau semua sel ada dalam satu grid. crosses = null kalau header tidak ditemukan.
+_PAGE_SNAPSHOT_JS = """
+function txt(el) { return ((el && (el.innerText || el.textContent)) || '').trim(); }
+function crossesTable() {
+    var candidates = document.querySelectorAll('th, td, div, span, li, dt, dd, b, strong');
+    for (var k = 0; k < candidates.length; k++) {
+        var head = candidates[k];
+        if (head.children.length > 0 || txt(head).toLowerCase() !== 'owner') { continue; }
+        var next = head.nextElementSibling;
+        if (!next || txt(next).toLowerCase() !== 'number') { continue; }
+
+        var row = head.parentElement;
+        var cells = Array.prototype.slice.call(row.children);
+        var oi = cells.indexOf(head), ni = cells.indexOf(next);
+        var rows = [];
+        var add = function (ownerEl, numberEl) {
+            var owner = txt(ownerEl), number = txt(numberEl);
+            if (owner && number) { rows.push({Owner: owner, Number: number}); }
+        };
+        if (row.tagName !== 'TR' && cells.length > 2) {
+            for (var i = ni + 1; i + 1 < cells.length; i += 2) { add(cells[i], cells[i + 1]); }
+            return rows;
+        }
+        var r = row.nextElementSibling;
+        if (!r && row.tagName === 'TR' && row.parentElement.nextElementSibling) {
+            r = row.parentElement.nextElementSibling.firstElementChild;
+        }
+        for (; r; r = r.nextElementSibling) {
+            if (r.children.length > Math.max(oi, ni)) { add(r.children[oi], r.children[ni]); }
+        }
+        return rows;
+    }
+    return null;
+}
+return {text: document.body ? document.body.innerText : '', crosses: crossesTable()};
+"""
+
+
+def chrome_options(lean=True, headless=True, allow_hosts=()):
+    """ChromeOptions bersama untuk semua crawler Selenium.
+
+    lean=False mengembalikan profil lama (1920x1080, semua resource dimuat).
+    lean=True memblok gambar, media, font dan domain pihak ketiga, dan
+    memakai page-load strategy 'eager' (tidak menunggu resource selesai).
+    `allow_hosts` = host tambahan yang tetap di-resolve di profil lean
+    (mis. 'localhost' untuk server katalog benchmark_offline.py).
+    """
+    options = webdriver.ChromeOptions()
+    if headless:
+        options.add_argument("--headless=new")
+    options.add_argument("--disable-blink-features=AutomationControlled")
+    options.add_experimental_option("excludeSwitches", ["enable-automation"])
+    if not lean:
+        options.add_argument("--window-size=1920,1080")
+        return options
+
+    for arg in LEAN_CHROME_ARGS:
+        options.add_argument(arg)
+    host_rules = LEAN_HOST_RULES + "".join(f" , EXCLUDE {host}" for host in allow_hosts)
+    options.add_argument(f"--host-resolver-rules={host_rules}")
+    options.add_experimental_option("prefs", {
+        "profile.managed_default_content_settings.images": 2,
+        "profile.default_content_setting_values.notifications": 2,
+    })
+    options.page_load_strategy = "eager"
+    return options
+
+
+def block_heavy_resources(driver):
+    """Blok request gambar/font/media lewat CDP (dipanggil setelah Chrome start)"""
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_URL_PATTERNS})
+
+
+def search_url(code):
+    """URL hasil pencarian (pola yang sama dengan JikiuCrawler.search_url)"""
+    return f"{CATALOGUE_URL}/search?part={quote(code)}"
+
+
+def results_rendered(driver):
+    """Expected condition: hasil pencarian atau 'No data found' sudah tampil"""
+    return driver.execute_script(_RESULTS_RENDERED_JS, RESULT_MARKERS)
+
+
+def load_search_page(browser, code):
+    """Buka langsung URL hasil pencarian dan tunggu sampai hasilnya dirender.
+
+    `browser` adalah PooledDriver dari driver_pool. Return (page_text,
+    crosses, url); crosses adalah baris tabel Crosses dari DOM (list of
+    {'Owner', 'Number'}) atau None kalau tabelnya tidak ditemukan.
+    Kalau tidak ada penanda yang muncul sampai batas wait, teks apa adanya
+    tetap dikembalikan (nanti jadi CHECK MANUAL).
+    """
+    browser.pages += 1
+    browser.driver.get(search_url(code))
+    try:
+        browser.wait.until(results_rendered)
+    except TimeoutException:
+        pass
+    snapshot = browser.driver.execute_script(_PAGE_SNAPSHOT_JS)
+    return snapshot['text'], snapshot['crosses'], browser.driver.current_url
+
+
+def fetch_search_page(pool, limiter, cache, code, attempts=2, metrics=NO_METRICS):
+    """Halaman hasil pencarian untuk satu kode: cache dulu, lalu browser dari pool.
+
+    Return (page_text, crosses, source). source = 'cache' / 'browser' /
+    'rate limited' / 'gagal'; page_text None kalau semua percobaan gagal
+    ('rate limited' = percobaan terakhir masih dijawab 429, halaman 429
+    tidak pernah dikembalikan sebagai isi katalog).
+    `metrics` (metrics.Metrics) mencatat waktu cache / tunggu browser /
+    tunggu rate limit / load halaman, plus jumlah retry dan sumber halaman.
+    """
+    # Pakai halaman yang sudah pernah diunduh (oleh script mana pun)
+    with metrics.timer('cache_lookup'):
+        page_text = cache.get(code, kind='text')
+        cached_crosses = cache.get(code, kind='crosses') if page_text is not None else None
+    if page_text is not None:
+        metrics.count('source_cache')
+        return page_text, json.loads(cached_crosses) if cached_crosses else None, 'cache'
+
+    throttled = False
+    for attempt in range(attempts):
+        if attempt:
+            metrics.count('retries')
+        try:
+            wait_start = time.perf_counter()
+            with pool.driver() as browser:
+                metrics.observe('driver_wait', time.perf_counter() - wait_start)
+                with metrics.timer('rate_wait'):
+                    limiter.acquire()
+                # langsung ke URL hasil + tunggu penanda hasil (tanpa isi form / sleep tetap)
+                with metrics.timer('page_load'):
+                    page_text, crosses, url = load_search_page(browser, code)
+        except Exception as e:
+            # browser yang rusak otomatis diganti oleh pool
+            limiter.report(error=True)
+            metrics.count('page_errors')
+            throttled = False
+            print(f"⚠️ {code}: percobaan ke-{attempt+1} gagal ({e}). Ulang...")
+            continue
+
+        # situs minta pelan-pelan → limiter turunkan rate, acquire() berikutnya menunggu backoff
+        throttled = limiter.report(429 if "Too Many Requests" in page_text else None)
+        if throttled:
+            metrics.count('rate_limited')
+            print(f"⏳ {code}: percobaan ke-{attempt+1} kena rate limit (429). Tunggu lalu ulang...")
+            continue
+        with metrics.timer('cache_store'):
+            cache.put(code, page_text, kind='text', url=url)
+            if crosses is not None:
+                cache.put(code, json.dumps(crosses), kind='crosses', url=url)
+        metrics.count('source_browser')
+        return page_text, crosses, 'browser'
+
+    metrics.count('failed')
+    return None, None, 'rate limited' if throttled else 'gagal'
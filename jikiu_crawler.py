@@ -1,57 +1,138 @@
 import pandas as pd
 import requests
+from requests.adapters import HTTPAdapter
 from bs4 import BeautifulSoup
-import time
 from urllib.parse import quote
 import json
+import asyncio
+import aiohttp
+import codecs
+import importlib.util
+
+from item_codes import KEY_COLUMN, canonical_keys, clean_codes
+from rate_limiter import RateLimiter
+from response_cache import ResponseCache
+from page_parsers import parse_specs_and_crosses
+from jikiu_pages import is_not_found
+from metrics import Metrics
+
+# Result columns added by process_excel
+RESULT_COLUMNS = [
+    'Found_in_Jikiu', 'Jikiu_URL', 'Jikiu_Cone_Pitch', 'Jikiu_Cone_Size_mm',
+    'Jikiu_Thread_Size', 'Jikiu_Overall_Height_mm', 'Jikiu_Diameter_mm',
+    'Jikiu_Mounting_Height_mm', 'Jikiu_Location', 'Jikiu_Position',
+    'Jikiu_Crosses', 'Crawl_Error'
+]
+RESULT_DTYPES = {col: str for col in RESULT_COLUMNS} | {'Found_in_Jikiu': bool}
+
+# requests (urllib3) and aiohttp decode brotli only when one of these is installed
+HAS_BROTLI = any(importlib.util.find_spec(name) for name in ('brotli', 'brotlicffi'))
+ACCEPT_ENCODING = 'gzip, deflate, br' if HAS_BROTLI else 'gzip, deflate'
+
+
+def response_encoding(response):
+    """Charset of an aiohttp response, utf-8 when it cannot be detected or is unknown
+    (get_encoding() raises RuntimeError without a charset and chardet result)"""
+    try:
+        encoding = response.get_encoding()
+        codecs.lookup(encoding)
+        return encoding
+    except (RuntimeError, LookupError):
+        return 'utf-8'
+
 
 class JikiuCrawler:
-    def __init__(self):
+    def __init__(self, rate_limiter=None, cache=None, parser='lxml', pool_size=1, metrics=None):
         self.base_url = "https://www.jikiu.com/catalogue"
-        self.session = requests.Session()
-        self.session.headers.update({
+        self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
             'Accept-Language': 'en-US,en;q=0.5',
-            'Accept-Encoding': 'gzip, deflate',
+            'Accept-Encoding': ACCEPT_ENCODING,
             'Connection': 'keep-alive',
-        })
+        }
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        self.set_pool_size(pool_size)
+        # Shared politeness limit for sync and async requests
+        self.rate_limiter = rate_limiter or RateLimiter(rate=1.0, burst=1)
+        # Optional ResponseCache shared with the Selenium scripts
+        self.cache = cache
+        # 'lxml' = single-pass page_parsers backend, 'bs4' = BeautifulSoup html.parser
+        self.parser = parser
+        # Re-crawls answered with 304 Not Modified (served from the cache)
+        self.not_modified = 0
+        # Stage timings / throughput, reported at the end of process_excel
+        self.metrics = metrics or Metrics('jikiu_crawler')
+    
+    def set_pool_size(self, size):
+        """Keep up to `size` keep-alive connections (match the crawl concurrency)"""
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(1, size))
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+    
+    def conditional_headers(self, item_code):
+        """(stored page, If-None-Match / If-Modified-Since headers) for a re-crawl"""
+        stored = self.cache.validators(item_code) if self.cache else None
+        if stored is None:
+            return None, {}
+        content, etag, last_modified = stored
+        headers = {}
+        if etag:
+            headers['If-None-Match'] = etag
+        if last_modified:
+            headers['If-Modified-Since'] = last_modified
+        return content, headers
         
+    def search_url(self, item_code):
+        """Build the catalogue search URL for an item code"""
+        return f"{self.base_url}/search?part={quote(item_code)}"
+    
     def search_part(self, item_code):
         """Search for a part on Jikiu website"""
         try:
             # Search URL
-            search_url = f"{self.base_url}/search?part={quote(item_code)}"
-            print(f"Searching: {item_code}")
+            search_url = self.search_url(item_code)
             
-            response = self.session.get(search_url, timeout=10)
-            response.raise_for_status()
+            with self.metrics.timer('cache_lookup'):
+                cached = self.cache.get(item_code) if self.cache else None
+                if cached is None:
+                    stored, headers = self.conditional_headers(item_code)
+            if cached is not None:
+                print(f"Cached: {item_code}")
+                self.metrics.count('cache_hits')
+                return self.parse_search_page(item_code, search_url, cached, cached)
             
-            soup = BeautifulSoup(response.content, 'html.parser')
+            print(f"Searching: {item_code}")
             
-            # Check if part is found
-            if "no results" in response.text.lower() or "not found" in response.text.lower():
-                return {
-                    'found': False,
-                    'url': search_url,
-                    'item_code': item_code
-                }
+            with self.metrics.timer('rate_wait'):
+                self.rate_limiter.acquire()
+            with self.metrics.timer('fetch'):
+                response = self.session.get(search_url, headers=headers, timeout=10)
+            if self.rate_limiter.report(response.status_code, retry_after=response.headers.get('Retry-After')):
+                self.metrics.count('throttled')
             
-            # Extract specifications
-            specs = self.extract_specifications(soup)
+            if response.status_code == 304 and stored is not None:
+                # Unchanged since the last crawl: the cached page is current again
+                self.not_modified += 1
+                self.metrics.count('not_modified')
+                self.cache.revalidated(item_code)
+                return self.parse_search_page(item_code, search_url, stored, stored)
+            response.raise_for_status()
+            self.metrics.count('bytes_downloaded', len(response.content))
             
-            # Extract crosses/alternative part numbers
-            crosses = self.extract_crosses(soup)
+            if self.cache:
+                with self.metrics.timer('cache_store'):
+                    self.cache.put(item_code, response.text, url=search_url,
+                                   etag=response.headers.get('ETag'),
+                                   last_modified=response.headers.get('Last-Modified'))
             
-            return {
-                'found': True,
-                'url': search_url,
-                'item_code': item_code,
-                'specifications': specs,
-                'crosses': crosses
-            }
+            return self.parse_search_page(item_code, search_url, response.content, response.text)
             
         except requests.exceptions.RequestException as e:
+            if not isinstance(e, requests.exceptions.HTTPError):
+                self.rate_limiter.report(error=True)
+            self.metrics.count('errors')
             print(f"Error fetching {item_code}: {e}")
             return {
                 'found': False,
@@ -60,6 +141,121 @@ class JikiuCrawler:
                 'item_code': item_code
             }
     
+    async def search_part_async(self, session, item_code):
+        """Async variant of search_part using a shared aiohttp session"""
+        search_url = self.search_url(item_code)
+        
+        with self.metrics.timer('cache_lookup'):
+            cached = self.cache.get(item_code) if self.cache else None
+            if cached is None:
+                stored, headers = self.conditional_headers(item_code)
+        if cached is not None:
+            print(f"Cached: {item_code}")
+            self.metrics.count('cache_hits')
+            return self.parse_search_page(item_code, search_url, cached, cached)
+        
+        try:
+            print(f"Searching: {item_code}")
+            
+            with self.metrics.timer('rate_wait'):
+                await self.rate_limiter.acquire_async()
+            with self.metrics.timer('fetch'):
+                async with session.get(search_url, headers=headers, timeout=aiohttp.ClientTimeout(total=10)) as response:
+                    if self.rate_limiter.report(response.status, retry_after=response.headers.get('Retry-After')):
+                        self.metrics.count('throttled')
+                    if response.status == 304 and stored is not None:
+                        self.not_modified += 1
+                        self.metrics.count('not_modified')
+                        self.cache.revalidated(item_code)
+                        return self.parse_search_page(item_code, search_url, stored, stored)
+                    response.raise_for_status()
+                    content = await response.read()
+                    text = content.decode(response_encoding(response), errors='replace')
+                    etag = response.headers.get('ETag')
+                    last_modified = response.headers.get('Last-Modified')
+            self.metrics.count('bytes_downloaded', len(content))
+            
+            if self.cache:
+                with self.metrics.timer('cache_store'):
+                    self.cache.put(item_code, text, url=search_url, etag=etag, last_modified=last_modified)
+            
+            return self.parse_search_page(item_code, search_url, content, text)
+            
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            if not isinstance(e, aiohttp.ClientResponseError):
+                self.rate_limiter.report(error=True)
+            self.metrics.count('errors')
+            error = str(e) or type(e).__name__
+            print(f"Error fetching {item_code}: {error}")
+            return {
+                'found': False,
+                'error': error,
+                'url': search_url,
+                'item_code': item_code
+            }
+    
+    def parse_search_page(self, item_code, search_url, content, text):
+        """Turn a downloaded search page into a result dict"""
+        # Check if part is found (same markers as jikiu_pages.analyze_page_text)
+        if is_not_found(text) or "no results" in text.lower() or "not found" in text.lower():
+            return {
+                'found': False,
+                'url': search_url,
+                'item_code': item_code
+            }
+        
+        with self.metrics.timer('parse'):
+            if self.parser == 'lxml':
+                # Specifications and crosses in one pass over the tree
+                specs, crosses = parse_specs_and_crosses(content)
+            else:
+                soup = BeautifulSoup(content, 'html.parser')
+                
+                # Extract specifications
+                specs = self.extract_specifications(soup)
+                
+                # Extract crosses/alternative part numbers
+                crosses = self.extract_crosses(soup)
+        
+        return {
+            'found': True,
+            'url': search_url,
+            'item_code': item_code,
+            'specifications': specs,
+            'crosses': crosses
+        }
+    
+    async def crawl_async(self, item_codes, concurrency=8, on_result=None):
+        """Crawl item codes with a bounded pool of async workers.
+        
+        At most `concurrency` requests are in flight at once; the overall
+        request rate is capped by self.rate_limiter. Results come back in
+        the same order as `item_codes`; `on_result(position, item_code,
+        result)` is called as soon as each one arrives (e.g. for progress).
+        """
+        results = [None] * len(item_codes)
+        queue = asyncio.Queue()
+        for position, item_code in enumerate(item_codes):
+            queue.put_nowait((position, item_code))
+        
+        async def worker(session):
+            while True:
+                try:
+                    position, item_code = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                results[position] = await self.search_part_async(session, item_code)
+                if on_result is not None:
+                    on_result(position, item_code, results[position])
+        
+        # One keep-alive connection per worker, DNS looked up once per run
+        connector = aiohttp.TCPConnector(limit=concurrency, limit_per_host=concurrency, ttl_dns_cache=300)
+        async with aiohttp.ClientSession(headers=self.headers, connector=connector) as session:
+            workers = [asyncio.create_task(worker(session)) for _ in range(max(1, concurrency))]
+            await asyncio.gather(*workers)
+        
+        return results
+    
     def extract_specifications(self, soup):
         """Extract specifications from the page"""
         specs = {}
@@ -134,76 +330,99 @@ class JikiuCrawler:
         
         return crosses
     
-    def process_excel(self, input_file, output_file='Jikiu_Crawl_Results.xlsx'):
-        """Process Excel file and crawl data"""
+    def result_record(self, result):
+        """Flatten one search_part result into a row of RESULT_COLUMNS"""
+        record = dict.fromkeys(RESULT_COLUMNS, '')
+        record['Found_in_Jikiu'] = bool(result.get('found', False))
+        record['Jikiu_URL'] = result.get('url', '')
+        
+        if result.get('found'):
+            specs = result.get('specifications', {})
+            
+            # Map specifications to columns
+            record['Jikiu_Cone_Pitch'] = specs.get('Cone Pitch', '')
+            record['Jikiu_Cone_Size_mm'] = specs.get('Cone Size Ø (mm)', specs.get('Cone Size', ''))
+            record['Jikiu_Thread_Size'] = specs.get('Thread Size', '')
+            record['Jikiu_Overall_Height_mm'] = specs.get('Overall Height (mm)', specs.get('Overall Height', ''))
+            record['Jikiu_Diameter_mm'] = specs.get('Ø (mm)', specs.get('Diameter', ''))
+            record['Jikiu_Mounting_Height_mm'] = specs.get('Mounting Height (mm)', specs.get('Mounting Height', ''))
+            record['Jikiu_Location'] = specs.get('Location', '')
+            record['Jikiu_Position'] = specs.get('Position', '')
+            
+            # Format crosses
+            crosses = result.get('crosses', [])
+            if crosses:
+                record['Jikiu_Crosses'] = '; '.join([f"{c['owner']}: {c['number']}" for c in crosses])
+        
+        if 'error' in result:
+            record['Crawl_Error'] = result['error']
+        return record
+    
+    def process_excel(self, input_file, output_file='Jikiu_Crawl_Results.xlsx', concurrency=1):
+        """Process Excel file and crawl data
+        
+        Rows sharing an item code (one row per vehicle application) are
+        fetched once. Results are collected as one record per code and
+        joined onto all matching rows at the end. With concurrency > 1 the
+        unique codes are fetched by the async engine (crawl_async).
+        """
         print(f"Reading Excel file: {input_file}")
         
         # Read Excel file
-        df = pd.read_excel(input_file)
+        with self.metrics.timer('read_excel'):
+            df = pd.read_excel(input_file)
         
         print(f"Found {len(df)} rows to process")
         
-        # Initialize result columns
-        df['Found_in_Jikiu'] = False
-        df['Jikiu_URL'] = ''
-        df['Jikiu_Cone_Pitch'] = ''
-        df['Jikiu_Cone_Size_mm'] = ''
-        df['Jikiu_Thread_Size'] = ''
-        df['Jikiu_Overall_Height_mm'] = ''
-        df['Jikiu_Diameter_mm'] = ''
-        df['Jikiu_Mounting_Height_mm'] = ''
-        df['Jikiu_Location'] = ''
-        df['Jikiu_Position'] = ''
-        df['Jikiu_Crosses'] = ''
-        df['Crawl_Error'] = ''
-        
-        # Process each row
-        for idx, row in df.iterrows():
-            # Get ItemCode (handle different column name variations)
-            item_code = row.get('ItemCode') or row.get('Item Code') or row.get('ITEM CODE') or ''
-            
-            if not item_code or pd.isna(item_code):
-                print(f"Row {idx + 1}: No ItemCode found, skipping...")
-                continue
-            
-            # Crawl the part
-            result = self.search_part(str(item_code))
-            
-            # Update DataFrame
-            df.at[idx, 'Found_in_Jikiu'] = result.get('found', False)
-            df.at[idx, 'Jikiu_URL'] = result.get('url', '')
-            
-            if result.get('found'):
-                specs = result.get('specifications', {})
-                
-                # Map specifications to columns
-                df.at[idx, 'Jikiu_Cone_Pitch'] = specs.get('Cone Pitch', '')
-                df.at[idx, 'Jikiu_Cone_Size_mm'] = specs.get('Cone Size Ø (mm)', specs.get('Cone Size', ''))
-                df.at[idx, 'Jikiu_Thread_Size'] = specs.get('Thread Size', '')
-                df.at[idx, 'Jikiu_Overall_Height_mm'] = specs.get('Overall Height (mm)', specs.get('Overall Height', ''))
-                df.at[idx, 'Jikiu_Diameter_mm'] = specs.get('Ø (mm)', specs.get('Diameter', ''))
-                df.at[idx, 'Jikiu_Mounting_Height_mm'] = specs.get('Mounting Height (mm)', specs.get('Mounting Height', ''))
-                df.at[idx, 'Jikiu_Location'] = specs.get('Location', '')
-                df.at[idx, 'Jikiu_Position'] = specs.get('Position', '')
-                
-                # Format crosses
-                crosses = result.get('crosses', [])
-                if crosses:
-                    crosses_str = '; '.join([f"{c['owner']}: {c['number']}" for c in crosses])
-                    df.at[idx, 'Jikiu_Crosses'] = crosses_str
-            
-            if 'error' in result:
-                df.at[idx, 'Crawl_Error'] = result['error']
-            
-            # Progress update
-            print(f"Progress: {idx + 1}/{len(df)} - {item_code} - {'FOUND' if result.get('found') else 'NOT FOUND'}")
-            
-            # Delay to avoid overwhelming the server
-            time.sleep(1)
+        # Get ItemCode (handle different column name variations)
+        code_columns = [c for c in ('ItemCode', 'Item Code', 'ITEM CODE') if c in df.columns]
+        codes = pd.Series(pd.NA, index=df.index, dtype='string')
+        for col in code_columns:
+            codes = codes.fillna(clean_codes(df[col]).replace('', pd.NA))
+        keys = canonical_keys(codes)
+        
+        for idx in df.index[keys.isna()]:
+            print(f"Row {idx + 1}: No ItemCode found, skipping...")
+        
+        # One fetch per distinct code (first spelling wins)
+        unique = codes[keys.notna() & ~keys.duplicated()]
+        print(f"{int(keys.notna().sum())} rows share {len(unique)} unique item codes")
+        
+        done = 0
+        
+        def progress(position, item_code, result):
+            # Live per-code progress, in completion order
+            nonlocal done
+            done += 1
+            self.metrics.item()
+            print(f"Progress: {done}/{len(unique)} - {item_code} - {'FOUND' if result.get('found') else 'NOT FOUND'}")
+        
+        if concurrency > 1:
+            # Crawl all parts with the async engine
+            print(f"Async mode: {concurrency} requests in flight")
+            fetched = asyncio.run(self.crawl_async(unique.tolist(), concurrency, on_result=progress))
+        else:
+            # Pacing is handled by self.rate_limiter
+            fetched = []
+            for position, code in enumerate(unique):
+                fetched.append(self.search_part(code))
+                progress(position, code, fetched[-1])
+        
+        # One frame of per-code records, one join back onto every row
+        results = pd.DataFrame.from_records(
+            [self.result_record(result) for result in fetched],
+            index=keys[unique.index].tolist(), columns=RESULT_COLUMNS
+        )
+        df = (df.drop(columns=RESULT_COLUMNS, errors='ignore')
+                .assign(**{KEY_COLUMN: keys})
+                .join(results, on=KEY_COLUMN)
+                .drop(columns=KEY_COLUMN))
+        df = df.fillna({col: '' for col in RESULT_COLUMNS}).astype(RESULT_DTYPES)
         
         # Save results
         print(f"\nSaving results to {output_file}")
-        df.to_excel(output_file, index=False)
+        with self.metrics.timer('excel_write'):
+            df.to_excel(output_file, index=False)
         
         # Print summary
         found_count = df['Found_in_Jikiu'].sum()
@@ -216,8 +435,12 @@ class JikiuCrawler:
         print(f"Found in Jikiu: {found_count}")
         print(f"Not Found: {not_found_count}")
         print(f"Success Rate: {(found_count/len(df)*100):.1f}%")
+        print(f"Not Modified (304): {self.not_modified}")
         print(f"\nResults saved to: {output_file}")
         
+        # Stage latencies (p50/p95/p99), items/sec and counters as JSON
+        self.metrics.report()
+        
         return df
 
 
@@ -228,8 +451,17 @@ def main():
     print("="*50)
     print()
     
-    # Initialize crawler
-    crawler = JikiuCrawler()
+    # Number of requests in flight (1 = sequential)
+    concurrency = 8
+    
+    # Initialize crawler (target 4 requests/second, bursts of 4)
+    # Pages are cached on disk so re-runs only download new item codes;
+    # expired pages are revalidated with ETag / Last-Modified (304 = reuse)
+    crawler = JikiuCrawler(
+        rate_limiter=RateLimiter(rate=4.0, burst=4),
+        cache=ResponseCache('jikiu_cache.sqlite', ttl_days=30),
+        pool_size=concurrency
+    )
     
     # Input file name
     input_file = 'List spare parts-Anugerah Auto.xlsx'
@@ -237,7 +469,7 @@ def main():
     
     # Check if file exists
     try:
-        crawler.process_excel(input_file, output_file)
+        crawler.process_excel(input_file, output_file, concurrency=concurrency)
     except FileNotFoundError:
         print(f"\nError: File '{input_file}' not found!")
         print("Please make sure the Excel file is in the same directory as this script.")
@@ -0,0 +1,110 @@
+import re
+
+# Tipe item yang dikenali dari teks halaman (urutan = prioritas)
+ITEM_TYPES = ["BALL JOINT", "TIE ROD END", "STABILIZER LINK", "RACK END", "IDLER ARM"]
+
+# Label spesifikasi yang sama dengan JikiuCrawler.extract_specifications
+SPEC_FIELDS = [
+    'Cone Pitch', 'Cone Size', 'Thread Size',
+    'Overall Height', 'Diameter', 'Mounting Height',
+    'Location', 'Position'
+]
+
+
+# Penanda halaman "tidak ditemukan" ("No data found!", "... : 0 results"); \b supaya "10 results" tidak ikut
+_NOT_FOUND_RE = re.compile(r'No data found|\b0 results?\b', re.IGNORECASE)
+
+
+def is_not_found(page_text):
+    """True kalau teks / HTML halaman pencarian menyatakan kode tidak ada di katalog"""
+    return _NOT_FOUND_RE.search(page_text) is not None
+
+
+def analyze_page_text(code, page_text):
+    """Status FOUND / NOT FOUND / CHECK MANUAL dari teks halaman hasil pencarian.
+
+    Return dict berisi status, jikiu_code, item_type dan details
+    (format sama dengan kolom di validation_FULL_*.xlsx).
+    """
+    if is_not_found(page_text):
+        return {'status': "NOT FOUND", 'jikiu_code': "", 'item_type': "", 'details': ""}
+
+    if "Search Result for" in page_text or code.upper() in page_text.upper():
+        jikiu_match = re.search(r'Returns JIKIU - (\w+)', page_text)
+        jikiu_code = jikiu_match.group(1) if jikiu_match else ""
+
+        # Deteksi Tipe Item
+        item_type = "OTHER"
+        for t in ITEM_TYPES:
+            if t in page_text.upper():
+                item_type = t
+                break
+
+        details = f"{item_type} - {jikiu_code}" if jikiu_code else item_type
+        return {'status': "FOUND", 'jikiu_code': jikiu_code, 'item_type': item_type, 'details': details}
+
+    return {'status': "CHECK MANUAL", 'jikiu_code': "", 'item_type': "", 'details': "Ambiguous Response"}
+
+
+def parse_specs_from_text(page_text):
+    """Ambil nilai spesifikasi ('Label: nilai' atau label lalu nilai di baris berikutnya)."""
+    lines = [ln.strip() for ln in page_text.split("\n") if ln.strip()]
+    specs = {}
+    for i, ln in enumerate(lines):
+        for field in SPEC_FIELDS:
+            if field in specs or not ln.lower().startswith(field.lower()):
+                continue
+            label, _, value = ln.partition(":")
+            if not value.strip() and i + 1 < len(lines):
+                value = lines[i + 1]
+            specs[field] = value.strip()
+    return specs
+
+
+def parse_crosses_from_text(text):
+    """Ambil pasangan Owner ↔ Number dari teks halaman Jikiu."""
+    if "Crosses" not in text:
+        return []
+
+    section = text.split("Crosses", 1)[-1]
+    lines = [ln.strip() for ln in section.split("\n") if ln.strip()]
+
+    start_idx = None
+    for i, ln in enumerate(lines):
+        if ln.lower().startswith("owner"):
+            start_idx = i + 1
+            break
+    if start_idx is None:
+        return []
+
+    valid_lines = []
+    for ln in lines[start_idx:]:
+        if any(stop in ln.lower() for stop in ["application", "brand", "vehicle", "datsun", "nissan »"]):
+            break
+        if ln and ln.lower() not in ["owner", "number"]:
+            valid_lines.append(ln)
+
+    pairs = []
+    i = 0
+    while i < len(valid_lines) - 1:
+        owner = valid_lines[i].strip()
+        number = valid_lines[i + 1].strip()
+        if (
+            len(owner) > 1
+            and len(number) > 1
+            and not owner.lower().startswith("number")
+            and not number.lower().startswith("owner")
+        ):
+            pairs.append({"Owner": owner, "Number": number})
+            i += 2
+        else:
+            i += 1
+
+    return pairs
+
+
+def extract_crosses(page_text, dom_crosses=None):
+    """Crosses dari tabel DOM (jikiu_browser) kalau ada, kalau tidak pakai parser teks."""
+    if dom_crosses is not None:
+        return dom_crosses
+    return parse_crosses_from_text(page_text)
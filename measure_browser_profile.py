@@ -0,0 +1,88 @@
+import json
+import statistics
+import sys
+import time
+from datetime import datetime
+
+import psutil
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+
+from driver_pool import PooledDriver
+from jikiu_browser import chrome_options, block_heavy_resources, load_search_page
+
+# ===============================
+# KONFIGURASI
+# ===============================
+# Bandingkan profil Chrome lama vs "lean": waktu load per halaman & memori per browser
+SAMPLE_CODES = ['SL-A620', 'SR-A740', 'SR-D080', 'SB-4391', 'SB-6312', 'SE-H541', 'SL-H830', 'SR-6380']
+ROUNDS = 2
+OUTPUT_FILE = f'browser_profile_comparison_{datetime.now().strftime("%Y%m%d_%H%M%S")}.json'
+
+
+def browser_rss_mb(driver):
+    """Total RSS chromedriver + semua proses Chrome turunannya (MB)"""
+    root = psutil.Process(driver.service.process.pid)
+    total = 0
+    for proc in [root] + root.children(recursive=True):
+        try:
+            total += proc.memory_info().rss
+        except psutil.Error:
+            pass
+    return total / (1024 * 1024)
+
+
+def measure(lean):
+    driver = webdriver.Chrome(options=chrome_options(lean=lean, headless=True))
+    if lean:
+        block_heavy_resources(driver)
+    browser = PooledDriver(driver, wait_timeout=15)
+    timings = []
+    peak_rss = 0.0
+    try:
+        for _ in range(ROUNDS):
+            for code in SAMPLE_CODES:
+                start = time.perf_counter()
+                load_search_page(browser, code)
+                timings.append(time.perf_counter() - start)
+                peak_rss = max(peak_rss, browser_rss_mb(driver))
+    finally:
+        browser.quit()
+    return {
+        'pages': len(timings),
+        'mean_s': statistics.mean(timings),
+        'median_s': statistics.median(timings),
+        'max_s': max(timings),
+        'peak_rss_mb': peak_rss,
+    }
+
+
+def change(before, after):
+    """Perubahan relatif lean terhadap default (negatif = lebih cepat / lebih hemat)"""
+    return (after - before) / before if before else 0.0
+
+
+report = {}
+for name, lean in [('default', False), ('lean', True)]:
+    print(f"⏱️ Mengukur profil {name}...")
+    try:
+        report[name] = measure(lean)
+    except WebDriverException as e:
+        # tanpa Chrome / chromedriver tidak ada angka yang bisa dibandingkan
+        sys.exit(f"❌ Chrome tidak bisa dijalankan, pengukuran dibatalkan: {e.msg or type(e).__name__}")
+
+report['lean_vs_default'] = {
+    metric: change(report['default'][metric], report['lean'][metric])
+    for metric in ('mean_s', 'median_s', 'max_s', 'peak_rss_mb')
+}
+
+print(f"\n{'profil':10} {'mean (s)':>10} {'median (s)':>11} {'max (s)':>9} {'RSS (MB)':>10}")
+for name in ('default', 'lean'):
+    r = report[name]
+    print(f"{name:10} {r['mean_s']:10.2f} {r['median_s']:11.2f} {r['max_s']:9.2f} {r['peak_rss_mb']:10.0f}")
+d = report['lean_vs_default']
+print(f"{'perubahan':10} {d['mean_s']:10.0%} {d['median_s']:11.0%} {d['max_s']:9.0%} {d['peak_rss_mb']:10.0%}")
+
+with open(OUTPUT_FILE, 'w') as f:
+    json.dump(report, f, indent=2)
+print(f"\n💾 Hasil disimpan di: {OUTPUT_FILE}")
@@ -1,6 +1,11 @@
 import pandas as pd
 from datetime import datetime
 
+from frame_store import read_table, write_table
+from item_codes import KEY_COLUMN, with_key
+
+EXPORT_XLSX = False  # True = tulis juga .xlsx (intermediate default Parquet)
+
 # ================================
 # 📘 1. BACA FILE
 # ================================
@@ -8,8 +13,8 @@ cross_file = "Jikiu_Crosses_Merged_20260113_165618.xlsx"
 validation_file = "validation_FULL_20260113_133316.xlsx"
 
 print("📂 Membaca file...")
-df_cross = pd.read_excel(cross_file)
-df_val = pd.read_excel(validation_file)
+df_cross = read_table(cross_file)
+df_val = read_table(validation_file)
 
 print(f"✅ Cross data: {len(df_cross)} baris, Validation: {len(df_val)} baris")
 
@@ -30,29 +35,27 @@ if not cross_item_col or not val_item_col:
 # ================================
 # 🔗 3. AMBIL KOLOM STATUS DAN DETAILS
 # ================================
-needed_cols = ["status", "details", val_item_col]
-df_val_sub = df_val[[c for c in needed_cols if c in df_val.columns]].copy()
+needed_cols = ["status", "details"]
+df_val_sub = with_key(df_val, val_item_col)[[KEY_COLUMN] + [c for c in needed_cols if c in df_val.columns]]
 
 # ================================
 # 🔗 4. GABUNGKAN TANPA UBAH URUTAN
 # ================================
+# Join pada key kanonik ('SE-6021.' = 'SE-6021'), kolom item code asli tetap dari crosses
 merged = pd.merge(
-    df_cross,
+    with_key(df_cross, cross_item_col),
     df_val_sub,
     how="left",
-    left_on=cross_item_col,
-    right_on=val_item_col
-)
-
-# Hapus kolom duplikat item code dari validation
-if val_item_col in merged.columns and val_item_col != cross_item_col:
-    merged.drop(columns=[val_item_col], inplace=True)
+    on=KEY_COLUMN
+).drop(columns=KEY_COLUMN)
 
 # ================================
 # 📦 5. SIMPAN HASIL FINAL
 # ================================
-output_file = f"Jikiu_Crosses_Merged_Status_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
-merged.to_excel(output_file, index=False)
+output_stem = f"Jikiu_Crosses_Merged_Status_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+output_file = write_table(merged, output_stem)
+if EXPORT_XLSX:
+    output_file = write_table(merged, output_stem, fmt='xlsx')
 
 print("\n✅ Proses selesai tanpa mengubah urutan data!")
 print(f"💾 File disimpan sebagai: {output_file}")
@@ -2,6 +2,14 @@ import pandas as pd
 import glob
 from datetime import datetime
 
+from frame_store import read_table, write_table
+from item_codes import KEY_COLUMN, with_key
+from stream_merge import stream_merge
+
+EXPORT_XLSX = False  # True = tulis juga .xlsx (intermediate default Parquet)
+STREAMING = True     # baca per chunk + dedup pakai hash → memori tetap datar walau autosave besar
+KEY_COLS = ["Item Code", "Owner", "Number"]
+
 print("📦 Menggabungkan semua hasil autosave...")
 
 # cari semua file autosave
@@ -11,33 +19,46 @@ if not files:
     print("⚠️ Tidak ada file autosave ditemukan di folder ini.")
     exit()
 
-all_data = []
+output_stem = f"Jikiu_Crosses_Merged_Clean_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+
+if STREAMING:
+    # hapus duplikat (Item Code + Owner + Number) & baris kosong sambil menulis per chunk;
+    # urutan baris = urutan file autosave (sama dengan mode non-streaming, tanpa sort)
+    rows_in, total_rows, paths = stream_merge(files, output_stem, KEY_COLS, code_column="Item Code",
+                                              drop_empty=True, export_xlsx=EXPORT_XLSX)
+    output = paths[-1]
+    print(f"   📄 {len(files)} file, {rows_in} baris dibaca per chunk")
+else:
+    all_data = []
 
-for f in files:
-    try:
-        df = pd.read_excel(f)
-        print(f"   📄 {f}  ({len(df)} baris)")
-        all_data.append(df)
-    except Exception as e:
-        print(f"   ⚠️ Gagal baca {f}: {e}")
+    for f in files:
+        try:
+            df = read_table(f)
+            print(f"   📄 {f}  ({len(df)} baris)")
+            all_data.append(df)
+        except Exception as e:
+            print(f"   ⚠️ Gagal baca {f}: {e}")
 
-# gabungkan semua hasil
-merged = pd.concat(all_data, ignore_index=True)
+    # gabungkan semua hasil
+    merged = pd.concat(all_data, ignore_index=True)
 
-# hapus duplikat (berdasarkan kombinasi Item Code + Owner + Number)
-if all(col in merged.columns for col in ["Item Code", "Owner", "Number"]):
-    merged.drop_duplicates(subset=["Item Code", "Owner", "Number"], inplace=True)
+    # hapus duplikat (berdasarkan kombinasi Item Code + Owner + Number, kode dibandingkan lewat key kanonik)
+    if all(col in merged.columns for col in KEY_COLS):
+        dup = with_key(merged, "Item Code").duplicated(subset=[KEY_COLUMN, "Owner", "Number"])
+        merged = merged[~dup]
 
-# hapus baris kosong total
-merged.dropna(how='all', inplace=True)
+    # hapus baris kosong total
+    merged.dropna(how='all', inplace=True)
 
-# reset index
-merged.reset_index(drop=True, inplace=True)
+    # reset index
+    merged.reset_index(drop=True, inplace=True)
 
-# simpan hasil final
-output = f"Jikiu_Crosses_Merged_Clean_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
-merged.to_excel(output, index=False)
+    # simpan hasil final
+    output = write_table(merged, output_stem)
+    if EXPORT_XLSX:
+        output = write_table(merged, output_stem, fmt='xlsx')
+    total_rows = len(merged)
 
 print(f"\n✅ Semua autosave berhasil digabung!")
 print(f"📁 File akhir disimpan sebagai: {output}")
-print(f"📊 Total baris unik: {len(merged)}")
+print(f"📊 Total baris unik: {total_rows}")
@@ -1,6 +1,12 @@
 import pandas as pd
 from datetime import datetime
 
+from cleaning import COLUMN_ALIASES, resolve_columns
+from frame_store import read_table, write_table
+from item_codes import KEY_COLUMN, clean_codes, with_key
+
+EXPORT_XLSX = False  # True = tulis juga .xlsx (intermediate default Parquet)
+
 # ================================
 # 📘 1. BACA KEDUA FILE
 # ================================
@@ -8,84 +14,46 @@ cross_file = "Jikiu_Crosses_FinalPairs_FULL_20260113_121129.xlsx"
 validation_file = "validation_FULL_20260113_133316.xlsx"
 
 print("📂 Membaca file...")
-df_cross = pd.read_excel(cross_file)
-df_val = pd.read_excel(validation_file)
+df_cross = read_table(cross_file)
+df_val = read_table(validation_file)
 
 print(f"✅ Crosses: {len(df_cross)} baris, Validation: {len(df_val)} baris")
 
 # ================================
-# 🧹 2. BERSIHKAN KOLOM
+# 🧭 2. SKEMA KOLOM (ALIAS → NAMA KANONIK)
 # ================================
-# Normalisasi nama kolom jadi huruf kecil semua tanpa spasi
-df_cross.columns = df_cross.columns.str.strip().str.lower()
-df_val.columns = df_val.columns.str.strip().str.lower()
+# Skema kolom final + alias di cleaning.py (dipakai juga oleh postprocess_pipeline.py).
+# Kolom yang cocok ke lebih dari satu nama kanonik, atau satu alias yang cocok ke
+# beberapa kolom, langsung dianggap error.
+final_cols = list(COLUMN_ALIASES)
 
-# Coba cari kolom item code di kedua file
-cross_item_col = next((c for c in df_cross.columns if "item" in c and "code" in c), None)
-val_item_col = next((c for c in df_val.columns if "item" in c and "code" in c), None)
+cross_map = resolve_columns(df_cross, cross_file)
+val_map = resolve_columns(df_val, validation_file)
 
-if not cross_item_col or not val_item_col:
+if "ItemCode" not in cross_map or "ItemCode" not in val_map:
     raise ValueError("❌ Tidak menemukan kolom 'Item Code' di salah satu file!")
 
-# Rename supaya seragam
-df_cross.rename(columns={cross_item_col: "ItemCode"}, inplace=True)
-df_val.rename(columns={val_item_col: "ItemCode"}, inplace=True)
+# Kolom dari file crosses diutamakan; validation hanya melengkapi kolom yang tidak ada
+val_map = {k: v for k, v in val_map.items() if k == "ItemCode" or k not in cross_map}
+df_cross = df_cross[list(cross_map.values())].rename(columns={v: k for k, v in cross_map.items()})
+df_val = df_val[list(val_map.values())].rename(columns={v: k for k, v in val_map.items()})
 
-# Bersihkan karakter dan spasi
-df_cross["ItemCode"] = df_cross["ItemCode"].astype(str).str.strip().str.replace(r"\.", "", regex=True)
-df_val["ItemCode"] = df_val["ItemCode"].astype(str).str.strip().str.replace(r"\.", "", regex=True)
+# Bersihkan spasi & titik di akhir, join pakai key kanonik (huruf besar)
+df_cross["ItemCode"] = clean_codes(df_cross["ItemCode"])
+df_val = with_key(df_val, "ItemCode").drop(columns="ItemCode")
 
 # ================================
 # 🔗 3. GABUNGKAN DATA
 # ================================
-merged = pd.merge(
-    df_cross,
-    df_val,
-    on="ItemCode",
-    how="left",
-    suffixes=("_cross", "_val")
-)
+merged = pd.merge(with_key(df_cross, "ItemCode"), df_val, on=KEY_COLUMN, how="left").drop(columns=KEY_COLUMN)
 
 print(f"🔄 Gabungan awal: {len(merged)} baris")
 
 # ================================
 # 🧠 4. PILIH KOLOM SESUAI STRUKTUR
 # ================================
-final_cols = [
-    "Brand", "ItemCode", "Car Maker Name", "Car Model Name", "Car Chassis Name",
-    "Car EngineDesc Name", "Car Vehicle Name", "Year From", "Year To", "OEM No.",
-    "Part Description", "Alias Name", "Print Description", "Owner", "Number"
-]
-
-# Coba temukan nama kolom aslinya dari file validation
-def get_col(df, possible_names):
-    for name in possible_names:
-        for col in df.columns:
-            if name.lower() in col:
-                return col
-    return None
-
-def pick(df, key):
-    col = get_col(df, [key])
-    return df[col] if col else None
-
-final_df = pd.DataFrame({
-    "Brand": pick(merged, "brand"),
-    "ItemCode": merged["ItemCode"],
-    "Car Maker Name": pick(merged, "car maker"),
-    "Car Model Name": pick(merged, "car model"),
-    "Car Chassis Name": pick(merged, "chassis"),
-    "Car EngineDesc Name": pick(merged, "engine"),
-    "Car Vehicle Name": pick(merged, "vehicle"),
-    "Year From": pick(merged, "year from"),
-    "Year To": pick(merged, "year to"),
-    "OEM No.": pick(merged, "oem"),
-    "Part Description": pick(merged, "description"),
-    "Alias Name": pick(merged, "alias"),
-    "Print Description": pick(merged, "print"),
-    "Owner": pick(merged, "owner"),
-    "Number": pick(merged, "number")
-})
+# Satu proyeksi; kolom kanonik yang tidak ada di kedua file jadi kosong
+final_df = merged.reindex(columns=final_cols)
 
 # ================================
 # 🧹 5. HAPUS DUPLIKAT
@@ -98,8 +66,10 @@ print(f"🧹 Menghapus {before - after} baris duplikat")
 # ================================
 # 📦 6. SIMPAN HASIL FINAL
 # ================================
-output_file = f"Final_Jikiu_Crosses_Clean_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
-final_df.to_excel(output_file, index=False)
+output_stem = f"Final_Jikiu_Crosses_Clean_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+output_file = write_table(final_df, output_stem)
+if EXPORT_XLSX:
+    output_file = write_table(final_df, output_stem, fmt='xlsx')
 
 print(f"\n✅ Proses selesai! File disimpan sebagai: {output_file}")
 print(f"📊 Total baris akhir: {len(final_df)}")
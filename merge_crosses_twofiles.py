@@ -1,30 +1,62 @@
 import pandas as pd
 from datetime import datetime
 
+from frame_store import read_table, write_table
+from item_codes import KEY_COLUMN, with_key
+from stream_merge import stream_merge, table_columns
+
+EXPORT_XLSX = False  # True = tulis juga .xlsx (intermediate default Parquet)
+STREAMING = True     # baca per chunk + dedup pakai hash → memori tetap datar walau file besar
+
 # ================================
 # 📘 1. BACA FILE
 # ================================
 file1 = "Jikiu_Crosses_FinalPairs_FULL_20260113_121129.xlsx"
 file2 = "250_20260113_154857.xlsx"
+essential_cols = ["item code", "owner", "number"]
+output_stem = f"Jikiu_Crosses_Merged_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+
+
+def normalize_col(col):
+    # Normalisasi nama kolom jadi lowercase tanpa spasi di pinggir
+    return str(col).strip().lower()
+
+
+if STREAMING:
+    # ================================
+    # 🌊 STREAMING: cek kolom → gabung + hapus duplikat per chunk → tulis bertahap
+    # ================================
+    # Hasil di-sort per item code seperti mode non-streaming (sort sekali di akhir,
+    # setelah duplikat dibuang)
+    for f in (file1, file2):
+        cols = [normalize_col(c) for c in table_columns(f)]
+        for col in essential_cols:
+            if col not in cols:
+                raise ValueError(f"❌ Kolom '{col}' tidak ditemukan di {f}.")
+
+    print("📂 Membaca & menggabungkan file per chunk...")
+    rows_in, rows_out, paths = stream_merge([file1, file2], output_stem, essential_cols,
+                                            code_column="item code", rename=normalize_col,
+                                            export_xlsx=EXPORT_XLSX, sort_by="item code")
+    print(f"🔄 Total gabungan awal: {rows_in} baris")
+    print(f"🧹 Menghapus {rows_in - rows_out} duplikat")
+    print(f"\n✅ Selesai! File disimpan sebagai: {paths[-1]}")
+    print(f"📊 Total baris akhir: {rows_out}")
+    exit()
 
 print("📂 Membaca file...")
-df1 = pd.read_excel(file1)
-df2 = pd.read_excel(file2)
+df1 = read_table(file1)
+df2 = read_table(file2)
 
 print(f"✅ File1: {len(df1)} baris, File2: {len(df2)} baris")
 
 # ================================
 # 🧹 2. SAMAKAN STRUKTUR KOLOM
 # ================================
-df1.columns = df1.columns.str.strip()
-df2.columns = df2.columns.str.strip()
-
-# Normalisasi nama kolom jadi lowercase
-df1.columns = df1.columns.str.lower()
-df2.columns = df2.columns.str.lower()
+df1.columns = [normalize_col(c) for c in df1.columns]
+df2.columns = [normalize_col(c) for c in df2.columns]
 
 # Pastikan kolom penting ada
-essential_cols = ["item code", "owner", "number"]
 for col in essential_cols:
     if col not in df1.columns or col not in df2.columns:
         raise ValueError(f"❌ Kolom '{col}' tidak ditemukan di salah satu file.")
@@ -39,7 +71,8 @@ print(f"🔄 Total gabungan awal: {len(merged)} baris")
 # 🧹 4. HAPUS DUPLIKAT
 # ================================
 before = len(merged)
-merged.drop_duplicates(subset=["item code", "owner", "number"], inplace=True)
+# kode dibandingkan lewat key kanonik ('SE-6021.' = 'SE-6021')
+merged = merged[~with_key(merged, "item code").duplicated(subset=[KEY_COLUMN, "owner", "number"])]
 after = len(merged)
 print(f"🧹 Menghapus {before - after} duplikat")
 
@@ -52,8 +85,9 @@ if "item code" in merged.columns:
 # ================================
 # 💾 6. SIMPAN HASIL
 # ================================
-output_file = f"Jikiu_Crosses_Merged_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
-merged.to_excel(output_file, index=False)
+output_file = write_table(merged, output_stem)
+if EXPORT_XLSX:
+    output_file = write_table(merged, output_stem, fmt='xlsx')
 
 print(f"\n✅ Selesai! File disimpan sebagai: {output_file}")
 print(f"📊 Total baris akhir: {len(merged)}")
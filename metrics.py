@@ -0,0 +1,150 @@
+import functools
+import inspect
+import json
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from datetime import datetime
+
+
+def percentile(sorted_values, q):
+    """Linear-interpolated percentile (0-100) of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    pos = (len(sorted_values) - 1) * q / 100
+    lower = int(pos)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (pos - lower)
+
+
+class Metrics:
+    """Per-run timing and throughput counters for the crawlers.
+
+    Stage latencies are collected with `timer()` (context manager) or
+    `timed()` (decorator, sync or async); `count()` tracks events such as
+    retries, cache hits or driver restarts and `item()` marks finished
+    items for the items/sec figure. Safe to share between worker threads.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.started_at = datetime.now()
+        self.start = time.perf_counter()
+        self.stopped = None
+        self.lock = threading.Lock()
+        self.samples = defaultdict(list)
+        self.counters = Counter()
+        self.items = 0
+
+    def observe(self, stage, seconds):
+        with self.lock:
+            self.samples[stage].append(seconds)
+
+    @contextmanager
+    def timer(self, stage):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start)
+
+    def timed(self, stage):
+        """Decorator version of timer()"""
+        def decorate(func):
+            if inspect.iscoroutinefunction(func):
+                @functools.wraps(func)
+                async def async_wrapper(*args, **kwargs):
+                    with self.timer(stage):
+                        return await func(*args, **kwargs)
+                return async_wrapper
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.timer(stage):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorate
+
+    def count(self, name, n=1):
+        with self.lock:
+            self.counters[name] += n
+
+    def set(self, name, value):
+        with self.lock:
+            self.counters[name] = value
+
+    def item(self, n=1):
+        with self.lock:
+            self.items += n
+
+    def stop(self):
+        """Freeze the run clock (items/sec) when the summary is taken later"""
+        if self.stopped is None:
+            self.stopped = time.perf_counter()
+
+    def summary(self):
+        elapsed = (self.stopped or time.perf_counter()) - self.start
+        with self.lock:
+            samples = {stage: sorted(values) for stage, values in self.samples.items()}
+            counters = dict(self.counters)
+            items = self.items
+        stages = {}
+        for stage, values in samples.items():
+            stages[stage] = {
+                'count': len(values),
+                'total_s': round(sum(values), 4),
+                'mean_s': round(sum(values) / len(values), 4),
+                'p50_s': round(percentile(values, 50), 4),
+                'p95_s': round(percentile(values, 95), 4),
+                'p99_s': round(percentile(values, 99), 4),
+                'max_s': round(values[-1], 4),
+            }
+        return {
+            'run': self.name,
+            'started_at': self.started_at.isoformat(timespec='seconds'),
+            'elapsed_s': round(elapsed, 3),
+            'items': items,
+            'items_per_sec': round(items / elapsed, 3) if elapsed > 0 else 0.0,
+            'counters': counters,
+            'stages': stages,
+        }
+
+    def report(self, path=None):
+        """Print the stage table and write the JSON summary; returns the path"""
+        summary = self.summary()
+        print(f"\n⏱️ {summary['run']}: {summary['items']} item dalam {summary['elapsed_s']:.1f} s "
+              f"({summary['items_per_sec']:.2f} item/s)")
+        print(f"{'tahap':18} {'n':>6} {'total (s)':>10} {'p50':>8} {'p95':>8} {'p99':>8}")
+        for stage, s in sorted(summary['stages'].items(), key=lambda kv: -kv[1]['total_s']):
+            print(f"{stage:18} {s['count']:6d} {s['total_s']:10.2f} {s['p50_s']:8.3f} {s['p95_s']:8.3f} {s['p99_s']:8.3f}")
+        for name, value in sorted(summary['counters'].items()):
+            print(f"   {name}: {value}")
+
+        path = path or f"metrics_{self.name}_{self.started_at.strftime('%Y%m%d_%H%M%S')}.json"
+        with open(path, 'w') as f:
+            json.dump(summary, f, indent=2)
+        print(f"💾 Ringkasan metrik: {path}")
+        return path
+
+
+class NullMetrics(Metrics):
+    """Metrics that records nothing (default when a caller passes none)"""
+
+    def __init__(self):
+        super().__init__('disabled')
+
+    def observe(self, stage, seconds):
+        pass
+
+    def count(self, name, n=1):
+        pass
+
+    def set(self, name, value):
+        pass
+
+    def item(self, n=1):
+        pass
+
+
+NO_METRICS = NullMetrics()
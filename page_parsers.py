@@ -0,0 +1,201 @@
+from lxml import html as lxml_html
+
+from jikiu_pages import SPEC_FIELDS
+
+SPEC_SECTION_TAGS = ('div', 'section')
+SPEC_SECTION_CLASSES = {'specification'}
+SPEC_ROW_TAGS = ('tr', 'div')
+SPEC_ROW_CLASSES = {'spec-row', 'specification-item'}
+SPEC_LABEL_TAGS = ('th', 'dt', 'span', 'div')
+SPEC_LABEL_CLASSES = {'label', 'spec-label', 'key'}
+SPEC_VALUE_TAGS = ('td', 'dd', 'span', 'div')
+SPEC_VALUE_CLASSES = {'value', 'spec-value', 'val'}
+
+CROSS_SECTION_TAGS = ('div', 'section')
+CROSS_SECTION_CLASSES = {'crosses', 'cross-references', 'alternatives'}
+CROSS_ITEM_TAGS = ('li', 'div')
+CROSS_ITEM_CLASSES = {'cross-item', 'alternative'}
+CROSS_OWNER_TAGS = ('span', 'strong')
+CROSS_OWNER_CLASSES = {'owner', 'brand'}
+CROSS_NUMBER_TAGS = ('span', 'code')
+CROSS_NUMBER_CLASSES = {'number', 'part-number'}
+
+# Text inside these tags is not part of BeautifulSoup's get_text()
+NON_TEXT_TAGS = {'script', 'style', 'template'}
+
+# Elements that start a new line in the browser's innerText (table cells included)
+BLOCK_TAGS = {
+    'address', 'article', 'aside', 'blockquote', 'br', 'dd', 'div', 'dl', 'dt', 'fieldset',
+    'figcaption', 'figure', 'footer', 'form', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'header',
+    'hr', 'li', 'main', 'nav', 'ol', 'p', 'pre', 'section', 'table', 'tbody', 'td', 'tfoot',
+    'th', 'thead', 'tr', 'ul',
+}
+
+
+def _is_element(node):
+    return isinstance(node.tag, str)
+
+
+def _walk(root):
+    """Yield ('start', node) / ('end', node) in document order, comments included"""
+    stack = [(root, 'start')]
+    while stack:
+        node, event = stack.pop()
+        yield event, node
+        if event == 'start':
+            stack.append((node, 'end'))
+            stack.extend((child, 'start') for child in reversed(node))
+
+
+def _matches(el, tags, classes):
+    """Same test as bs4 find(tags, class_=classes): tag name and any class token"""
+    if not _is_element(el) or el.tag not in tags:
+        return False
+    return not classes.isdisjoint((el.get('class') or '').split())
+
+
+def _find(el, tags, classes):
+    """First matching descendant in document order (like bs4 Tag.find)"""
+    for child in el.iterdescendants():
+        if _matches(child, tags, classes):
+            return child
+    return None
+
+
+def _find_all(el, tags, classes=None):
+    return [
+        child for child in el.iterdescendants()
+        if _is_element(child) and child.tag in tags
+        and (classes is None or _matches(child, tags, classes))
+    ]
+
+
+def _text(el):
+    """Equivalent of bs4 get_text(strip=True)"""
+    parts = []
+    for event, node in _walk(el):
+        if event == 'start':
+            if node.text and _is_element(node) and node.tag not in NON_TEXT_TAGS:
+                parts.append(node.text.strip())
+        elif node is not el and node.tail:
+            parts.append(node.tail.strip())
+    return ''.join(parts)
+
+
+def _next_sibling_element(el):
+    sibling = el.getnext()
+    while sibling is not None and not _is_element(sibling):
+        sibling = sibling.getnext()
+    return sibling
+
+
+def _scan(root):
+    """Single walk over the document.
+
+    Returns the first spec section, the first crosses section and, for
+    every spec field, the element that owns the first text node
+    mentioning it (bs4: soup.find(text=...).parent).
+    """
+    spec_section = None
+    cross_section = None
+    pending = {field: field.lower() for field in SPEC_FIELDS}
+    field_parents = {}
+
+    def check(text, parent):
+        lowered = text.lower()
+        for field, needle in list(pending.items()):
+            if needle in lowered:
+                field_parents[field] = parent
+                del pending[field]
+
+    for event, node in _walk(root):
+        if event == 'start':
+            if not _is_element(node):
+                # bs4 also matches comment strings (their parent is the container)
+                if pending and node.text and node.getparent() is not None:
+                    check(node.text, node.getparent())
+                continue
+            if spec_section is None and _matches(node, SPEC_SECTION_TAGS, SPEC_SECTION_CLASSES):
+                spec_section = node
+            if cross_section is None and _matches(node, CROSS_SECTION_TAGS, CROSS_SECTION_CLASSES):
+                cross_section = node
+            if pending and node.text:
+                check(node.text, node)
+        elif pending and node.tail and node.getparent() is not None:
+            check(node.tail, node.getparent())
+
+    return spec_section, cross_section, field_parents
+
+
+def parse_specs_and_crosses(content):
+    """Fast lxml backend: (specifications, crosses) with the same output as
+    JikiuCrawler.extract_specifications / extract_crosses on html.parser.
+    """
+    if not content or not content.strip():
+        return {}, []
+    root = lxml_html.document_fromstring(content)
+    spec_section, cross_section, field_parents = _scan(root)
+
+    specs = {}
+    if spec_section is not None:
+        for row in _find_all(spec_section, SPEC_ROW_TAGS, SPEC_ROW_CLASSES):
+            label = _find(row, SPEC_LABEL_TAGS, SPEC_LABEL_CLASSES)
+            value = _find(row, SPEC_VALUE_TAGS, SPEC_VALUE_CLASSES)
+            if label is not None and value is not None:
+                specs[_text(label).replace(':', '')] = _text(value)
+
+    for field in SPEC_FIELDS:
+        if field in specs or field not in field_parents:
+            continue
+        parent = field_parents[field]
+        value_elem = _next_sibling_element(parent)
+        if value_elem is None:
+            value_elem = _find(parent, ('span',), {'value'})
+        if value_elem is not None:
+            specs[field] = _text(value_elem)
+
+    crosses = []
+    if cross_section is not None:
+        table = next((el for el in cross_section.iterdescendants('table')), None)
+        if table is not None:
+            for row in list(table.iterdescendants('tr'))[1:]:  # Skip header
+                cols = list(row.iterdescendants('td'))
+                if len(cols) >= 2:
+                    crosses.append({'owner': _text(cols[0]), 'number': _text(cols[1])})
+        else:
+            for item in _find_all(cross_section, CROSS_ITEM_TAGS, CROSS_ITEM_CLASSES):
+                owner_elem = _find(item, CROSS_OWNER_TAGS, CROSS_OWNER_CLASSES)
+                number_elem = _find(item, CROSS_NUMBER_TAGS, CROSS_NUMBER_CLASSES)
+                if owner_elem is not None and number_elem is not None:
+                    crosses.append({'owner': _text(owner_elem), 'number': _text(number_elem)})
+
+    return specs, crosses
+
+
+def page_text(content):
+    """Static-HTML stand-in for document.body.innerText (what the Selenium
+    scripts read): one line per block element or table cell, whitespace
+    collapsed, script/style skipped. Good enough for jikiu_pages.analyze_page_text
+    and the text parsers; no CSS is applied.
+    """
+    if not content or not content.strip():
+        return ''
+    root = lxml_html.document_fromstring(content)
+    body = root.find('body')
+    if body is None:
+        body = root
+    parts = []
+    for event, node in _walk(body):
+        is_block = _is_element(node) and node.tag in BLOCK_TAGS
+        if event == 'start':
+            if is_block:
+                parts.append('\n')
+            if node.text and _is_element(node) and node.tag not in NON_TEXT_TAGS:
+                parts.append(node.text)
+        else:
+            if is_block:
+                parts.append('\n')
+            if node is not body and node.tail:
+                parts.append(node.tail)
+    lines = (' '.join(line.split()) for line in ''.join(parts).split('\n'))
+    return '\n'.join(line for line in lines if line)
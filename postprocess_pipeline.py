@@ -0,0 +1,218 @@
+import glob
+import hashlib
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+import pandas as pd
+
+from cleaning import COLUMN_ALIASES, canonical_columns
+from frame_store import read_table, write_table
+from item_codes import KEY_COLUMN, clean_codes, with_key
+
+# ================================
+# ⚙️ KONFIGURASI DEFAULT
+# ================================
+# Satu perintah pengganti kelima script merge_autosave_results, merge_crosses_twofiles,
+# merge_clean_final, merge_add_status_details dan sort_by_car_maker:
+#   concat → dedup → join status validasi → pilih kolom → sort → satu kali tulis.
+# Bisa ditimpa lewat file JSON: python postprocess_pipeline.py pipeline.json
+#   pipeline_autosave.json    = merge_autosave_results.py
+#   pipeline_clean_final.json = merge_clean_final.py (nama kolom kanonik dari cleaning.py)
+DEFAULT_CONFIG = {
+    # file/glob hasil crosses (.xlsx / .parquet / .feather), digabung sesuai urutan
+    "inputs": [
+        "Jikiu_Crosses_FinalPairs_FULL_20260113_121129.xlsx",
+        "250_20260113_154857.xlsx",
+    ],
+    # true = header dicocokkan ke cleaning.COLUMN_ALIASES dan diganti nama kanonik
+    # ("Item Code"/"kode item" → "ItemCode"); nama kolom di bawah ini pakai nama kanonik
+    "column_aliases": False,
+    "key": "item code",
+    # true = kode di kolom key dirapikan ('SE-6021. ' → 'SE-6021') di file hasil
+    "clean_codes": False,
+    "dedup_on": ["item code", "owner", "number"],
+    # file validasi (validate_jikiu_excel.py); null = lewati join status
+    "validation": "validation_FULL_20260113_133316.xlsx",
+    "validation_key": "item code",
+    "status_columns": ["status", "details"],
+    # null = semua kolom, urutan sesuai input (dengan column_aliases: semua kolom skema)
+    "columns": None,
+    # sort stabil; sama dengan urut item code lalu urut car maker seperti script lama
+    "sort_by": ["car maker name", "item code"],
+    "output": "Jikiu_Crosses_SortedByCarMaker_{timestamp}.xlsx",
+    # hasil tiap tahap disimpan (Parquet) supaya run berikutnya hanya menghitung tahap yang berubah
+    "cache_dir": ".pipeline_cache",
+}
+
+
+def load_config(path=None):
+    config = dict(DEFAULT_CONFIG)
+    if path:
+        with open(path, encoding="utf-8") as f:
+            config.update(json.load(f))
+    return config
+
+
+def expand_inputs(patterns):
+    """Daftar file dari nama/glob, urutan sesuai konfigurasi (glob diurutkan)"""
+    files = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern)) if glob.has_magic(pattern) else [pattern]
+        files.extend(f for f in matches if not os.path.basename(f).startswith("~$"))
+    if not files:
+        raise FileNotFoundError(f"❌ Tidak ada file input untuk {patterns}")
+    return files
+
+
+def file_fingerprint(path):
+    stat = os.stat(path)
+    return [path, stat.st_size, stat.st_mtime_ns]
+
+
+def normalize_columns(df, config, source):
+    if config["column_aliases"]:
+        return canonical_columns(df, source)
+    df.columns = df.columns.str.strip().str.lower()
+    return df
+
+
+# ================================
+# 🧱 TAHAP-TAHAP PIPELINE
+# ================================
+# Setiap tahap: (nama, parameter yang memengaruhi hasil, fungsi(df, config) -> df)
+
+def stage_concat(_, config):
+    frames = []
+    for f in expand_inputs(config["inputs"]):
+        df = normalize_columns(read_table(f), config, f)
+        print(f"   📄 {f}  ({len(df)} baris)")
+        frames.append(df)
+    merged = pd.concat(frames, ignore_index=True)
+    merged.dropna(how="all", inplace=True)
+
+    missing = [c for c in config["dedup_on"] + [config["key"]] if c not in merged.columns]
+    if missing:
+        raise ValueError(f"❌ Kolom {missing} tidak ditemukan di file input.")
+    if config["clean_codes"]:
+        merged[config["key"]] = clean_codes(merged[config["key"]])
+    return merged
+
+
+def stage_dedup(df, config):
+    # kolom kode dibandingkan lewat key kanonik ('SE-6021.' = 'se-6021')
+    subset = [KEY_COLUMN if c == config["key"] else c for c in config["dedup_on"]]
+    keyed = with_key(df, config["key"])
+    return df[~keyed.duplicated(subset=subset)].reset_index(drop=True)
+
+
+def stage_join_status(df, config):
+    if not config["validation"]:
+        return df
+    val = normalize_columns(read_table(config["validation"]), config, config["validation"])
+    val_key = config["validation_key"]
+    wanted = [c for c in config["status_columns"] if c in val.columns and c not in df.columns]
+    if not wanted:
+        # tidak ada kolom yang ditambahkan; join dengan key validasi yang dobel hanya menggandakan baris
+        return df
+    val_sub = with_key(val, val_key)[[KEY_COLUMN] + wanted]
+    # left join pada key kanonik, urutan baris crosses tidak berubah
+    return with_key(df, config["key"]).merge(val_sub, how="left", on=KEY_COLUMN).drop(columns=KEY_COLUMN)
+
+
+def stage_select(df, config):
+    if config["column_aliases"]:
+        # seperti merge_clean_final: kolom skema yang tidak ada di input jadi kosong
+        return df.reindex(columns=config["columns"] or list(COLUMN_ALIASES))
+    if not config["columns"]:
+        return df
+    missing = [c for c in config["columns"] if c not in df.columns]
+    if missing:
+        raise ValueError(f"❌ Kolom {missing} tidak ada di hasil gabungan.")
+    return df[config["columns"]]
+
+
+def stage_sort(df, config):
+    sort_by = [c for c in config["sort_by"] if c in df.columns]
+    if not sort_by:
+        return df
+    return df.sort_values(by=sort_by, na_position="last", kind="stable").reset_index(drop=True)
+
+
+STAGES = [
+    ("concat", lambda c: {"inputs": [file_fingerprint(f) for f in expand_inputs(c["inputs"])],
+                          "column_aliases": c["column_aliases"], "clean_codes": c["clean_codes"],
+                          "key": c["key"], "dedup_on": c["dedup_on"]}, stage_concat),
+    ("dedup", lambda c: {"dedup_on": c["dedup_on"], "key": c["key"]}, stage_dedup),
+    ("join_status", lambda c: {"validation": file_fingerprint(c["validation"]) if c["validation"] else None,
+                               "column_aliases": c["column_aliases"],
+                               "validation_key": c["validation_key"], "key": c["key"],
+                               "status_columns": c["status_columns"]}, stage_join_status),
+    ("select", lambda c: {"columns": c["columns"], "column_aliases": c["column_aliases"]}, stage_select),
+    ("sort", lambda c: {"sort_by": c["sort_by"]}, stage_sort),
+]
+
+
+def stage_keys(config):
+    """Hash per tahap = parameter tahap itu + hash tahap sebelumnya"""
+    keys = []
+    upstream = ""
+    for name, params, _ in STAGES:
+        payload = json.dumps([name, params(config), upstream], sort_keys=True, default=str)
+        upstream = hashlib.sha1(payload.encode("utf-8")).hexdigest()[:16]
+        keys.append(upstream)
+    return keys
+
+
+def run(config):
+    cache_dir = config["cache_dir"]
+    if cache_dir:
+        os.makedirs(cache_dir, exist_ok=True)
+    keys = stage_keys(config)
+
+    def cache_stem(i):
+        return os.path.join(cache_dir, f"{STAGES[i][0]}-{keys[i]}")
+
+    # Mulai dari tahap terakhir yang hasilnya masih valid di cache
+    df = None
+    start = 0
+    if cache_dir:
+        for i in reversed(range(len(STAGES))):
+            if os.path.exists(cache_stem(i) + ".parquet"):
+                df = read_table(cache_stem(i) + ".parquet")
+                start = i + 1
+                print(f"♻️ Tahap sampai '{STAGES[i][0]}' diambil dari cache ({len(df)} baris)")
+                break
+
+    for i in range(start, len(STAGES)):
+        name, _, func = STAGES[i]
+        t0 = time.perf_counter()
+        before = 0 if df is None else len(df)
+        df = func(df, config)
+        print(f"🔧 {name:12} {before:>7} → {len(df):>7} baris  ({time.perf_counter() - t0:.2f} s)")
+        if cache_dir:
+            # hanya simpan versi terbaru per tahap
+            for old in glob.glob(os.path.join(cache_dir, f"{name}-*.parquet")):
+                os.remove(old)
+            write_table(df, cache_stem(i))
+    return df
+
+
+def export(df, config):
+    """Satu-satunya penulisan file akhir (.xlsx / .parquet / .feather sesuai ekstensi output)"""
+    output = config["output"].format(timestamp=datetime.now().strftime("%Y%m%d_%H%M%S"))
+    stem, ext = os.path.splitext(output)
+    return write_table(df, stem, fmt=ext.lstrip(".") or "xlsx")
+
+
+if __name__ == "__main__":
+    config = load_config(sys.argv[1] if len(sys.argv) > 1 else None)
+    start_time = time.time()
+    print("📦 Menjalankan pipeline post-processing...")
+    result = run(config)
+    output_file = export(result, config)
+    print(f"\n✅ Selesai dalam {time.time() - start_time:.2f} detik")
+    print(f"💾 File disimpan sebagai: {output_file}")
+    print(f"📊 Total baris akhir: {len(result)}")
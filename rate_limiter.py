@@ -0,0 +1,77 @@
+import asyncio
+import threading
+import time
+
+
+class RateLimiter:
+    """Token bucket shared by all crawlers, with adaptive backoff.
+
+    `rate` is the target requests per second and `burst` the number of
+    requests that may go out back-to-back. When the site answers with
+    HTTP 429/5xx or a request times out, the current rate is cut by
+    `backoff`; after `recover_after` healthy responses in a row it climbs
+    back by `recovery` * target rate until the target is reached again.
+    The same instance can be used from threads (acquire) and from asyncio
+    tasks (acquire_async).
+    """
+
+    def __init__(self, rate=1.0, burst=1, min_rate=0.1, backoff=0.5, recovery=0.1, recover_after=10):
+        self.target_rate = rate
+        self.rate = rate
+        self.burst = burst
+        self.min_rate = min_rate
+        self.backoff = backoff
+        self.recovery = recovery
+        self.recover_after = recover_after
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.healthy_streak = 0
+        self.lock = threading.Lock()
+
+    def _reserve(self):
+        """Take one token and return how long the caller must wait for it"""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+            return max(wait, self.paused_until - now)
+
+    def acquire(self):
+        """Block the current thread until a request may be sent"""
+        wait = self._reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self):
+        """Wait (without blocking the event loop) until a request may be sent"""
+        wait = self._reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def report(self, status=None, error=False, retry_after=None):
+        """Feed back the outcome of a request.
+
+        status: HTTP status code if known (None for browser loads)
+        error: True for timeouts / connection failures
+        retry_after: value of a Retry-After header, in seconds
+        """
+        throttled = error or status == 429 or (status is not None and status >= 500)
+        with self.lock:
+            if throttled:
+                self.rate = max(self.min_rate, self.rate * self.backoff)
+                self.healthy_streak = 0
+                try:
+                    pause = float(retry_after) if retry_after else 0.0
+                except ValueError:
+                    pause = 0.0
+                if pause > 0:
+                    self.paused_until = max(self.paused_until, time.monotonic() + pause)
+            else:
+                self.healthy_streak += 1
+                if self.healthy_streak >= self.recover_after and self.rate < self.target_rate:
+                    self.rate = min(self.target_rate, self.rate + self.target_rate * self.recovery)
+                    self.healthy_streak = 0
+        return throttled
@@ -0,0 +1,164 @@
+import sqlite3
+import threading
+import time
+import zlib
+
+from item_codes import normalize_key
+
+
+class ResponseCache:
+    """Persistent on-disk cache of catalogue pages, keyed by item code.
+
+    Pages are stored zlib-compressed in a single SQLite file so every
+    crawler (JikiuCrawler, validate_jikiu_excel.py, validate_crosses.py)
+    can reuse a download made by another one. `kind` separates raw HTTP
+    HTML ('html') from browser-rendered body text ('text').
+
+    ttl_days: entries older than this are never served (None = no expiry)
+    max_bytes: compressed size budget; least recently used entries are
+        evicted once it is exceeded
+    refresh_older_than_days: per-run override that treats anything older
+        than N days as a miss so it gets re-downloaded
+
+    HTTP pages also keep their ETag / Last-Modified validators so an
+    expired entry can be revalidated with a conditional request instead
+    of being downloaded again (see validators / revalidated).
+    """
+
+    def __init__(self, path='jikiu_cache.sqlite', ttl_days=30, max_bytes=500 * 1024 * 1024,
+                 refresh_older_than_days=None):
+        self.path = path
+        self.ttl_days = ttl_days
+        self.max_bytes = max_bytes
+        self.refresh_older_than_days = refresh_older_than_days
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS pages (
+                key TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                url TEXT,
+                body BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                fetched_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                PRIMARY KEY (key, kind)
+            )
+        """)
+        # Cache files created before validators were stored
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(pages)")}
+        for column in ('etag', 'last_modified'):
+            if column not in columns:
+                self.conn.execute(f"ALTER TABLE pages ADD COLUMN {column} TEXT")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS pages_accessed ON pages (accessed_at)")
+        self.conn.commit()
+        self.total_bytes = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM pages").fetchone()[0]
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+
+    def _max_age(self):
+        """Oldest acceptable age in seconds for this run (None = any age)"""
+        limits = [days for days in (self.ttl_days, self.refresh_older_than_days) if days is not None]
+        return min(limits) * 86400 if limits else None
+
+    def get(self, item_code, kind='html'):
+        """Return the cached page for an item code, or None on a miss"""
+        key = normalize_key(item_code)
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT body, fetched_at FROM pages WHERE key = ? AND kind = ?", (key, kind)
+            ).fetchone()
+            max_age = self._max_age()
+            now = time.time()
+            if row is None or (max_age is not None and now - row[1] > max_age):
+                self.misses += 1
+                return None
+            self.conn.execute(
+                "UPDATE pages SET accessed_at = ? WHERE key = ? AND kind = ?", (now, key, kind)
+            )
+            self.conn.commit()
+            self.hits += 1
+        return zlib.decompress(row[0]).decode('utf-8')
+
+    def validators(self, item_code, kind='html'):
+        """(content, etag, last_modified) of a stored page of any age, or None
+        when there is no entry or it has no validators to revalidate with"""
+        key = normalize_key(item_code)
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT body, etag, last_modified FROM pages WHERE key = ? AND kind = ?", (key, kind)
+            ).fetchone()
+        if row is None or not (row[1] or row[2]):
+            return None
+        return zlib.decompress(row[0]).decode('utf-8'), row[1], row[2]
+
+    def revalidated(self, item_code, kind='html'):
+        """The server answered 304 Not Modified: the stored page is fresh again"""
+        key = normalize_key(item_code)
+        now = time.time()
+        with self.lock:
+            self.conn.execute(
+                "UPDATE pages SET fetched_at = ?, accessed_at = ? WHERE key = ? AND kind = ?",
+                (now, now, key, kind)
+            )
+            self.conn.commit()
+            self.revalidations += 1
+
+    def put(self, item_code, content, kind='html', url='', etag=None, last_modified=None):
+        """Store a downloaded page and evict old entries if over budget"""
+        key = normalize_key(item_code)
+        body = zlib.compress(content.encode('utf-8'))
+        now = time.time()
+        with self.lock:
+            old = self.conn.execute(
+                "SELECT size FROM pages WHERE key = ? AND kind = ?", (key, kind)
+            ).fetchone()
+            self.conn.execute(
+                "INSERT OR REPLACE INTO pages "
+                "(key, kind, url, body, size, fetched_at, accessed_at, etag, last_modified) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, kind, url, body, len(body), now, now, etag, last_modified)
+            )
+            self.total_bytes += len(body) - (old[0] if old else 0)
+            self._evict()
+            self.conn.commit()
+
+    def _evict(self):
+        """Drop least recently used entries until the size budget fits"""
+        if self.max_bytes is None or self.total_bytes <= self.max_bytes:
+            return
+        cursor = self.conn.execute("SELECT key, kind, size FROM pages ORDER BY accessed_at")
+        victims = []
+        for key, kind, size in cursor:
+            if self.total_bytes <= self.max_bytes:
+                break
+            victims.append((key, kind))
+            self.total_bytes -= size
+        self.conn.executemany("DELETE FROM pages WHERE key = ? AND kind = ?", victims)
+
+    def purge_expired(self):
+        """Delete entries past the TTL, returns number of rows removed"""
+        if self.ttl_days is None:
+            return 0
+        cutoff = time.time() - self.ttl_days * 86400
+        with self.lock:
+            removed = self.conn.execute("DELETE FROM pages WHERE fetched_at < ?", (cutoff,)).rowcount
+            self.total_bytes = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM pages").fetchone()[0]
+            self.conn.commit()
+        return removed
+
+    def items(self, kind='html'):
+        """Yield (key, url, content) for every cached page, for offline re-parsing"""
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT key, url, body FROM pages WHERE kind = ? ORDER BY key", (kind,)
+            ).fetchall()
+        for key, url, body in rows:
+            yield key, url, zlib.decompress(body).decode('utf-8')
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
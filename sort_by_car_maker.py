@@ -1,20 +1,14 @@
-import pandas as pd
-import os
 from datetime import datetime
 
+from frame_store import latest_table, read_table, write_table
+
+EXPORT_XLSX = True  # tahap terakhir: hasil diekspor ke .xlsx
+
 # ================================
 # ⚙️ 1. CARI FILE TERBARU OTOMATIS
 # ================================
 prefix = "Jikiu_Crosses_Merged_Status_"
-latest_file = None
-latest_time = 0
-
-for f in os.listdir("."):
-    if f.startswith(prefix) and f.endswith(".xlsx"):
-        mtime = os.path.getmtime(f)
-        if mtime > latest_time:
-            latest_file = f
-            latest_time = mtime
+latest_file = latest_table(prefix)  # .parquet / .feather / .xlsx
 
 if not latest_file:
     raise FileNotFoundError(f"❌ Tidak ada file dengan prefix '{prefix}' di folder ini.")
@@ -24,7 +18,7 @@ print(f"📂 File terbaru ditemukan: {latest_file}")
 # ================================
 # 📘 2. BACA FILE
 # ================================
-df = pd.read_excel(latest_file)
+df = read_table(latest_file)
 print(f"📊 Total baris awal: {len(df)}")
 
 # ================================
@@ -44,13 +38,15 @@ print(f"🔍 Kolom pengurutan: {car_maker_col}")
 # ================================
 # Urut berdasarkan Car Maker Name (A–Z)
 # Baris yang kosong (NaN) akan diletakkan di bawah
-df_sorted = df.sort_values(by=car_maker_col, ascending=True, na_position='last')
+df_sorted = df.sort_values(by=car_maker_col, ascending=True, na_position='last', kind='stable')
 
 # ================================
 # 💾 5. SIMPAN HASIL
 # ================================
-output_file = f"Jikiu_Crosses_SortedByCarMaker_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
-df_sorted.to_excel(output_file, index=False)
+output_stem = f"Jikiu_Crosses_SortedByCarMaker_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+output_file = write_table(df_sorted, output_stem)
+if EXPORT_XLSX:
+    output_file = write_table(df_sorted, output_stem, fmt='xlsx')
 
 print(f"\n✅ Selesai! Data telah diurutkan berdasarkan '{car_maker_col}'.")
 print(f"💾 File disimpan sebagai: {output_file}")
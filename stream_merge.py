@@ -0,0 +1,194 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.ipc
+import pyarrow.parquet as pq
+from openpyxl import Workbook, load_workbook
+
+from item_codes import canonical_keys
+
+CHUNK_ROWS = 50_000
+
+
+def _xlsx_header(path):
+    wb = load_workbook(path, read_only=True)
+    try:
+        first = next(wb.active.iter_rows(max_row=1, values_only=True), ())
+        return [str(col) for col in first if col is not None]
+    finally:
+        wb.close()
+
+
+def table_columns(path):
+    """Column names of a table without loading its rows"""
+    suffix = os.path.splitext(path)[1].lower()
+    if suffix == '.parquet':
+        return list(pq.ParquetFile(path).schema_arrow.names)
+    if suffix == '.feather':
+        with pa.memory_map(path) as source:
+            return list(pa.ipc.open_file(source).schema.names)
+    return _xlsx_header(path)
+
+
+def iter_table_chunks(path, chunk_rows=CHUNK_ROWS):
+    """Yield a table as DataFrames of at most `chunk_rows` rows"""
+    suffix = os.path.splitext(path)[1].lower()
+    if suffix == '.parquet':
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_rows):
+            yield batch.to_pandas()
+        return
+    if suffix == '.feather':
+        with pa.memory_map(path) as source:
+            reader = pa.ipc.open_file(source)
+            for i in range(reader.num_record_batches):
+                yield reader.get_batch(i).to_pandas()
+        return
+
+    wb = load_workbook(path, read_only=True)
+    try:
+        rows = wb.active.iter_rows(values_only=True)
+        header = [str(col) for col in next(rows, ()) if col is not None]
+        buffer = []
+        for row in rows:
+            buffer.append(row[:len(header)])
+            if len(buffer) >= chunk_rows:
+                yield pd.DataFrame(buffer, columns=header)
+                buffer = []
+        if buffer:
+            yield pd.DataFrame(buffer, columns=header)
+    finally:
+        wb.close()
+
+
+def as_text(chunk):
+    """All columns as nullable strings; whole-number floats lose their '.0'
+    so 45200 read from xlsx and 45200.0 read from parquet give the same key."""
+    chunk = chunk.copy()
+    for col in chunk.columns:
+        values = chunk[col]
+        if values.dtype.kind == 'f' and (values.dropna() % 1 == 0).all():
+            chunk[col] = values.astype('Int64')
+    return chunk.astype(object).where(chunk.notna(), None).astype('string')
+
+
+class SeenKeys:
+    """Compact set of row keys: one sorted uint64 hash per distinct key (8 bytes/row)"""
+
+    def __init__(self):
+        self.hashes = np.empty(0, dtype=np.uint64)
+
+    def new_rows(self, keys):
+        """Boolean mask of rows in `keys` (DataFrame) not seen before; marks them as seen"""
+        hashes = pd.util.hash_pandas_object(keys, index=False).to_numpy()
+        mask = ~pd.Series(hashes).duplicated().to_numpy()
+        if len(self.hashes):
+            pos = np.searchsorted(self.hashes, hashes)
+            found = self.hashes[np.minimum(pos, len(self.hashes) - 1)] == hashes
+            mask &= ~found
+        self.hashes = np.union1d(self.hashes, hashes[mask])
+        return mask
+
+    def __len__(self):
+        return len(self.hashes)
+
+
+class ChunkWriter:
+    """Append chunks to a Parquet file (and optionally a write-only .xlsx sheet)"""
+
+    def __init__(self, stem, columns, export_xlsx=False):
+        self.path = f"{stem}.parquet"
+        self.columns = columns
+        self.schema = pa.schema([(col, pa.string()) for col in columns])
+        self.parquet = pq.ParquetWriter(self.path, self.schema)
+        self.xlsx_path = f"{stem}.xlsx" if export_xlsx else None
+        self.workbook = None
+        if export_xlsx:
+            self.workbook = Workbook(write_only=True)
+            self.sheet = self.workbook.create_sheet()
+            self.sheet.append(columns)
+
+    def write(self, chunk):
+        self.parquet.write_table(pa.Table.from_pandas(chunk, schema=self.schema, preserve_index=False))
+        if self.workbook is not None:
+            for row in chunk.itertuples(index=False):
+                self.sheet.append([None if pd.isna(v) else v for v in row])
+
+    def close(self):
+        self.parquet.close()
+        if self.workbook is not None:
+            self.workbook.save(self.xlsx_path)
+
+
+def sort_table(path, column, output_stem, export_xlsx=False, chunk_rows=CHUNK_ROWS):
+    """Rewrite a Parquet table ordered by `column` (stable, empty values last,
+    like DataFrame.sort_values) as `<output_stem>.parquet` (+ .xlsx); returns the paths.
+
+    The table is held once in Arrow memory, so this is meant for the
+    already deduplicated output of stream_merge, not for its inputs.
+    """
+    table = pq.read_table(path)
+    table = table.take(pc.sort_indices(table, sort_keys=[(column, 'ascending')]))
+    writer = ChunkWriter(output_stem, table.schema.names, export_xlsx=export_xlsx)
+    try:
+        for start in range(0, table.num_rows, chunk_rows):
+            writer.write(table.slice(start, chunk_rows).to_pandas())
+    finally:
+        writer.close()
+    return [writer.path] + ([writer.xlsx_path] if export_xlsx else [])
+
+
+def stream_merge(files, output_stem, key_cols, code_column=None, rename=None, drop_empty=False,
+                 export_xlsx=False, chunk_rows=CHUNK_ROWS, sort_by=None):
+    """Concatenate and deduplicate tables chunk by chunk with flat memory.
+
+    Rows are kept in input order, first occurrence wins (same as
+    pd.concat + drop_duplicates). Only one chunk and the 8-byte key hashes
+    are held in memory; all columns are written as strings so chunks from
+    different files share one schema. `rename` maps raw header names to
+    output names (e.g. lower-casing). `code_column` (one of `key_cols`) is
+    compared by its canonical item-code key. With `sort_by` the deduplicated
+    result is finally ordered by that column (see sort_table). Returns
+    (rows_in, rows_out, paths).
+    """
+    rename = rename or (lambda col: col)
+    columns = []
+    for f in files:
+        for col in map(rename, table_columns(f)):
+            if col not in columns:
+                columns.append(col)
+    missing = [col for col in key_cols if col not in columns]
+    if missing:
+        raise ValueError(f"Key columns {missing} not found in {files}")
+
+    seen = SeenKeys()
+    if sort_by is not None and sort_by not in columns:
+        raise ValueError(f"Sort column {sort_by!r} not found in {files}")
+    # sorted output: dedup into a temporary file first, sort_table writes the real one
+    stem = f"{output_stem}.unsorted" if sort_by else output_stem
+    writer = ChunkWriter(stem, columns, export_xlsx=export_xlsx and not sort_by)
+    rows_in = rows_out = 0
+    try:
+        for f in files:
+            for chunk in iter_table_chunks(f, chunk_rows):
+                chunk = chunk.rename(columns=rename).reindex(columns=columns)
+                chunk = as_text(chunk)
+                if drop_empty:
+                    chunk = chunk.dropna(how='all')
+                rows_in += len(chunk)
+                keys = chunk[key_cols]
+                if code_column:
+                    keys = keys.assign(**{code_column: canonical_keys(keys[code_column])})
+                chunk = chunk[seen.new_rows(keys)]
+                rows_out += len(chunk)
+                writer.write(chunk)
+    finally:
+        writer.close()
+    if sort_by:
+        paths = sort_table(writer.path, sort_by, output_stem, export_xlsx=export_xlsx, chunk_rows=chunk_rows)
+        os.remove(writer.path)
+    else:
+        paths = [writer.path] + ([writer.xlsx_path] if export_xlsx else [])
+    return rows_in, rows_out, paths
@@ -0,0 +1,187 @@
+import pandas as pd
+import time
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from rate_limiter import RateLimiter
+from item_codes import clean_code, merge_on_key, normalize_key, unique_codes
+from response_cache import ResponseCache
+from driver_pool import DriverPool
+from checkpoint import CheckpointStore, input_fingerprint
+from change_tracker import ChangeTracker
+from jikiu_browser import chrome_options, block_heavy_resources
+from hybrid_fetcher import HybridFetcher
+from jikiu_pages import SPEC_FIELDS, analyze_page_text, parse_specs_from_text, extract_crosses
+from metrics import Metrics
+
+# ===============================
+# KONFIGURASI
+# ===============================
+# Satu kali fetch per item → status + JIKIU code + tipe + spesifikasi + crosses.
+# Menggantikan validate_jikiu_excel.py + validate_crosses.py + merge_add_status_details.py
+EXCEL_PATH = 'List spare parts-Anugerah Auto.xlsx'
+OUTPUT_FILE = 'Jikiu_Crosses_Merged_Status_latest.xlsx'  # snapshot lengkap, ditimpa tiap run
+DELTA_FILE = f'Jikiu_Crosses_Delta_{datetime.now().strftime("%Y%m%d_%H%M%S")}.xlsx'  # hanya kalau ada perubahan
+RATE_LIMIT_RPS = 1.0     # target request per detik ke jikiu.com
+RATE_LIMIT_BURST = 2     # jumlah request boleh beruntun tanpa jeda
+CACHE_PATH = 'jikiu_cache.sqlite'  # cache halaman, sama dengan script validasi lain
+REFRESH_OLDER_THAN_DAYS = None     # isi angka (mis. 7) untuk paksa download ulang halaman lama
+POOL_SIZE = 4            # jumlah Chrome headless yang jalan paralel
+PAGES_PER_BROWSER = 100  # Chrome di-recycle setelah sekian halaman
+LEAN_BROWSER = True      # blok gambar/font/media/domain pihak ketiga, page load "eager"
+HTTP_FIRST = True        # HTML biasa dulu (beberapa KB), Chrome hanya kalau halaman belum lengkap
+CHECKPOINT_PATH = 'checkpoint_pipeline.sqlite'  # progres per item, aman kalau crash
+RESUME = True  # Lanjutkan otomatis dari checkpoint (False = proses ulang semua)
+CHECKPOINT_MAX_AGE_DAYS = 7  # item 'done' lebih tua dari ini diproses ulang (None = pakai terus)
+SNAPSHOT_PATH = 'snapshot_pipeline.sqlite'  # fingerprint isi per item dari crawl terakhir + log perubahan
+RECRAWL = False  # True = ambil ulang semua item (abaikan checkpoint & cache, 304 tetap dipakai) → file delta
+
+# waktu per tahap, item/detik, retry & restart browser → metrics_validate_and_crosses_*.json
+metrics = Metrics('validate_and_crosses')
+
+print("📘 Membaca file Excel...")
+with metrics.timer('read_excel'):
+    df = pd.read_excel(EXCEL_PATH)
+item_codes = unique_codes(df['ItemCode'])  # satu fetch per kode unik, hasil di-join balik ke semua baris
+print(f"🔍 Total {len(df)} baris, {len(item_codes)} kode unik akan diproses.\n")
+
+# ===============================
+# SETUP FETCHER (HTTP dulu, SELENIUM kalau perlu)
+# ===============================
+options = chrome_options(lean=LEAN_BROWSER, headless=True)
+
+
+def start_browsers():
+    # dipanggil sekali, saat halaman pertama yang butuh browser
+    print(f"🚀 Menyiapkan {POOL_SIZE} browser...")
+    return DriverPool(options, size=POOL_SIZE, max_pages=PAGES_PER_BROWSER, wait_timeout=10,
+                      setup=block_heavy_resources if LEAN_BROWSER else None)
+
+
+limiter = RateLimiter(rate=RATE_LIMIT_RPS, burst=RATE_LIMIT_BURST)
+# Re-crawl: semua halaman cache dianggap basi, HybridFetcher revalidasi pakai ETag (304 = tidak berubah)
+cache = ResponseCache(CACHE_PATH, refresh_older_than_days=0 if RECRAWL else REFRESH_OLDER_THAN_DAYS)
+fetcher = HybridFetcher(limiter, cache, start_browsers, attempts=2, metrics=metrics,
+                        http_first=HTTP_FIRST, pool_size=POOL_SIZE)
+checkpoint = CheckpointStore(CHECKPOINT_PATH, max_age_days=CHECKPOINT_MAX_AGE_DAYS)
+tracker = ChangeTracker(SNAPSHOT_PATH)
+reset = checkpoint.start_run(input_fingerprint(EXCEL_PATH, item_codes), resume=RESUME)
+if reset == 'different input':
+    print(f"🧹 {CHECKPOINT_PATH} berisi progres input lain, mulai dari nol.")
+
+# Resume: item yang sudah selesai dilewati, item ERROR diulang (re-crawl: semua item diambil ulang)
+done_keys = set() if RECRAWL else checkpoint.completed_keys()
+todo = [(pos, code) for pos, code in enumerate(item_codes, 1) if normalize_key(code) not in done_keys]
+for run_id, count in checkpoint.reused_runs(done_keys).items():
+    print(f"♻️ {count} item dipakai ulang dari run sebelumnya ({run_id}), "
+          f"umur maks {CHECKPOINT_MAX_AGE_DAYS} hari — set RESUME = False untuk proses ulang semua.")
+print(f"⏭️ {len(item_codes) - len(todo)} item sudah ada di checkpoint, sisa {len(todo)} item.\n")
+
+
+def process_item(original_code):
+    """Semua baris hasil untuk satu item (jalan di thread worker)."""
+    code = clean_code(original_code)
+    page_text, dom_crosses, source = fetcher.fetch(code)
+    # 429 terus-menerus = ERROR juga, supaya diulang saat resume dan tidak masuk snapshot
+    if page_text is None or source == 'rate limited':
+        details = "Rate Limited (429)" if source == 'rate limited' else "Connection Timeout"
+        analysis = {'status': "ERROR", 'jikiu_code': "", 'item_type': "", 'details': details}
+        specs, crosses_pairs = {}, []
+    else:
+        with metrics.timer('parse'):
+            analysis = analyze_page_text(code, page_text)
+            found = analysis['status'] == "FOUND"
+            specs = parse_specs_from_text(page_text) if found else {}
+            crosses_pairs = extract_crosses(page_text, dom_crosses) if found else []
+
+    base = {
+        "Item Code": original_code,
+        "Status": analysis['status'],
+        "Details": analysis['details'],
+        "JIKIU Code": analysis['jikiu_code'],
+        "Item Type": analysis['item_type'],
+    }
+    base.update({f"Spec {field}": specs.get(field, "") for field in SPEC_FIELDS})
+
+    # satu baris per pasangan Owner ↔ Number (baris kosong kalau tidak ada crosses)
+    rows = [{**base, "Owner": p["Owner"], "Number": p["Number"]}
+            for p in crosses_pairs or [{"Owner": "", "Number": ""}]]
+    return rows, analysis['status'], source, len(crosses_pairs)
+
+
+# ===============================
+# LOOP ITEM (paralel; tiap item di-checkpoint begitu selesai, urutan export dari 'position')
+# ===============================
+start_time = time.time()
+
+executor = ThreadPoolExecutor(max_workers=POOL_SIZE)
+try:
+    futures = {executor.submit(process_item, original_code): (pos, original_code) for pos, original_code in todo}
+    for i, future in enumerate(as_completed(futures), 1):
+        pos, original_code = futures[future]
+        rows, status, source, n_crosses = future.result()
+        print(f"[{i}/{len(todo)}] {original_code:15} {status:12} crosses: {n_crosses:<4} ({source})")
+        with metrics.timer('checkpoint'):
+            checkpoint.record(original_code, rows, status='error' if status == "ERROR" else 'done', position=pos,
+                              source=source)
+        # ERROR = halaman gagal diambil / kena rate limit, bukan perubahan isi katalog
+        if status != "ERROR":
+            first = rows[0]
+            changes = tracker.observe(
+                original_code, status, first["JIKIU Code"],
+                {field: first[f"Spec {field}"] for field in SPEC_FIELDS},
+                [(r["Owner"], r["Number"]) for r in rows if r["Owner"] or r["Number"]],
+            )
+            metrics.count('items_changed' if changes else 'items_unchanged')
+        metrics.item()
+
+except KeyboardInterrupt:
+    print("\nProses dihentikan paksa oleh pengguna. Menyimpan data yang ada...")
+finally:
+    executor.shutdown(wait=False, cancel_futures=True)
+
+fetcher.close()
+print(f"🌐 Sumber halaman: {dict(checkpoint.sources())}")
+metrics.set('driver_restarts', fetcher.restarts)
+metrics.set('cache_hits', cache.hits)
+cache.close()
+
+# Hasil lengkap (run sebelumnya + run ini) langsung dari checkpoint, urut sesuai input
+results = checkpoint.rows_for(item_codes)
+checkpoint.close()
+
+# ===============================
+# GABUNG DETAIL & SIMPAN
+# ===============================
+result_df = pd.DataFrame(results)
+merged_df = merge_on_key(result_df, df, left_on='Item Code', right_on='ItemCode', how='left')
+
+# Urutan kolom sama dengan Jikiu_Crosses_Merged_Status_*.xlsx, kolom baru di belakang
+ordered_cols = (
+    ['Item Code', 'Owner', 'Number'] + list(df.columns) + ['Status', 'Details', 'JIKIU Code', 'Item Type']
+    + [f"Spec {field}" for field in SPEC_FIELDS]
+)
+merged_df = merged_df[[c for c in ordered_cols if c in merged_df.columns]]
+merged_df.columns = merged_df.columns.str.strip().str.lower()
+
+# Delta: log perubahan run ini + baris lengkap item yang berubah saja (untuk merge berikutnya)
+changes_df = tracker.changes()
+changed_keys = tracker.changed_keys()
+tracker.close()
+
+with metrics.timer('excel_write'):
+    merged_df.to_excel(OUTPUT_FILE, index=False)
+    if len(changes_df):
+        changed_df = merged_df[merged_df['item code'].map(normalize_key).isin(changed_keys)]
+        with pd.ExcelWriter(DELTA_FILE) as writer:
+            changes_df.to_excel(writer, sheet_name='Perubahan', index=False)
+            changed_df.to_excel(writer, sheet_name='Item Berubah', index=False)
+print(f"\n✅ Selesai dalam {(time.time() - start_time)/60:.2f} menit")
+print(f"💾 Snapshot disimpan sebagai: {OUTPUT_FILE}")
+print(f"📊 Total baris akhir: {len(merged_df)}")
+if len(changes_df):
+    counts = changes_df['Change'].value_counts().to_dict()
+    print(f"🔄 {len(changed_keys)} item berubah {counts} → {DELTA_FILE}")
+else:
+    print("🟰 Tidak ada perubahan sejak crawl terakhir, file delta tidak dibuat.")
+metrics.report()
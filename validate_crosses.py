@@ -1,183 +1,140 @@
 import pandas as pd
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-import time
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from rate_limiter import RateLimiter
+from item_codes import clean_code, merge_on_key, normalize_key, unique_codes
+from response_cache import ResponseCache
+from driver_pool import DriverPool
+from checkpoint import CheckpointStore, input_fingerprint
+from jikiu_browser import chrome_options, block_heavy_resources
+from hybrid_fetcher import HybridFetcher
+from jikiu_pages import extract_crosses, is_not_found
+from metrics import Metrics
 
 # ===============================
 # KONFIGURASI
 # ===============================
 EXCEL_PATH = '250.xlsx'
 OUTPUT_FILE = f'250_{datetime.now().strftime("%Y%m%d_%H%M%S")}.xlsx'
+RATE_LIMIT_RPS = 0.5     # target request per detik ke jikiu.com
+RATE_LIMIT_BURST = 2     # jumlah request boleh beruntun tanpa jeda
+CACHE_PATH = 'jikiu_cache.sqlite'  # cache halaman, dipakai bareng validate_jikiu_excel.py
+REFRESH_OLDER_THAN_DAYS = None     # isi angka (mis. 7) untuk paksa download ulang halaman lama
+POOL_SIZE = 4            # jumlah Chrome headless yang jalan paralel
+PAGES_PER_BROWSER = 100  # Chrome di-recycle setelah sekian halaman biar stabil
+LEAN_BROWSER = True      # blok gambar/font/media/domain pihak ketiga, page load "eager"
+HTTP_FIRST = True        # HTML biasa dulu (beberapa KB), Chrome hanya kalau halaman belum lengkap
+CHECKPOINT_PATH = 'checkpoint_crosses.sqlite'  # progres per item (pengganti autosave_*.xlsx)
+RESUME = True            # lanjutkan dari checkpoint (False = mulai dari nol)
+CHECKPOINT_MAX_AGE_DAYS = 7  # item 'done' lebih tua dari ini diambil ulang (None = pakai terus)
+
+# waktu per tahap, item/detik, retry & restart browser → metrics_validate_crosses_*.json
+metrics = Metrics('validate_crosses')
 
 print("📘 Membaca file Excel...")
-df = pd.read_excel(EXCEL_PATH)
-item_codes = df['ItemCode'].astype(str).tolist()  # semua item
-print(f"🔍 Total {len(item_codes)} kode akan diproses.\n")
+with metrics.timer('read_excel'):
+    df = pd.read_excel(EXCEL_PATH)
+item_codes = unique_codes(df['ItemCode'])  # satu fetch per kode unik, hasil di-join balik ke semua baris
+print(f"🔍 Total {len(df)} baris, {len(item_codes)} kode unik akan diproses.\n")
 
 # ===============================
-# SETUP SELENIUM
+# SETUP FETCHER (HTTP dulu, SELENIUM kalau perlu)
 # ===============================
-options = webdriver.ChromeOptions()
-options.add_argument("--window-size=1920,1080")
-options.add_argument("--disable-blink-features=AutomationControlled")
-# options.add_argument("--headless")  # bisa aktifkan kalau mau tanpa UI
-driver = webdriver.Chrome(options=options)
-wait = WebDriverWait(driver, 15)
+options = chrome_options(lean=LEAN_BROWSER, headless=True)
 
-results = []
 
-# ===============================
-# PARSER CROSSES
-# ===============================
-def parse_crosses_from_text(text):
-    """Ambil pasangan Owner ↔ Number dari teks halaman Jikiu."""
-    if "Crosses" not in text:
-        return []
-
-    section = text.split("Crosses", 1)[-1]
-    lines = [ln.strip() for ln in section.split("\n") if ln.strip()]
-
-    start_idx = None
-    for i, ln in enumerate(lines):
-        if ln.lower().startswith("owner"):
-            start_idx = i + 1
-            break
-    if start_idx is None:
-        return []
-
-    valid_lines = []
-    for ln in lines[start_idx:]:
-        if any(stop in ln.lower() for stop in ["application", "brand", "vehicle", "datsun", "nissan »"]):
-            break
-        if ln and ln.lower() not in ["owner", "number"]:
-            valid_lines.append(ln)
-
-    pairs = []
-    i = 0
-    while i < len(valid_lines) - 1:
-        owner = valid_lines[i].strip()
-        number = valid_lines[i + 1].strip()
-        if (
-            len(owner) > 1
-            and len(number) > 1
-            and not owner.lower().startswith("number")
-            and not number.lower().startswith("owner")
-        ):
-            pairs.append({"Owner": owner, "Number": number})
-            i += 2
-        else:
-            i += 1
-
-    return pairs
+def start_browsers():
+    # baru dipanggil saat halaman pertama yang butuh render JavaScript
+    print(f"🚀 Menyiapkan {POOL_SIZE} browser...")
+    return DriverPool(options, size=POOL_SIZE, max_pages=PAGES_PER_BROWSER, wait_timeout=15,
+                      setup=block_heavy_resources if LEAN_BROWSER else None)
+
+
+# pengganti time.sleep tetap: otomatis melambat kalau situs error / timeout
+limiter = RateLimiter(rate=RATE_LIMIT_RPS, burst=RATE_LIMIT_BURST)
+
+cache = ResponseCache(CACHE_PATH, refresh_older_than_days=REFRESH_OLDER_THAN_DAYS)
+
+fetcher = HybridFetcher(limiter, cache, start_browsers, attempts=3, metrics=metrics,
+                        http_first=HTTP_FIRST, pool_size=POOL_SIZE)
+
+# tiap item langsung di-commit (crash tidak kehilangan progres)
+checkpoint = CheckpointStore(CHECKPOINT_PATH, max_age_days=CHECKPOINT_MAX_AGE_DAYS)
+reset = checkpoint.start_run(input_fingerprint(EXCEL_PATH, item_codes), resume=RESUME)
+if reset == 'different input':
+    print(f"🧹 {CHECKPOINT_PATH} berisi progres input lain, mulai dari nol.")
+
+# Resume otomatis: lewati kode yang sudah selesai, ulangi yang error
+done_keys = checkpoint.completed_keys()
+todo = [(pos, code) for pos, code in enumerate(item_codes, 1) if normalize_key(code) not in done_keys]
+for run_id, count in checkpoint.reused_runs(done_keys).items():
+    print(f"♻️ {count} item dipakai ulang dari run sebelumnya ({run_id}), "
+          f"umur maks {CHECKPOINT_MAX_AGE_DAYS} hari — set RESUME = False untuk proses ulang semua.")
+print(f"⏩ {len(item_codes) - len(todo)} item sudah ada di checkpoint, sisa {len(todo)} item.\n")
+
+
+def process_item(code):
+    """Baris hasil (Item Code, Owner, Number), status checkpoint, sumber halaman + catatan untuk log."""
+    page_text, dom_crosses, source = fetcher.fetch(clean_code(code))
+    # kena rate limit terus → 'error', supaya diulang saat resume
+    if source == 'rate limited':
+        return [{"Item Code": code, "Owner": "", "Number": ""}], 'error', source, "⏳ Kena rate limit (429), skip."
+    if page_text is None:
+        return [{"Item Code": code, "Owner": "", "Number": ""}], 'error', source, "❌ Gagal load halaman, skip."
+
+    # cek apakah ditemukan
+    if is_not_found(page_text):
+        return [{"Item Code": code, "Owner": "", "Number": ""}], 'done', source, f"✗ Tidak ditemukan di katalog. ({source})"
+
+    # tabel Crosses langsung dari DOM, fallback ke parser teks untuk halaman cache lama
+    with metrics.timer('parse'):
+        crosses_pairs = extract_crosses(page_text, dom_crosses)
+    note = f"✓ Data ditemukan, total pasangan: {len(crosses_pairs)} ({source})"
+    if not crosses_pairs:
+        return [{"Item Code": code, "Owner": "", "Number": ""}], 'done', source, note
+    return [{"Item Code": code, "Owner": p["Owner"], "Number": p["Number"]} for p in crosses_pairs], 'done', source, note
+
 
 # ===============================
-# LOOP ITEM
+# LOOP ITEM (paralel; tiap item di-commit begitu selesai, urutan export dari 'position')
 # ===============================
-for i, code in enumerate(item_codes, 1):
-    print(f"\n[{i}/{len(item_codes)}] 🔎 Cek kode: {code}")
-
-    # Restart browser tiap 100 item biar stabil
-    if i % 100 == 0:
-        print("♻️ Restarting Chrome session untuk menjaga stabilitas...")
-        try:
-            driver.quit()
-        except:
-            pass
-        time.sleep(3)
-        driver = webdriver.Chrome(options=options)
-        wait = WebDriverWait(driver, 15)
-
-    # Auto retry up to 3x if timeout
-    success = False
-    for attempt in range(3):
-        try:
-            driver.set_page_load_timeout(60)
-            driver.get("https://www.jikiu.com/catalogue")
-            success = True
-            break
-        except Exception as e:
-            print(f"⚠️ Percobaan ke-{attempt+1} gagal load halaman ({e}). Ulang...")
-            try:
-                driver.quit()
-            except:
-                pass
-            time.sleep(5)
-            driver = webdriver.Chrome(options=options)
-            wait = WebDriverWait(driver, 15)
-    if not success:
-        print(f"❌ Gagal load halaman untuk {code}, skip.")
-        results.append({"Item Code": code, "Owner": "", "Number": ""})
-        continue
-
-    try:
-        # input pencarian
-        search_box = wait.until(EC.presence_of_element_located((By.ID, "part_no")))
-        search_box.clear()
-        search_box.send_keys(code)
-        search_box.send_keys(Keys.ENTER)
-        time.sleep(3)
-
-        # cek apakah ditemukan
-        if "No data found" in driver.page_source or "0 result" in driver.page_source:
-            print("   ✗ Tidak ditemukan di katalog.")
-            results.append({"Item Code": code, "Owner": "", "Number": ""})
-            continue
-
-        print("   ✓ Data ditemukan, ambil Crosses...")
-        page_text = driver.find_element(By.TAG_NAME, "body").text
-        crosses_pairs = parse_crosses_from_text(page_text)
-        print(f"   ↳ Total pasangan ditemukan: {len(crosses_pairs)}")
-
-        if crosses_pairs:
-            for p in crosses_pairs:
-                results.append({
-                    "Item Code": code,
-                    "Owner": p["Owner"],
-                    "Number": p["Number"]
-                })
-        else:
-            results.append({"Item Code": code, "Owner": "", "Number": ""})
-
-    except Exception as e:
-        print(f"   ❌ Error: {e}")
-        results.append({"Item Code": code, "Owner": "", "Number": ""})
-
-        # Auto-recover kalau Chrome crash
-        if "Failed to establish a new connection" in str(e) or "Max retries exceeded" in str(e):
-            print("🔁 ChromeDriver terputus, mencoba restart...")
-            try:
-                driver.quit()
-            except:
-                pass
-            time.sleep(5)
-            driver = webdriver.Chrome(options=options)
-            wait = WebDriverWait(driver, 15)
-
-    # autosave tiap 50 item
-    if i % 50 == 0:
-        temp_file = f"autosave_{i}_{datetime.now().strftime('%H%M%S')}.xlsx"
-        pd.DataFrame(results).to_excel(temp_file, index=False)
-        print(f"💾 Autosave progress: {temp_file}")
-
-    time.sleep(2)
+executor = ThreadPoolExecutor(max_workers=POOL_SIZE)
+try:
+    futures = {executor.submit(process_item, code): (pos, code) for pos, code in todo}
+    for i, future in enumerate(as_completed(futures), 1):
+        pos, code = futures[future]
+        rows, status, source, note = future.result()
+        print(f"[{i}/{len(todo)}] 🔎 {code}: {note}")
+
+        # commit per item, O(1) — Excel hanya ditulis sekali di akhir
+        with metrics.timer('checkpoint'):
+            checkpoint.record(code, rows, status=status, position=pos, source=source)
+        metrics.item()
+except KeyboardInterrupt:
+    print("\nProses dihentikan paksa oleh pengguna. Menyimpan data yang ada...")
+finally:
+    executor.shutdown(wait=False, cancel_futures=True)
 
 # ===============================
 # SIMPAN HASIL
 # ===============================
-try:
-    driver.quit()
-except:
-    pass
+fetcher.close()
+print(f"♻️ Total browser di-restart: {fetcher.restarts}")
+print(f"🌐 Sumber halaman (semua item di checkpoint): {dict(checkpoint.sources())}")
+metrics.set('driver_restarts', fetcher.restarts)
+metrics.set('cache_hits', cache.hits)
+cache.close()
+
+# hasil lengkap (run sebelumnya + run ini) sesuai urutan input
+results = checkpoint.rows_for(item_codes)
+checkpoint.close()
 
 result_df = pd.DataFrame(results)
 
 # Gabungkan hasil dengan data asli (jika kolom cocok)
 try:
-    merged_df = pd.merge(result_df, df, left_on='Item Code', right_on='ItemCode', how='left')
+    merged_df = merge_on_key(result_df, df, left_on='Item Code', right_on='ItemCode', how='left')
 except Exception as e:
     print(f"⚠️ Gagal merge detail tambahan: {e}")
     merged_df = result_df
@@ -195,5 +152,7 @@ available_cols = [c for c in ordered_cols if c in merged_df.columns]
 merged_df = merged_df[available_cols]
 
 # Simpan hasil
-merged_df.to_excel(OUTPUT_FILE, index=False)
+with metrics.timer('excel_write'):
+    merged_df.to_excel(OUTPUT_FILE, index=False)
 print(f"\n✅ Selesai! Semua hasil disimpan di: {OUTPUT_FILE}")
+metrics.report()
@@ -1,155 +1,179 @@
 import pandas as pd
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 import time
-import re
 from datetime import datetime
-import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from rate_limiter import RateLimiter
+from item_codes import KEY_COLUMN, clean_code, normalize_key, unique_codes, with_key
+from response_cache import ResponseCache
+from driver_pool import DriverPool
+from checkpoint import CheckpointStore, input_fingerprint
+from jikiu_browser import chrome_options, block_heavy_resources
+from hybrid_fetcher import HybridFetcher
+from jikiu_pages import analyze_page_text
+from metrics import Metrics
 
 # --- KONFIGURASI ---
 EXCEL_PATH = 'List spare parts-Anugerah Auto.xlsx'
-SAVE_INTERVAL = 50  # Simpan progres setiap 50 item
+SAVE_INTERVAL = 50  # Laporan durasi setiap 50 item
 OUTPUT_FINAL = f'validation_FULL_{datetime.now().strftime("%Y%m%d_%H%M%S")}.xlsx'
-BACKUP_FILE = 'backup_validation_progress.xlsx'
+CHECKPOINT_PATH = 'checkpoint_validation.sqlite'  # progres per item (pengganti backup Excel)
+RESUME = True  # Lanjutkan otomatis dari checkpoint (False = validasi ulang semua)
+CHECKPOINT_MAX_AGE_DAYS = 7  # item 'done' lebih tua dari ini divalidasi ulang (None = pakai terus)
+RATE_LIMIT_RPS = 1.0     # target request per detik ke jikiu.com
+RATE_LIMIT_BURST = 2     # jumlah request boleh beruntun tanpa jeda
+CACHE_PATH = 'jikiu_cache.sqlite'  # cache halaman, dipakai bareng validate_crosses.py
+REFRESH_OLDER_THAN_DAYS = None     # isi angka (mis. 7) untuk paksa download ulang halaman lama
+POOL_SIZE = 4            # jumlah Chrome headless yang jalan paralel
+PAGES_PER_BROWSER = 100  # Chrome di-recycle setelah sekian halaman
+LEAN_BROWSER = True      # blok gambar/font/media/domain pihak ketiga, page load "eager"
+HTTP_FIRST = True        # HTML biasa dulu (beberapa KB), Chrome hanya kalau halaman belum lengkap
+
+# Waktu per tahap, item/detik, retry & restart browser → metrics_validate_jikiu_excel_*.json
+metrics = Metrics('validate_jikiu_excel')
 
 # 1. Membaca file Excel
 print(f"[{datetime.now().strftime('%H:%M:%S')}] Membaca file Excel...")
 try:
-    excel_df = pd.read_excel(EXCEL_PATH)
-    # Ambil SEMUA item tanpa limit [:100]
-    item_codes = excel_df['ItemCode'].astype(str).tolist()
-    print(f"Total {len(item_codes)} item ditemukan dalam file.\n")
+    with metrics.timer('read_excel'):
+        excel_df = pd.read_excel(EXCEL_PATH)
+    # Ambil SEMUA item tanpa limit [:100]; kode yang sama (per aplikasi kendaraan) cukup dicek sekali
+    item_codes = unique_codes(excel_df['ItemCode'])
+    print(f"Total {len(excel_df)} baris, {len(item_codes)} kode unik ditemukan dalam file.\n")
 except Exception as e:
     print(f"Gagal membaca file Excel: {e}")
     exit()
 
-# 2. Setup Chrome Driver
-print("Menyiapkan browser (Headless Mode)...")
-options = webdriver.ChromeOptions()
-options.add_argument('--headless')  # Berjalan di background (lebih cepat)
-options.add_argument('--window-size=1920,1080')
-options.add_argument('--disable-blink-features=AutomationControlled')
-options.add_experimental_option("excludeSwitches", ["enable-automation"])
+# 2. Setup Fetcher (HTML biasa dulu, Chrome hanya untuk halaman yang belum lengkap)
+options = chrome_options(lean=LEAN_BROWSER, headless=True)
 
-driver = webdriver.Chrome(options=options)
-wait = WebDriverWait(driver, 10)
 
-results = []
-found_count = 0
-not_found_count = 0
-error_count = 0
+def start_browsers():
+    # Chrome baru dijalankan saat pertama kali dibutuhkan
+    print(f"Menyiapkan {POOL_SIZE} browser (Headless Mode)...")
+    return DriverPool(options, size=POOL_SIZE, max_pages=PAGES_PER_BROWSER, wait_timeout=10,
+                      setup=block_heavy_resources if LEAN_BROWSER else None)
+
+
+# Pengatur kecepatan bersama (token bucket + backoff otomatis)
+limiter = RateLimiter(rate=RATE_LIMIT_RPS, burst=RATE_LIMIT_BURST)
+
+# Cache halaman di disk (re-run tidak perlu download ulang)
+cache = ResponseCache(CACHE_PATH, refresh_older_than_days=REFRESH_OLDER_THAN_DAYS)
+
+fetcher = HybridFetcher(limiter, cache, start_browsers, attempts=2, metrics=metrics,
+                        http_first=HTTP_FIRST, pool_size=POOL_SIZE)
+
+# Progres di-commit per item (crash-safe, tanpa tulis ulang Excel)
+# Checkpoint hanya berlaku untuk file input yang sama (daftar kode berubah = mulai dari nol)
+checkpoint = CheckpointStore(CHECKPOINT_PATH, max_age_days=CHECKPOINT_MAX_AGE_DAYS)
+reset = checkpoint.start_run(input_fingerprint(EXCEL_PATH, item_codes), resume=RESUME)
+if reset == 'different input':
+    print(f"🧹 {CHECKPOINT_PATH} berisi progres input lain, mulai dari nol.")
+
+# Resume: item yang sudah selesai dilewati, item ERROR diulang
+done_keys = checkpoint.completed_keys()
+todo = [(pos, code) for pos, code in enumerate(item_codes, 1) if normalize_key(code) not in done_keys]
+for run_id, count in checkpoint.reused_runs(done_keys).items():
+    print(f"♻️ {count} item dipakai ulang dari run sebelumnya ({run_id}), "
+          f"umur maks {CHECKPOINT_MAX_AGE_DAYS} hari — set RESUME = False untuk proses ulang semua.")
 
 print("="*60)
-print(f"MULAI VALIDASI TOTAL {len(item_codes)} ITEM")
+print(f"MULAI VALIDASI TOTAL {len(item_codes)} ITEM ({len(item_codes) - len(todo)} sudah ada di checkpoint, sisa {len(todo)})")
 print("="*60)
 
 start_time = time.time()
 
-# 3. Looping Utama
+
+def validate_item(original_code):
+    """Status, JIKIU code, details, sumber halaman dan timestamp untuk satu item (jalan di thread worker)."""
+    code = clean_code(original_code)
+    page_text, _, source = fetcher.fetch(code)
+    # 429 terus-menerus = ERROR juga, supaya diulang saat resume (bukan CHECK MANUAL 'done')
+    if page_text is None or source == 'rate limited':
+        details = "Rate Limited (429)" if source == 'rate limited' else "Connection Timeout"
+        analysis = {'status': "ERROR", 'jikiu_code': "", 'item_type': "", 'details': details}
+    else:
+        with metrics.timer('parse'):
+            analysis = analyze_page_text(code, page_text)
+    analysis['source'] = source
+    analysis['timestamp'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    return analysis
+
+
+# 3. Looping Utama (paralel; tiap item di-checkpoint begitu selesai, urutan export dari 'position')
+executor = ThreadPoolExecutor(max_workers=POOL_SIZE)
 try:
-    for i, original_code in enumerate(item_codes, 1):
-        code = str(original_code).strip().rstrip('.')
-        progress = f"[{i}/{len(item_codes)}]"
+    futures = {executor.submit(validate_item, original_code): (pos, original_code) for pos, original_code in todo}
+    for i, future in enumerate(as_completed(futures), 1):
+        pos, original_code = futures[future]
+        analysis = future.result()
+        code = clean_code(original_code)
+        progress = f"[{i}/{len(todo)}]"
+        status = analysis['status']
         
-        # Retry logic sederhana jika koneksi timeout
-        retry = 0
-        success_fetch = False
-        
-        while retry < 2 and not success_fetch:
-            try:
-                driver.get('https://www.jikiu.com/catalogue')
-                search_box = wait.until(EC.presence_of_element_located((By.ID, "part_no")))
-                
-                search_box.clear()
-                search_box.send_keys(code)
-                search_box.send_keys(Keys.ENTER)
-                
-                # Tunggu sejenak agar hasil muncul (AJAX load)
-                time.sleep(1.5)
-                
-                page_text = driver.find_element(By.TAG_NAME, 'body').text
-                success_fetch = True
-            except Exception:
-                retry += 1
-                time.sleep(2)
-
-        if not success_fetch:
-            status, details, jikiu_code = "ERROR", "Connection Timeout", ""
-            error_count += 1
+        if status == "ERROR":
+            print(f"{progress} {code:15} ! Error koneksi ({analysis['details']})")
+        elif status == "NOT FOUND":
+            print(f"{progress} {code:15} ✗ Tidak ditemukan")
+        elif status == "FOUND":
+            print(f"{progress} {code:15} ✓ Ditemukan ({analysis['item_type']})")
         else:
-            # Analisis Hasil
-            if "No data found!" in page_text or "0 result" in page_text.lower():
-                status = "NOT FOUND"
-                not_found_count += 1
-                details, jikiu_code = "", ""
-                print(f"{progress} {code:15} ✗ Tidak ditemukan")
-                
-            elif "Search Result for" in page_text or code.upper() in page_text.upper():
-                status = "FOUND"
-                found_count += 1
-                
-                jikiu_match = re.search(r'Returns JIKIU - (\w+)', page_text)
-                jikiu_code = jikiu_match.group(1) if jikiu_match else ""
-                
-                # Deteksi Tipe Item
-                types = ["BALL JOINT", "TIE ROD END", "STABILIZER LINK", "RACK END", "IDLER ARM"]
-                item_type = "OTHER"
-                for t in types:
-                    if t in page_text.upper():
-                        item_type = t
-                        break
-                
-                details = f"{item_type} - {jikiu_code}" if jikiu_code else item_type
-                print(f"{progress} {code:15} ✓ Ditemukan ({item_type})")
-            else:
-                status = "CHECK MANUAL"
-                details, jikiu_code = "Ambiguous Response", ""
-                print(f"{progress} {code:15} ? Cek Manual")
-
-        # Simpan ke list hasil
-        results.append({
-            'No': i,
+            print(f"{progress} {code:15} ? Cek Manual")
+
+        row = {
+            'No': pos,
             'Item Code': original_code,
             'Status': status,
-            'JIKIU Code': jikiu_code,
-            'Details': details,
-            'Timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        })
-
-        # 4. Auto-Save berkala
+            'JIKIU Code': analysis['jikiu_code'],
+            'Details': analysis['details'],
+            'Timestamp': analysis['timestamp']
+        }
+
+        # 4. Checkpoint per item (O(1), langsung aman di disk)
+        with metrics.timer('checkpoint'):
+            checkpoint.record(original_code, [row], status='error' if status == "ERROR" else 'done', position=pos,
+                              source=analysis['source'])
+        metrics.item()
         if i % SAVE_INTERVAL == 0:
-            pd.DataFrame(results).to_excel(BACKUP_FILE, index=False)
             elapsed = time.time() - start_time
-            print(f"--- AUTO-SAVE: {i} item selesai. Durasi: {elapsed/60:.1f} menit ---")
+            print(f"--- PROGRES: {i} item selesai. Durasi: {elapsed/60:.1f} menit ({i / elapsed:.2f} item/detik) ---")
 
 except KeyboardInterrupt:
     print("\nProses dihentikan paksa oleh pengguna. Menyimpan data yang ada...")
+finally:
+    executor.shutdown(wait=False, cancel_futures=True)
 
 # 5. Finalisasi Data
 print("\n" + "="*60)
 print("PROSES SELESAI")
-final_df = pd.DataFrame(results)
-
-# Mapping kembali kolom lain dari file asli (opsional)
-try:
-    other_columns = [col for col in excel_df.columns if col != 'ItemCode']
-    for col in other_columns:
-        mapping = dict(zip(excel_df['ItemCode'].astype(str), excel_df[col]))
-        final_df[col] = final_df['Item Code'].astype(str).map(mapping)
-except:
-    pass
-
-# Simpan hasil akhir
-final_df.to_excel(OUTPUT_FINAL, index=False)
-if os.path.exists(BACKUP_FILE):
-    os.remove(BACKUP_FILE) # Hapus backup jika sukses sampai akhir
+# Hasil per kode unik (run sebelumnya + run ini) dari checkpoint, lalu satu join balik
+# ke semua baris input yang kodenya sama → satu baris hasil per baris input
+status_df = pd.DataFrame(checkpoint.rows_for(item_codes),
+                         columns=['No', 'Item Code', 'Status', 'JIKIU Code', 'Details', 'Timestamp'])
+status_df = with_key(status_df, 'Item Code').drop(columns=['No', 'Item Code'])
+final_df = with_key(excel_df, 'ItemCode').merge(status_df, on=KEY_COLUMN, how='left')
+final_df = final_df.drop(columns=KEY_COLUMN).rename(columns={'ItemCode': 'Item Code'})
+final_df.insert(0, 'No', range(1, len(final_df) + 1))
+
+other_columns = [col for col in excel_df.columns if col != 'ItemCode']
+final_df = final_df[['No', 'Item Code', 'Status', 'JIKIU Code', 'Details', 'Timestamp'] + other_columns]
+
+# Simpan hasil akhir (satu-satunya penulisan Excel)
+with metrics.timer('excel_write'):
+    final_df.to_excel(OUTPUT_FINAL, index=False)
 
 end_time = time.time()
 print(f"Total Waktu: {(end_time - start_time)/60:.2f} menit")
-print(f"Ditemukan: {found_count} | Tidak: {not_found_count} | Error: {error_count}")
+status_counts = final_df['Status'].value_counts() if len(final_df) else pd.Series(dtype=int)
+print(f"Ditemukan: {status_counts.get('FOUND', 0)} | Tidak: {status_counts.get('NOT FOUND', 0)} | Error: {status_counts.get('ERROR', 0)}")
 print(f"File disimpan: {OUTPUT_FINAL}")
 
-driver.quit()
\ No newline at end of file
+print(f"Sumber halaman: {dict(checkpoint.sources())}")
+
+fetcher.close()
+metrics.set('driver_restarts', fetcher.restarts)
+metrics.set('cache_hits', cache.hits)
+cache.close()
+checkpoint.close()
+metrics.report()
\ No newline at end of file